@@ -1,6 +1,16 @@
 from flask import Flask, jsonify
 from flask_restx import Api
-from app.extensions import db, bcrypt, jwt
+from app.extensions import db, jwt
+from app.persistence.cache import init_cache
+from app.persistence.identity_map import init_request_tracking
+from app.persistence.versions import init_versions
+from app.persistence.unit_of_work import init_unit_of_work
+from app.persistence.engine import configure_engine, init_engine
+from app.persistence.replicas import init_read_replicas
+from app.passwords import init_password_hasher
+from app.services.tasks import init_background_tasks
+from app.api.throttle import init_login_throttle
+from app.api.blocklist import init_blocklist
 
 def create_app(config_class='config.DevelopmentConfig'):
     """
@@ -16,9 +26,18 @@ def create_app(config_class='config.DevelopmentConfig'):
         app.config.from_object(config_class)
     
     # Initialize extensions with app
+    configure_engine(app)
     db.init_app(app)
-    bcrypt.init_app(app)
+    init_engine(app)
+    init_read_replicas(app, db)
+    init_password_hasher(app)
+    init_background_tasks(app)
+    init_login_throttle(app)
     jwt.init_app(app)
+    init_blocklist(app, jwt)
+    init_cache(app)
+    init_request_tracking(app)
+    init_unit_of_work(app)
 
     # Enable CORS for all routes (allow frontend requests)
     from flask_cors import CORS
@@ -79,6 +98,7 @@ def create_app(config_class='config.DevelopmentConfig'):
     from app.api.v1.places import api as places_ns
     from app.api.v1.reviews import api as reviews_ns
     from app.api.v1.amenities import api as amenities_ns
+    from app.api.v1.metrics import api as metrics_ns
 
     # Register namespaces
     api.add_namespace(auth_ns, path='/auth')
@@ -86,9 +106,17 @@ def create_app(config_class='config.DevelopmentConfig'):
     api.add_namespace(places_ns, path='/places')
     api.add_namespace(reviews_ns, path='/reviews')
     api.add_namespace(amenities_ns, path='/amenities')
+    api.add_namespace(metrics_ns, path='/metrics')
+
+    # Register CLI commands (flask hbnb ...)
+    from app.commands import hbnb_cli
+    app.cli.add_command(hbnb_cli)
     
-    # Create database tables
+    # Create database tables (replicas get theirs through replication)
     with app.app_context():
-        db.create_all()
+        replicas = app.config.get('READ_REPLICA_BINDS') or ()
+        db.create_all(bind_key=[key for key in db.engines
+                                if key in db.metadatas and key not in replicas])
+    init_versions(app)
     
     return app
@@ -0,0 +1,159 @@
+"""
+Revoked JWT store checked on every protected request
+
+Almost every token checked has not been revoked, so the in-memory store
+answers from a bloom filter first: a few bit tests on the token's jti,
+using the str hash Python already caches on the string. Only a filter
+hit consults the exact jti -> expiry map.
+
+Bloom filters cannot forget, so revocations go to the current filter and
+filters are rotated every token lifetime (JWT_ACCESS_TOKEN_EXPIRES): a
+token revoked before the previous rotation has expired by now. Expired
+entries leave the exact map at the same time, which bounds memory by the
+revocations of two token lifetimes.
+
+The Redis store keeps one key per revoked jti, expiring with the token,
+so revocations are shared by every worker.
+"""
+import math
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+
+_MASK = (1 << 64) - 1
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key):
+        """Add a key"""
+        # Double hashing: position i is h1 + i * h2
+        h = hash(key) & _MASK
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        h = hash(key) & _MASK
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class InMemoryBlocklist:
+    """Bloom filters in front of an exact jti -> expiry map"""
+
+    def __init__(self, lifetime, capacity=100000, error_rate=0.01):
+        self.lifetime = lifetime
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotated_at = time.time()
+        self._expiries = {}
+        self.filter_hits = 0
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token until its expiry time (a Unix timestamp)"""
+        with self._lock:
+            self._rotate(time.time())
+            self._current.add(jti)
+            self._expiries[jti] = expires_at
+
+    def is_revoked(self, jti):
+        """True if the token has been revoked"""
+        if jti not in self._current and jti not in self._previous:
+            return False
+        self.filter_hits += 1
+        expires_at = self._expiries.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def _rotate(self, now):
+        """Start a new filter once per token lifetime, dropping expired entries"""
+        if now - self._rotated_at < self.lifetime:
+            return
+        self._previous, self._current = self._current, BloomFilter(self.capacity, self.error_rate)
+        self._rotated_at = now
+        self._expiries = {jti: exp for jti, exp in self._expiries.items() if exp > now}
+
+    def stats(self):
+        """Revoked tokens tracked and filter hits"""
+        return {'backend': 'memory', 'revoked': len(self._expiries),
+                'filter_bytes': 2 * len(self._current.bits), 'filter_hits': self.filter_hits}
+
+
+class RedisBlocklist:
+    """One expiring key per revoked jti, shared by every worker"""
+
+    def __init__(self, client, prefix='hbnb:revoked:'):
+        self.client = client
+        self.prefix = prefix
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token until its expiry time (a Unix timestamp)"""
+        if math.isinf(expires_at):
+            self.client.set(self.prefix + jti, b'1')
+            return
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            self.client.set(self.prefix + jti, b'1', ex=ttl)
+
+    def is_revoked(self, jti):
+        """True if the token has been revoked"""
+        return self.client.get(self.prefix + jti) is not None
+
+    def stats(self):
+        """Revoked keys live in Redis and expire there"""
+        return {'backend': 'redis'}
+
+
+def create_blocklist(config):
+    """
+    Build the token blocklist described by the application config
+
+    TOKEN_BLOCKLIST_BACKEND is 'memory' or 'redis'.
+    """
+    backend = config.get('TOKEN_BLOCKLIST_BACKEND', 'memory')
+    if backend == 'memory':
+        lifetime = config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+        if isinstance(lifetime, timedelta):
+            lifetime = lifetime.total_seconds()
+        elif not lifetime:
+            # Tokens that never expire stay revoked forever
+            lifetime = math.inf
+        return InMemoryBlocklist(lifetime, config.get('TOKEN_BLOCKLIST_CAPACITY', 100000))
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("TOKEN_BLOCKLIST_BACKEND='redis' requires the redis package")
+        return RedisBlocklist(redis.Redis.from_url(config['CACHE_REDIS_URL']))
+    raise ValueError(f"Unknown TOKEN_BLOCKLIST_BACKEND '{backend}'")
+
+
+def get_blocklist():
+    """Get the token blocklist of the current application"""
+    return current_app.extensions['hbnb_token_blocklist']
+
+
+def init_blocklist(app, jwt):
+    """Create the application's blocklist and check it on every protected request"""
+    app.extensions['hbnb_token_blocklist'] = create_blocklist(app.config)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        jti = jwt_payload.get('jti')
+        return jti is not None and get_blocklist().is_revoked(jti)
@@ -0,0 +1,39 @@
+"""
+HTTP conditional request helpers (ETag / Last-Modified and 304 responses)
+"""
+import hashlib
+from datetime import timezone
+from flask import request
+from werkzeug.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Build a weak ETag from the parts identifying a representation"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8'))
+    return quote_etag(digest.hexdigest()[:32], weak=True)
+
+
+def validators(etag, last_modified=None):
+    """
+    Compare the request's validators with the current representation
+
+    If-None-Match wins over If-Modified-Since when both are sent.
+
+    Args:
+        etag: Current ETag (quoted, as returned by make_etag)
+        last_modified: Naive UTC datetime of the last change, optional
+
+    Returns:
+        Tuple (not_modified, headers to send with the response)
+    """
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        headers['Last-Modified'] = http_date(last_modified)
+
+    if request.if_none_match:
+        raw_etag = etag[3:-1]
+        return request.if_none_match.contains_weak(raw_etag), headers
+    if last_modified is not None and request.if_modified_since:
+        return last_modified <= request.if_modified_since, headers
+    return False, headers
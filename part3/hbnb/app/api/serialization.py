@@ -0,0 +1,168 @@
+"""
+Fast serialization path for list endpoints
+
+Instead of loading ORM objects and calling to_dict() on each of them, a
+Projection selects only the columns a response needs, as plain tuples,
+and builds the dictionaries column-wise. Timestamps are formatted in one
+pass per column, or left to orjson, which encodes naive datetimes in C
+exactly like isoformat(). The body is encoded straight to JSON bytes,
+bypassing flask-restx marshalling.
+
+Namespaces opt in through FAST_SERIALIZATION_NAMESPACES; the others keep
+the to_dict() path.
+
+Large collections can also be streamed, as NDJSON (Accept:
+application/x-ndjson) or as a chunked JSON array (?stream=true): rows are
+read from a server-side cursor and written out one batch at a time, so
+memory stays flat whatever the size of the table.
+"""
+import json
+from itertools import islice
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import DateTime
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Projection:
+    """Columns of a model serialized to dictionaries without ORM objects"""
+
+    def __init__(self, model, fields, derived=None, hidden=()):
+        """
+        Args:
+            model: Model class
+            fields: Column names, in output order
+            derived: Optional dict name -> function(row dict) for computed fields
+            hidden: Fields only selected to compute derived ones
+        """
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+        self.derived = derived or {}
+        self.hidden = tuple(hidden)
+        self._datetimes = [index for index, column in enumerate(self.columns)
+                           if isinstance(column.type, DateTime)]
+
+    def to_dicts(self, rows):
+        """Turn rows selected with self.columns into dictionaries"""
+        if not rows:
+            return []
+        if orjson is None and self._datetimes:
+            columns = list(zip(*rows))
+            for index in self._datetimes:
+                columns[index] = [value.isoformat() if value is not None else None
+                                  for value in columns[index]]
+            rows = zip(*columns)
+        fields = self.fields
+        dicts = [dict(zip(fields, row)) for row in rows]
+        if self.derived or self.hidden:
+            for item in dicts:
+                for name, compute in self.derived.items():
+                    item[name] = compute(item)
+                for name in self.hidden:
+                    del item[name]
+        return dicts
+
+
+def fast_path_enabled(namespace):
+    """True when a namespace opted in to the fast serialization path"""
+    return namespace.name in current_app.config.get('FAST_SERIALIZATION_NAMESPACES', ())
+
+
+def dumps(payload):
+    """Encode a payload to JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200, headers=None):
+    """Build a JSON response without going through flask-restx"""
+    return Response(dumps(payload), status=status, headers=headers,
+                    mimetype='application/json')
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def stream_format():
+    """'ndjson' or 'json' when the client asked for a streamed list, None otherwise"""
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    if best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return 'json'
+    return None
+
+
+def stream_response(rows, projection, fmt, envelope=None, headers=None):
+    """
+    Stream rows as NDJSON, or as a JSON array written chunk by chunk
+
+    Args:
+        rows: Iterator of rows selected with projection.columns
+        projection: Projection turning the rows into dictionaries
+        fmt: 'ndjson' or 'json'
+        envelope: Optional tuple (key, extra fields): the JSON array is
+            then sent as {key: [...], **extra fields}, like the paged
+            response. NDJSON always has one object per line.
+        headers: Optional response headers
+    """
+    batch_size = current_app.config.get('STREAM_BATCH_SIZE', 1000)
+    rows = iter(rows)
+
+    def batches():
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield projection.to_dicts(batch)
+
+    def ndjson():
+        for items in batches():
+            yield b''.join(dumps(item) + b'\n' for item in items)
+
+    def array():
+        if envelope:
+            key, extra = envelope
+            yield b'{' + dumps(key) + b':['
+        else:
+            yield b'['
+        separator = b''
+        for items in batches():
+            yield separator + b','.join(dumps(item) for item in items)
+            separator = b','
+        if envelope:
+            yield b']' + (b',' + dumps(extra)[1:] if extra else b'}')
+        else:
+            yield b']'
+
+    body = ndjson() if fmt == 'ndjson' else array()
+    mimetype = NDJSON_MIMETYPE if fmt == 'ndjson' else 'application/json'
+    return Response(stream_with_context(body), headers=headers, mimetype=mimetype)
+
+
+def _rating_avg(place):
+    """Same rounding as Place.rating_avg"""
+    if not place['review_count']:
+        return None
+    return round(place['rating_sum'] / place['review_count'], 2)
+
+
+# Projections matching the models' to_dict() output
+USER_PROJECTION = Projection(User, [
+    'id', 'first_name', 'last_name', 'email', 'is_admin', 'created_at', 'updated_at'])
+PLACE_PROJECTION = Projection(Place, [
+    'id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+    'review_count', 'created_at', 'updated_at', 'rating_sum'
+], derived={'rating_avg': _rating_avg}, hidden=('rating_sum',))
+REVIEW_PROJECTION = Projection(Review, [
+    'id', 'text', 'rating', 'place_id', 'user_id', 'created_at', 'updated_at'])
+AMENITY_SUMMARY_PROJECTION = Projection(Amenity, ['id', 'name'])
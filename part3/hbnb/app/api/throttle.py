@@ -0,0 +1,192 @@
+"""
+Sliding-window throttling of failed logins, per client IP and per email
+
+Each key keeps the timestamps of its last `limit` failures in a ring
+buffer. A key is blocked while the oldest of those timestamps is still
+inside the window, so checking a key is one array read and recording a
+failure one array write, whatever the traffic.
+
+The in-memory store holds at most max_keys ring buffers and evicts the
+least recently used ones. The Redis store keeps the same ring buffer as
+a capped list, shared by every worker.
+"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from flask import current_app
+from app.models.user import normalize_email
+
+
+class InMemoryWindowStore:
+    """Ring buffers of failure timestamps, bounded by an LRU on keys"""
+
+    def __init__(self, limit, max_keys=100000):
+        self.limit = limit
+        self.max_keys = max_keys
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def oldest(self, key):
+        """Timestamp of the limit-th most recent failure, 0 if fewer"""
+        ring = self._rings.get(key)
+        if ring is None:
+            return 0.0
+        head, stamps = ring
+        return stamps[head]
+
+    def record(self, key, now):
+        """Record a failure, overwriting the oldest slot"""
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = [0, array('d', bytes(8 * self.limit))]
+                while len(self._rings) > self.max_keys:
+                    self._rings.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._rings.move_to_end(key)
+            head, stamps = ring
+            stamps[head] = now
+            ring[0] = (head + 1) % self.limit
+
+    def reset(self, key):
+        """Forget a key"""
+        with self._lock:
+            self._rings.pop(key, None)
+
+    def stats(self):
+        """Key count and evictions"""
+        return {'keys': len(self._rings), 'max_keys': self.max_keys,
+                'evictions': self.evictions}
+
+
+class RedisWindowStore:
+    """The same ring buffer as a Redis list capped at `limit` entries"""
+
+    def __init__(self, client, limit, window, prefix='hbnb:throttle:'):
+        self.client = client
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+
+    def oldest(self, key):
+        """Timestamp of the limit-th most recent failure, 0 if fewer"""
+        value = self.client.lindex(self.prefix + key, self.limit - 1)
+        return float(value) if value is not None else 0.0
+
+    def record(self, key, now):
+        """Record a failure, the list expires with the window"""
+        name = self.prefix + key
+        self.client.lpush(name, repr(now))
+        self.client.ltrim(name, 0, self.limit - 1)
+        self.client.expire(name, int(self.window) + 1)
+
+    def reset(self, key):
+        """Forget a key"""
+        self.client.delete(self.prefix + key)
+
+    def stats(self):
+        """Keys live in Redis and expire there"""
+        return {'backend': 'redis'}
+
+
+class SlidingWindowLimiter:
+    """At most `limit` failures per key within `window` seconds"""
+
+    def __init__(self, store, window):
+        self.store = store
+        self.window = window
+        self.rejections = 0
+
+    def retry_after(self, key, now):
+        """Seconds until the key may try again, 0 if it is not blocked"""
+        oldest = self.store.oldest(key)
+        wait = oldest + self.window - now
+        if wait > 0:
+            self.rejections += 1
+            return wait
+        return 0
+
+    def record(self, key, now):
+        """Record a failure"""
+        self.store.record(key, now)
+
+    def reset(self, key):
+        """Clear a key's failures"""
+        self.store.reset(key)
+
+
+class LoginThrottle:
+    """Failed-login limiters keyed by client IP and by email"""
+
+    def __init__(self, ip_limiter, email_limiter):
+        self.ip_limiter = ip_limiter
+        self.email_limiter = email_limiter
+
+    @staticmethod
+    def _email_key(email):
+        return normalize_email(email or '')
+
+    def retry_after(self, ip, email):
+        """Seconds until this IP and email may try again, 0 if allowed"""
+        now = time.time()
+        return max(self.ip_limiter.retry_after(ip or '-', now),
+                   self.email_limiter.retry_after(self._email_key(email), now))
+
+    def failed(self, ip, email):
+        """Record a failed login"""
+        now = time.time()
+        self.ip_limiter.record(ip or '-', now)
+        self.email_limiter.record(self._email_key(email), now)
+
+    def succeeded(self, email):
+        """A successful login clears the email's failures"""
+        self.email_limiter.reset(self._email_key(email))
+
+    def stats(self):
+        """Rejection counters and store usage"""
+        return {
+            'ip': dict(self.ip_limiter.store.stats(), rejections=self.ip_limiter.rejections),
+            'email': dict(self.email_limiter.store.stats(),
+                          rejections=self.email_limiter.rejections)
+        }
+
+
+def create_login_throttle(config):
+    """
+    Build the login throttle described by the application config
+
+    LOGIN_THROTTLE_BACKEND is 'memory', 'redis' or None (disabled).
+    """
+    backend = config.get('LOGIN_THROTTLE_BACKEND')
+    if not backend:
+        return None
+    window = config.get('LOGIN_THROTTLE_WINDOW', 300)
+    limits = (config.get('LOGIN_MAX_FAILURES_PER_IP', 20),
+              config.get('LOGIN_MAX_FAILURES_PER_EMAIL', 5))
+    if backend == 'memory':
+        max_keys = config.get('LOGIN_THROTTLE_MAX_KEYS', 100000)
+        stores = [InMemoryWindowStore(limit, max_keys) for limit in limits]
+    elif backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_THROTTLE_BACKEND='redis' requires the redis package")
+        client = redis.Redis.from_url(config['CACHE_REDIS_URL'])
+        stores = [RedisWindowStore(client, limit, window, prefix=f'hbnb:throttle:{name}:')
+                  for limit, name in zip(limits, ('ip', 'email'))]
+    else:
+        raise ValueError(f"Unknown LOGIN_THROTTLE_BACKEND '{backend}'")
+    return LoginThrottle(*(SlidingWindowLimiter(store, window) for store in stores))
+
+
+def get_login_throttle():
+    """Get the login throttle of the current application, None when disabled"""
+    return current_app.extensions.get('hbnb_login_throttle')
+
+
+def init_login_throttle(app):
+    """Create the application's login throttle"""
+    app.extensions['hbnb_login_throttle'] = create_login_throttle(app.config)
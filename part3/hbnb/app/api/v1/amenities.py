@@ -1,9 +1,13 @@
 from flask_restx import Namespace, Resource, fields
+from flask import request
 from flask_jwt_extended import jwt_required, get_jwt
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.api.conditional import make_etag, validators
+from app.api.serialization import (
+    AMENITY_SUMMARY_PROJECTION, PLACE_PROJECTION, fast_path_enabled, json_response
+)
 
 api = Namespace('amenities', description='Amenity operations')
-facade = HBnBFacade()
 
 amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
@@ -39,6 +43,13 @@ class AmenityList(Resource):
     @api.response(200, 'List of amenities retrieved successfully')
     def get(self):
         """Retrieve a list of all amenities"""
+        version, changed_at = facade.get_collection_version('amenities')
+        not_modified, headers = validators(make_etag('amenities', version), changed_at)
+        if not_modified:
+            return None, 304, headers
+        if fast_path_enabled(api):
+            amenities = facade.get_all_amenities(columns=AMENITY_SUMMARY_PROJECTION.columns)
+            return json_response(AMENITY_SUMMARY_PROJECTION.to_dicts(amenities), 200, headers)
         amenities = facade.get_all_amenities()
         return [
             {
@@ -46,7 +57,7 @@ class AmenityList(Resource):
                 'name': amenity.name
             }
             for amenity in amenities
-        ], 200
+        ], 200, headers
 
 @api.route('/<string:amenity_id>')
 class AmenityResource(Resource):
@@ -57,10 +68,14 @@ class AmenityResource(Resource):
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
+        not_modified, headers = validators(make_etag(amenity.id, amenity.updated_at),
+                                           amenity.updated_at)
+        if not_modified:
+            return None, 304, headers
         return {
             'id': amenity.id,
             'name': amenity.name
-        }, 200
+        }, 200, headers
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, 'Amenity updated successfully')
@@ -86,7 +101,31 @@ class AmenityResource(Resource):
 
 @api.route('/<amenity_id>/places/')
 class AmenityPlaces(Resource):
+    @api.doc(params={
+        'limit': 'Page size (default 20, max 100)',
+        'cursor': 'Cursor returned as next_cursor by the previous page'
+    })
+    @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
-        """Get all places that have this amenity"""
-        places = facade.get_places_by_amenity(amenity_id)
-        return [place.to_dict() for place in places], 200
\ No newline at end of file
+        """Get a page of places that have this amenity"""
+        if not facade.get_amenity(amenity_id):
+            return {'error': 'Amenity not found'}, 404
+        fast = fast_path_enabled(api)
+        try:
+            places, next_cursor = facade.get_places_by_amenity(
+                amenity_id,
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor'),
+                columns=PLACE_PROJECTION.columns if fast else None
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if fast:
+            return json_response({
+                'places': PLACE_PROJECTION.to_dicts(places),
+                'next_cursor': next_cursor
+            })
+        return {
+            'places': [place.to_dict() for place in places],
+            'next_cursor': next_cursor
+        }, 200
\ No newline at end of file
@@ -1,10 +1,13 @@
+import math
 from flask_restx import Namespace, Resource, fields
 from flask import request, jsonify
-from app.services.facade import HBnBFacade
-from flask_jwt_extended import create_access_token
+from app.services import facade
+from app.passwords import PasswordHasherBusy
+from app.api.throttle import get_login_throttle
+from app.api.blocklist import get_blocklist
+from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 
 api = Namespace('auth', description='Authentication operations')
-facade = HBnBFacade()
 
 # Modèles pour la validation
 user_registration = api.model('UserRegistration', {
@@ -30,6 +33,8 @@ class Register(Resource):
             return user.to_dict(), 201
         except ValueError as e:
             return {'message': str(e)}, 400
+        except PasswordHasherBusy as e:
+            return {'message': str(e)}, 503, {'Retry-After': '1'}
 
 @api.route('/login') 
 class Login(Resource):
@@ -38,9 +43,22 @@ class Login(Resource):
         """User login"""
         try:
             data = request.get_json()
-            user = facade.get_user_by_email(data['email'])
+            # Throttled clients are turned away before any database or bcrypt work
+            throttle = get_login_throttle()
+            if throttle is not None:
+                wait = throttle.retry_after(request.remote_addr, data['email'])
+                if wait:
+                    return {'message': 'Too many failed login attempts'}, 429, \
+                        {'Retry-After': str(math.ceil(wait))}
+
+            user = facade.authenticate(data['email'], data['password'])
+            if throttle is not None:
+                if user:
+                    throttle.succeeded(data['email'])
+                else:
+                    throttle.failed(request.remote_addr, data['email'])
             
-            if user and user.check_password(data['password']):  # ← Utiliser la méthode du modèle
+            if user:
                 access_token = create_access_token(
                     identity=user.id,
                     additional_claims={
@@ -55,5 +73,17 @@ class Login(Resource):
             
             return {'message': 'Invalid credentials'}, 401
             
+        except PasswordHasherBusy as e:
+            return {'message': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
-            return {'message': str(e)}, 400
\ No newline at end of file
+            return {'message': str(e)}, 400
+
+@api.route('/logout')
+class Logout(Resource):
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def post(self):
+        """Revoke the current access token"""
+        claims = get_jwt()
+        get_blocklist().revoke(claims['jti'], claims.get('exp', math.inf))
+        return {'message': 'Successfully logged out'}, 200
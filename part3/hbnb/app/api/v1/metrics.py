@@ -0,0 +1,32 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.persistence.cache import get_cache
+from app.persistence.engine import pool_stats
+from app.persistence.replicas import get_replica_router
+from app.api.throttle import get_login_throttle
+from app.api.blocklist import get_blocklist
+
+api = Namespace('metrics', description='Runtime metrics of this worker (admin only)')
+
+
+@api.route('/')
+class Metrics(Resource):
+    @api.doc(security='Bearer')
+    @api.response(200, 'Metrics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Get the runtime counters of this worker process"""
+        claims = get_jwt()
+        if not claims.get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        cache = get_cache()
+        throttle = get_login_throttle()
+        router = get_replica_router()
+        return {
+            'cache': cache.stats() if cache is not None else None,
+            'db_pool': pool_stats(),
+            'read_replicas': router.stats() if router is not None else None,
+            'login_throttle': throttle.stats() if throttle is not None else None,
+            'token_blocklist': get_blocklist().stats()
+        }, 200
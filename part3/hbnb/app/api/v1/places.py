@@ -1,10 +1,15 @@
 from flask_restx import Namespace, Resource, fields
-from flask import request
+from flask import current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.api.conditional import make_etag, validators
+from app.services.importer import clamp_batch_size, read_csv, read_ndjson
+from app.api.serialization import (
+    PLACE_PROJECTION, REVIEW_PROJECTION, fast_path_enabled, json_response,
+    stream_format, stream_response
+)
 
 api = Namespace('places', description='Place operations')
-facade = HBnBFacade()
 
 # Modèle pour la création de place
 place_model = api.model('Place', {
@@ -15,6 +20,29 @@ place_model = api.model('Place', {
     'longitude': fields.Float(required=True, description='Longitude')
 })
 
+
+def _float_arg(name):
+    """Read an optional float query parameter"""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+
+def _bbox_args():
+    """Read the bounding box query parameters (all four or none)"""
+    names = ('min_lat', 'min_lng', 'max_lat', 'max_lng')
+    values = [_float_arg(name) for name in names]
+    if all(v is None for v in values):
+        return None
+    if any(v is None for v in values):
+        raise ValueError("Bounding box requires min_lat, min_lng, max_lat and max_lng")
+    return tuple(values)
+
+
 @api.route('/')
 class PlaceList(Resource):
     def options(self):
@@ -34,11 +62,136 @@ class PlaceList(Resource):
         except ValueError as e:
             api.abort(400, str(e))
 
-    @api.doc('list_places')
+    @api.doc('list_places', params={
+        'limit': 'Page size (default 20, max 100)',
+        'cursor': 'Cursor returned as next_cursor by the previous page',
+        'min_price': 'Minimum price per night',
+        'max_price': 'Maximum price per night',
+        'min_lat': 'Bounding box south edge',
+        'max_lat': 'Bounding box north edge',
+        'min_lng': 'Bounding box west edge',
+        'max_lng': 'Bounding box east edge',
+        'amenities': 'Comma-separated amenity IDs or names',
+        'amenities_match': 'all (default) or any',
+        'stream': 'true to stream every matching place as one chunked JSON response '
+                  '(or send Accept: application/x-ndjson), limit is then ignored'
+    })
     def get(self):
-        """Get all places"""
-        places = facade.get_all_places()
-        return [place.to_dict() for place in places], 200
+        """Get a page of places, or stream all of them"""
+        streamed = stream_format()
+        version, changed_at = facade.get_collection_version('places')
+        not_modified, headers = validators(
+            make_etag('places', version, request.full_path, streamed), changed_at)
+        headers['Vary'] = 'Accept'
+        if not_modified:
+            return None, 304, headers
+        fast = fast_path_enabled(api)
+        try:
+            limit = request.args.get('limit', type=int)
+            min_price = _float_arg('min_price')
+            max_price = _float_arg('max_price')
+            bbox = _bbox_args()
+            amenities = [a.strip() for a in request.args.get('amenities', '').split(',') if a.strip()]
+            match = request.args.get('amenities_match', 'all')
+            if match not in ('all', 'any'):
+                raise ValueError("amenities_match must be 'all' or 'any'")
+            if streamed:
+                rows = facade.iter_places(
+                    PLACE_PROJECTION.columns,
+                    cursor=request.args.get('cursor'),
+                    min_price=min_price,
+                    max_price=max_price,
+                    bbox=bbox,
+                    amenities=amenities,
+                    match_all=match == 'all',
+                    batch_size=current_app.config['STREAM_BATCH_SIZE']
+                )
+                return stream_response(rows, PLACE_PROJECTION, streamed,
+                                       ('places', {'next_cursor': None}), headers)
+            places, next_cursor = facade.get_places_page(
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                min_price=min_price,
+                max_price=max_price,
+                bbox=bbox,
+                amenities=amenities,
+                match_all=match == 'all',
+                columns=PLACE_PROJECTION.columns if fast else None
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        if fast:
+            return json_response({
+                'places': PLACE_PROJECTION.to_dicts(places),
+                'next_cursor': next_cursor
+            }, 200, headers)
+        return {
+            'places': [place.to_dict() for place in places],
+            'next_cursor': next_cursor
+        }, 200, headers
+
+@api.route('/bulk')
+class PlaceBulkImport(Resource):
+    def options(self):
+        return {}, 200
+    @api.doc('bulk_import_places', security='Bearer', params={
+        'batch_size': 'Rows per INSERT and commit (default 1000, max 5000)'
+    })
+    @jwt_required()
+    def post(self):
+        """Import places from an NDJSON (application/x-ndjson) or CSV (text/csv) body"""
+        current_user_id = get_jwt_identity()
+        is_admin = get_jwt().get('is_admin', False)
+        try:
+            batch_size = clamp_batch_size(request.args.get('batch_size', type=int),
+                                          current_app.config['IMPORT_MAX_BATCH_SIZE'])
+        except ValueError as e:
+            api.abort(400, str(e))
+        reader = read_csv if request.mimetype == 'text/csv' else read_ndjson
+
+        def rows():
+            for line, row in reader(request.stream):
+                # Only admins may import places on behalf of other users
+                if isinstance(row, dict) and not (is_admin and row.get('owner_id')):
+                    row['owner_id'] = current_user_id
+                yield line, row
+
+        try:
+            report = facade.bulk_import('places', rows(), batch_size)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return report.to_dict(), 200
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    def options(self):
+        return {}, 200
+    @api.doc('search_places', params={
+        'lat': 'Center latitude',
+        'lng': 'Center longitude',
+        'radius_km': 'Search radius in kilometers (max 200)',
+        'limit': 'Page size (default 20, max 100)',
+        'cursor': 'Cursor returned as next_cursor by the previous page'
+    })
+    def get(self):
+        """Search places around a point, closest first"""
+        try:
+            lat, lng, radius_km = (_float_arg(name) for name in ('lat', 'lng', 'radius_km'))
+            if lat is None or lng is None or radius_km is None:
+                raise ValueError("lat, lng and radius_km are required")
+            results, next_cursor = facade.search_places_nearby(
+                lat, lng, radius_km,
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor')
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        places = []
+        for place, distance in results:
+            place_dict = place.to_dict()
+            place_dict['distance_km'] = round(distance, 3)
+            places.append(place_dict)
+        return {'places': places, 'next_cursor': next_cursor}, 200
 
 @api.route('/<place_id>')
 @api.param('place_id', 'The place identifier')
@@ -47,11 +200,15 @@ class PlaceResource(Resource):
         return {}, 200
     @api.doc('get_place')
     def get(self, place_id):
-        """Get place by ID"""
-        place = facade.get_place(place_id)
+        """Get place by ID with its owner, amenities and reviews embedded"""
+        place = facade.get_place_detail(place_id)
         if not place:
             api.abort(404, 'Place not found')
-        return place.to_dict(), 200
+        parts, last_modified = facade.place_detail_version(place)
+        not_modified, headers = validators(make_etag(*parts), last_modified)
+        if not_modified:
+            return None, 304, headers
+        return facade.place_detail_dict(place), 200, headers
 
     @api.doc(security='Bearer')
     @jwt_required()
@@ -91,13 +248,36 @@ class PlaceResource(Resource):
 class PlaceReviews(Resource):
     def options(self, place_id):
         return {}, 200
-    @api.doc('get_place_reviews')
+    @api.doc('get_place_reviews', params={
+        'limit': 'Page size (default 20, max 100)',
+        'cursor': 'Cursor returned as next_cursor by the previous page'
+    })
     def get(self, place_id):
-        """Get all reviews for a place"""
-        reviews = facade.get_reviews_by_place(place_id)
-        if reviews is None:
-            reviews = []
-        return [review.to_dict() for review in reviews], 200
+        """Get a page of reviews for a place"""
+        version, changed_at = facade.get_collection_version('reviews')
+        not_modified, headers = validators(
+            make_etag('reviews', version, request.full_path), changed_at)
+        if not_modified:
+            return None, 304, headers
+        fast = fast_path_enabled(api)
+        try:
+            reviews, next_cursor = facade.get_reviews_by_place(
+                place_id,
+                limit=request.args.get('limit', type=int),
+                cursor=request.args.get('cursor'),
+                columns=REVIEW_PROJECTION.columns if fast else None
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        if fast:
+            return json_response({
+                'reviews': REVIEW_PROJECTION.to_dicts(reviews),
+                'next_cursor': next_cursor
+            }, 200, headers)
+        return {
+            'reviews': [review.to_dict() for review in reviews],
+            'next_cursor': next_cursor
+        }, 200, headers
 
 @api.route('/<place_id>/amenities')
 @api.param('place_id', 'The place identifier')
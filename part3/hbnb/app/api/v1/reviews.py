@@ -1,10 +1,14 @@
 from flask_restx import Namespace, Resource, fields
-from flask import request
+from flask import current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.services.facade import DuplicateReviewError
+from app.api.conditional import make_etag, validators
+from app.api.serialization import (
+    REVIEW_PROJECTION, fast_path_enabled, json_response, stream_format, stream_response
+)
 
 api = Namespace('reviews', description='Review operations')
-facade = HBnBFacade()
 
 review_model = api.model('Review', {
     'text': fields.String(required=True, description='Review text'),
@@ -33,17 +37,27 @@ class ReviewList(Resource):
                 return {'message': "You can't review your own place"}, 403
 
             # Règle métier : ne pas reviewer deux fois le même place
-            if facade.has_user_reviewed_place(current_user_id, review_data['place_id']) and not claims.get('is_admin', False):
-                return {'message': "You can't review the same place twice"}, 403
-
+            # (garantie par la contrainte UNIQUE(user_id, place_id), admins compris)
             try:
                 new_review = facade.create_review(review_data)
                 return new_review.to_dict(), 201
+            except DuplicateReviewError as e:
+                return {'message': str(e)}, 403
             except Exception as e:
                 return {'message': str(e)}, 400
 
+        @api.doc(params={'stream': 'true to send the list as a chunked response '
+                                   '(or send Accept: application/x-ndjson)'})
         def get(self):
             """Get all reviews"""
+            streamed = stream_format()
+            if streamed:
+                reviews = facade.iter_reviews(REVIEW_PROJECTION.columns,
+                                              current_app.config['STREAM_BATCH_SIZE'])
+                return stream_response(reviews, REVIEW_PROJECTION, streamed)
+            if fast_path_enabled(api):
+                reviews = facade.get_all_reviews(columns=REVIEW_PROJECTION.columns)
+                return json_response(REVIEW_PROJECTION.to_dicts(reviews))
             reviews = facade.get_all_reviews()
             return [review.to_dict() for review in reviews], 200
 
@@ -56,7 +70,11 @@ class ReviewResource(Resource):
             review = facade.get_review(review_id)
             if not review:
                 return {'message': 'Review not found'}, 404
-            return review.to_dict(), 200
+            not_modified, headers = validators(make_etag(review.id, review.updated_at),
+                                               review.updated_at)
+            if not_modified:
+                return None, 304, headers
+            return review.to_dict(), 200, headers
 
         @jwt_required()
         def put(self, review_id):
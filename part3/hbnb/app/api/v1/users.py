@@ -1,6 +1,11 @@
 from flask_restx import Namespace, Resource, fields
+from flask import current_app, request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from app.services.facade import HBnBFacade
+from app.services import facade
+from app.api.serialization import (
+    PLACE_PROJECTION, REVIEW_PROJECTION, USER_PROJECTION, fast_path_enabled, json_response,
+    stream_format, stream_response
+)
 
 api = Namespace('users', description='User operations')
 
@@ -23,15 +28,25 @@ user_response_model = api.model('UserResponse', {
     'updated_at': fields.String(description='Last update timestamp')
 })
 
-facade = HBnBFacade()
-
 @api.route('/')
 class UserList(Resource):
-    @api.doc('list_users', security='Bearer')
-    @api.marshal_list_with(user_response_model)
+    @api.doc('list_users', security='Bearer', params={
+        'stream': 'true to send the list as a chunked response '
+                  '(or send Accept: application/x-ndjson)'
+    })
+    @api.response(200, 'Success', [user_response_model])
     @jwt_required()
     def get(self):
         """Retrieve all users (Protected)"""
+        streamed = stream_format()
+        if streamed:
+            users = facade.iter_users(USER_PROJECTION.columns,
+                                      current_app.config['STREAM_BATCH_SIZE'])
+            return stream_response(users, USER_PROJECTION, streamed)
+        # to_dict() already has exactly the fields of user_response_model
+        if fast_path_enabled(api):
+            users = facade.get_all_users(columns=USER_PROJECTION.columns)
+            return json_response(USER_PROJECTION.to_dicts(users))
         users = facade.get_all_users()
         return [user.to_dict() for user in users], 200
 
@@ -99,41 +114,110 @@ class UserResource(Resource):
         
         if not is_admin:
             api.abort(403, 'Admin privileges required')
-        
+
+        # Large hosts are deleted in the background, poll the returned task
+        threshold = current_app.config['USER_DELETE_BACKGROUND_THRESHOLD']
+        if facade.count_places_by_owner(user_id) > threshold:
+            task = facade.delete_user_in_background(
+                user_id, current_app.config['USER_DELETE_BATCH_SIZE'])
+            if not task:
+                api.abort(404, 'User not found')
+            return task.to_dict(), 202, {'Location': f'/api/v1/users/deletions/{task.id}'}
+
         if not facade.delete_user(user_id):
             api.abort(404, 'User not found')
         return '', 204
 
+
+@api.route('/deletions/<task_id>')
+class UserDeletion(Resource):
+    @api.doc('get_user_deletion', security='Bearer')
+    @api.response(200, 'Progress of a background user deletion')
+    @api.response(404, 'Unknown task')
+    @jwt_required()
+    def get(self, task_id):
+        """Follow a background user deletion (Admin only)"""
+        if not get_jwt().get('is_admin', False):
+            api.abort(403, 'Admin privileges required')
+        task = facade.get_task(task_id)
+        if not task or task.kind != 'delete_user':
+            api.abort(404, 'Task not found')
+        return task.to_dict(), 200
+
+def _places_page(user_id):
+    """Build one page of a user's places from the limit/cursor query params"""
+    fast = fast_path_enabled(api)
+    try:
+        page = facade.get_places_by_owner(
+            user_id,
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            columns=PLACE_PROJECTION.columns if fast else None
+        )
+    except ValueError as e:
+        api.abort(400, str(e))
+    if page is None:
+        api.abort(404, 'User not found')
+    places, next_cursor, total_count, total_exact = page
+    body = {
+        'next_cursor': next_cursor,
+        'total_count': total_count,
+        'total_exact': total_exact
+    }
+    if fast:
+        body['places'] = PLACE_PROJECTION.to_dicts(places)
+        return json_response(body)
+    body['places'] = [place.to_dict() for place in places]
+    return body, 200
+
 @api.route('/<user_id>/places/')
 class UserPlaces(Resource):
     @jwt_required()
     def get(self, user_id):
-        """Get all places owned by a user"""
-        places = facade.get_places_by_owner(user_id)
-        return [place.to_dict() for place in places], 200
+        """Get a page of the places owned by a user"""
+        return _places_page(user_id)
 
 @api.route('/me/places')  
 class MyPlaces(Resource):
     @jwt_required()
     def get(self):
-        """Get current user's places"""
+        """Get a page of the current user's places"""
         current_user_id = get_jwt_identity()
-        places = facade.get_places_by_owner(current_user_id)
-        return [place.to_dict() for place in places], 200
+        return _places_page(current_user_id)
+
+def _reviews_page(user_id):
+    """Build one page of a user's reviews from the limit/cursor query params"""
+    fast = fast_path_enabled(api)
+    try:
+        reviews, next_cursor = facade.get_reviews_by_user(
+            user_id,
+            limit=request.args.get('limit', type=int),
+            cursor=request.args.get('cursor'),
+            columns=REVIEW_PROJECTION.columns if fast else None
+        )
+    except ValueError as e:
+        api.abort(400, str(e))
+    if fast:
+        return json_response({
+            'reviews': REVIEW_PROJECTION.to_dicts(reviews),
+            'next_cursor': next_cursor
+        })
+    return {
+        'reviews': [review.to_dict() for review in reviews],
+        'next_cursor': next_cursor
+    }, 200
 
 @api.route('/<user_id>/reviews')
 class UserReviews(Resource):
     @jwt_required()
     def get(self, user_id):
-        """Get all reviews by a user"""
-        reviews = facade.get_reviews_by_user(user_id)
-        return [review.to_dict() for review in reviews], 200
+        """Get a page of reviews by a user"""
+        return _reviews_page(user_id)
 
 @api.route('/me/reviews')
 class MyReviews(Resource):
     @jwt_required()
     def get(self):
-        """Get current user's reviews"""
+        """Get a page of the current user's reviews"""
         current_user_id = get_jwt_identity()
-        reviews = facade.get_reviews_by_user(current_user_id)
-        return [review.to_dict() for review in reviews], 200
\ No newline at end of file
+        return _reviews_page(current_user_id)
\ No newline at end of file
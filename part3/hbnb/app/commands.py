@@ -0,0 +1,159 @@
+"""
+Maintenance commands, available as `flask hbnb <command>`
+"""
+import click
+from flask.cli import AppGroup
+
+hbnb_cli = AppGroup('hbnb', help='HBnB maintenance commands')
+
+
+@hbnb_cli.command('rebuild-ratings')
+def rebuild_ratings():
+    """Add the places rating columns if missing and recompute them from the reviews table"""
+    from sqlalchemy import inspect, text
+    from app.extensions import db
+    from app.services.facade import HBnBFacade
+    columns = {column['name'] for column in inspect(db.engine).get_columns('places')}
+    for name in ['review_count', 'rating_sum'] + [f'rating_{r}_count' for r in range(1, 6)]:
+        if name not in columns:
+            db.session.execute(text(f'ALTER TABLE places ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0'))
+            click.echo(f"Added column places.{name}")
+    db.session.commit()
+    rated = HBnBFacade().rebuild_rating_stats()
+    click.echo(f"Rating aggregates rebuilt ({rated} places with reviews)")
+
+
+@hbnb_cli.command('rebuild-geo-cells')
+def rebuild_geo_cells():
+    """Add places.geo_cell and its index if missing and recompute it for every place"""
+    from sqlalchemy import inspect, text
+    from app.extensions import db
+    from app.models.place import Place
+    from app.services.facade import HBnBFacade
+    columns = {column['name'] for column in inspect(db.engine).get_columns('places')}
+    if 'geo_cell' not in columns:
+        db.session.execute(text('ALTER TABLE places ADD COLUMN geo_cell INTEGER'))
+        db.session.commit()
+        click.echo("Added column places.geo_cell")
+    for index in Place.__table__.indexes:
+        if index.name == 'idx_places_geo_cell':
+            index.create(db.engine, checkfirst=True)
+    updated = HBnBFacade().rebuild_geo_cells()
+    click.echo(f"Geo cells rebuilt ({updated} places)")
+
+
+@hbnb_cli.command('rebuild-place-counts')
+def rebuild_place_counts():
+    """Add users.place_count if missing and recompute it from the places table"""
+    from sqlalchemy import inspect, text
+    from app.extensions import db
+    from app.models.place import Place
+    from app.services.facade import HBnBFacade
+    columns = {column['name'] for column in inspect(db.engine).get_columns('users')}
+    if 'place_count' not in columns:
+        db.session.execute(text('ALTER TABLE users ADD COLUMN place_count INTEGER'))
+        db.session.commit()
+        click.echo("Added column users.place_count")
+    for index in Place.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    owners = HBnBFacade().rebuild_place_counts()
+    click.echo(f"Place counts rebuilt ({owners} users with places)")
+
+
+@hbnb_cli.command('backfill-emails')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per UPDATE and commit')
+def backfill_emails(batch_size):
+    """Add and fill users.email_normalized, then create its unique index"""
+    from sqlalchemy import inspect, text
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.repositories import UserRepository
+    columns = {column['name'] for column in inspect(db.engine).get_columns('users')}
+    if 'email_normalized' not in columns:
+        db.session.execute(text('ALTER TABLE users ADD COLUMN email_normalized VARCHAR(120)'))
+        db.session.commit()
+        click.echo("Added column users.email_normalized")
+    repository = UserRepository()
+    updated = repository.backfill_email_normalized(batch_size)
+    click.echo(f"Normalized emails backfilled ({updated} users)")
+    duplicates = repository.duplicate_normalized_emails()
+    if duplicates:
+        raise click.ClickException(
+            "Emails differing only by case must be merged before the unique index "
+            f"can be created: {', '.join(duplicates)}")
+    for index in User.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    click.echo("Unique index idx_users_email_normalized in place")
+
+
+@hbnb_cli.command('add-cascades')
+def add_cascades():
+    """Rebuild the foreign keys created without the ON DELETE CASCADE of the models"""
+    from app.extensions import db
+    from app.persistence.cascades import add_missing_cascades
+    db.session.remove()
+    try:
+        tables = add_missing_cascades(db.engine)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if tables:
+        click.echo(f"ON DELETE CASCADE foreign keys in place ({', '.join(tables)} rebuilt)")
+    else:
+        click.echo("ON DELETE CASCADE foreign keys already in place")
+
+
+@hbnb_cli.command('seed')
+@click.option('--scale', type=click.FloatRange(min=0, min_open=True), default=1, show_default=True,
+              help='Dataset size, 1 is 1,000 users and 2,500 places (~16k rows)')
+@click.option('--seed', 'random_seed', type=int, default=42, show_default=True,
+              help='Seed of the random generator, same seed same dataset')
+@click.option('--batch-size', default=5000, show_default=True, help='Places per commit')
+@click.option('--reset', is_flag=True, help='Drop and recreate the tables first')
+def seed(scale, random_seed, batch_size, reset):
+    """Fill the database with a reproducible synthetic dataset for benchmarks"""
+    from flask import current_app
+    from app.extensions import db
+    from app.persistence.versions import init_versions
+    from app.services.facade import HBnBFacade
+    from app.services.seeder import SEED_PASSWORD, ADMIN_EMAIL
+    if reset:
+        db.session.remove()
+        db.drop_all(bind_key=None)
+        db.create_all(bind_key=None)
+        init_versions(current_app._get_current_object())
+
+    def progress(report):
+        click.echo(f"  {report.counts['places']} places, {report.counts['reviews']} reviews",
+                   err=True)
+
+    try:
+        report = HBnBFacade().seed_dataset(scale, random_seed, batch_size, on_batch=progress)
+    except ValueError as e:
+        raise click.ClickException(f"{e}, use --reset to replace its data")
+    counts = ', '.join(f"{count} {table}" for table, count in report.counts.items())
+    click.echo(f"Seeded {counts} in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s)")
+    click.echo(f"Log in as {ADMIN_EMAIL} or userN@example.com with '{SEED_PASSWORD}'")
+
+
+@hbnb_cli.command('import')
+@click.argument('kind', type=click.Choice(['places', 'amenities', 'reviews']))
+@click.argument('source', type=click.File('rb'))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']),
+              help='Input format (default: guessed from the file extension)')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows per INSERT and commit')
+def import_rows(kind, source, fmt, batch_size):
+    """Bulk import places, amenities or reviews from an NDJSON or CSV file"""
+    from app.services.facade import HBnBFacade
+    from app.services.importer import read_csv, read_ndjson
+    if fmt is None:
+        fmt = 'csv' if getattr(source, 'name', '').lower().endswith('.csv') else 'ndjson'
+    rows = read_csv(source) if fmt == 'csv' else read_ndjson(source)
+
+    def progress(report):
+        click.echo(f"  {report.inserted} inserted, {report.failed} rejected", err=True)
+
+    report = HBnBFacade().bulk_import(kind, rows, batch_size, on_batch=progress)
+    for error in report.errors:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report.inserted} {kind}, rejected {report.failed} "
+               f"in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s)")
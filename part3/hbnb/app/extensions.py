@@ -2,11 +2,12 @@
 Flask extensions initialization
 This module prevents circular imports by centralizing extension instances
 """
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app.persistence.replicas import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
-bcrypt = Bcrypt()
+# Objects stay usable after commit: they live as long as the request session.
+# The session class routes the reads of GET requests to READ_REPLICA_BINDS.
+db = SQLAlchemy(session_options={'expire_on_commit': False, 'class_': RoutingSession})
 jwt = JWTManager()
\ No newline at end of file
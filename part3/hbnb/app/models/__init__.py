@@ -0,0 +1,5 @@
+# Import every mapped model so relationships resolve whatever model is used first
+from app.models.user import User
+from app.models.place import Place
+from app.models.review import Review
+from app.models.amenity import Amenity, place_amenity
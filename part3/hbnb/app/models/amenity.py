@@ -4,8 +4,8 @@ from sqlalchemy.orm import validates
 
 # Association table for many-to-many relationship between Place and Amenity
 place_amenity = db.Table('place_amenity',
-    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('place_id', db.String(36), db.ForeignKey('places.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id', ondelete='CASCADE'), primary_key=True)
 )
 
 
@@ -16,8 +16,9 @@ class Amenity(BaseModel):
 
     name = db.Column(db.String(50), nullable=False, unique=True)
 
-    # Relationship
-    places = db.relationship('Place', secondary=place_amenity, back_populates='amenities')
+    # Relationship, the association rows go with ON DELETE CASCADE
+    places = db.relationship('Place', secondary=place_amenity, back_populates='amenities',
+                             passive_deletes=True)
 
     def __init__(self, name):
         """Initialize an Amenity instance"""
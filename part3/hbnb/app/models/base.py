@@ -4,6 +4,7 @@ Base model for all entities in the application
 import uuid
 from datetime import datetime
 from app.extensions import db
+from app.persistence.unit_of_work import save_changes
 
 class BaseModel(db.Model):
     """
@@ -18,12 +19,12 @@ class BaseModel(db.Model):
     def save(self):
         """Save the current instance to the database"""
         db.session.add(self)
-        db.session.commit()
+        save_changes()
     
     def delete(self):
         """Delete the current instance from the database"""
         db.session.delete(self)
-        db.session.commit()
+        save_changes()
     
     def update(self, data):
         """Update the current instance with the provided data"""
@@ -31,7 +32,7 @@ class BaseModel(db.Model):
             if hasattr(self, key) and key not in ['id', 'created_at']:
                 setattr(self, key, value)
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        save_changes()
     
     def to_dict(self):
         """Convert the instance to a dictionary"""
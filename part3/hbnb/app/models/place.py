@@ -1,5 +1,6 @@
 from app.extensions import db
 from app.models.base import BaseModel
+from app.persistence.geo import geo_cell
 from sqlalchemy.orm import validates
 
 
@@ -7,17 +8,39 @@ class Place(BaseModel):
     """Place model for storing place information"""
 
     __tablename__ = 'places'
+    __table_args__ = (
+        # An owner's places in keyset order, also used by ON DELETE CASCADE
+        db.Index('idx_places_owner_id', 'owner_id', 'created_at', 'id'),
+        db.Index('idx_places_created_at_id', 'created_at', 'id'),
+        db.Index('idx_places_price', 'price'),
+        db.Index('idx_places_geo_cell', 'geo_cell', 'id'),
+    )
 
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(500), nullable=True)
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    # Grid cell of (latitude, longitude), see app.persistence.geo
+    geo_cell = db.Column(db.Integer, nullable=True)
 
-    # Relationships
-    reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
-    amenities = db.relationship('Amenity', secondary='place_amenity', back_populates='places', lazy='subquery')
+    # Rating aggregates, maintained by the facade with every review write
+    review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Relationships, loaded on access: views that need them eagerly opt in
+    # with a load plan (see SQLAlchemyRepository.load_options). Deleting a
+    # place leaves its reviews and amenity links to ON DELETE CASCADE.
+    reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan',
+                              passive_deletes=True)
+    amenities = db.relationship('Amenity', secondary='place_amenity', back_populates='places',
+                                lazy='select', passive_deletes=True)
 
     def __init__(self, title, description, price, latitude, longitude, owner_id):
         """Initialize a Place instance"""
@@ -28,6 +51,10 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner_id = owner_id
+        self.review_count = 0
+        self.rating_sum = 0
+        for rating in range(1, 6):
+            setattr(self, f'rating_{rating}_count', 0)
 
     @validates('title')
     def validate_title(self, key, title):
@@ -50,6 +77,7 @@ class Place(BaseModel):
         """Validate latitude is within valid range"""
         if not -90 <= latitude <= 90:
             raise ValueError("Latitude must be between -90 and 90")
+        self.geo_cell = geo_cell(latitude, self.longitude)
         return latitude
 
     @validates('longitude')
@@ -57,8 +85,44 @@ class Place(BaseModel):
         """Validate longitude is within valid range"""
         if not -180 <= longitude <= 180:
             raise ValueError("Longitude must be between -180 and 180")
+        self.geo_cell = geo_cell(self.latitude, longitude)
         return longitude
 
+    def record_rating(self, added=None, removed=None):
+        """
+        Update the rating aggregates for a review written, changed or deleted
+
+        Values are set as SQL expressions so concurrent reviews increment
+        the counters atomically in the same transaction as the review.
+
+        Args:
+            added: Rating of the review added (or new rating)
+            removed: Rating of the review removed (or old rating)
+        """
+        deltas = {}
+        for rating, sign in ((added, 1), (removed, -1)):
+            if rating is None:
+                continue
+            for column, delta in (('review_count', sign),
+                                  ('rating_sum', sign * rating),
+                                  (f'rating_{rating}_count', sign)):
+                deltas[column] = deltas.get(column, 0) + delta
+        for column, delta in deltas.items():
+            if delta:
+                setattr(self, column, getattr(type(self), column) + delta)
+
+    @property
+    def rating_avg(self):
+        """Average rating rounded to 2 decimals, None without reviews"""
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @property
+    def rating_histogram(self):
+        """Number of reviews per rating, keyed '1' to '5'"""
+        return {str(r): getattr(self, f'rating_{r}_count') for r in range(1, 6)}
+
     def to_dict(self):
         """Convert Place instance to dictionary"""
         return {
@@ -69,6 +133,8 @@ class Place(BaseModel):
             'latitude': self.latitude,
             'longitude': self.longitude,
             'owner_id': self.owner_id,
+            'rating_avg': self.rating_avg,
+            'review_count': self.review_count,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -7,11 +7,16 @@ class Review(BaseModel):
     """Review model for storing review information"""
 
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'place_id', name='uq_reviews_user_place'),
+        db.Index('idx_reviews_user_id', 'user_id'),
+        db.Index('idx_reviews_place_id', 'place_id'),
+    )
 
     text = db.Column(db.String(500), nullable=False)
     rating = db.Column(db.Integer, nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
 
     def __init__(self, text, rating, place_id, user_id):
         """Initialize a Review instance"""
@@ -1,32 +1,60 @@
-from sqlalchemy import Column, String, Boolean, DateTime
-from sqlalchemy.orm import relationship
-from app.extensions import db, bcrypt
+from sqlalchemy import Column, String, Boolean, DateTime, Integer
+from sqlalchemy.orm import relationship, validates
+from app.extensions import db
+from app.passwords import get_password_hasher
 from datetime import datetime
 import uuid
 
+
+def normalize_email(email):
+    """Canonical form of an email address used for lookups and uniqueness"""
+    return email.strip().lower()
+
+
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('idx_users_email_normalized', 'email_normalized', unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
     email = Column(String(120), nullable=False, unique=True)
+    # normalize_email(email), set on every write of email
+    email_normalized = Column(String(120), nullable=True)
     password = Column(String(128), nullable=False)  # ← Ajouter cette ligne
     is_admin = Column(Boolean, default=False, nullable=False)
+    # Number of places owned, maintained by the facade with every place
+    # write; NULL until counted for rows older than the column
+    place_count = Column(Integer, default=0, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
-    # Relations
-    places = relationship('Place', backref='user', lazy='select', cascade='all, delete-orphan')
-    reviews = relationship('Review', backref='user', lazy='select', cascade='all, delete-orphan')
+    # Relations, deleted with the user by ON DELETE CASCADE without being loaded
+    places = relationship('Place', backref='owner', lazy='select', cascade='all, delete-orphan',
+                          passive_deletes=True)
+    reviews = relationship('Review', backref='user', lazy='select', cascade='all, delete-orphan',
+                           passive_deletes=True)
+
+    @validates('email')
+    def validate_email(self, key, email):
+        """Keep email_normalized in step with email"""
+        if email is not None:
+            self.email_normalized = normalize_email(email)
+        return email
 
     def hash_password(self, password):
         """Hash password using bcrypt"""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = get_password_hasher().hash(password)
     
     def check_password(self, password):
         """Check password against hash"""
-        return bcrypt.check_password_hash(self.password, password)
+        return get_password_hasher().verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """True when the hash was made with another bcrypt cost than configured"""
+        return get_password_hasher().needs_rehash(self.password)
 
     def to_dict(self):
         """Convert to dictionary (sans password pour sécurité)"""
@@ -0,0 +1,130 @@
+"""
+Password hashing off the request thread
+
+bcrypt is deliberately slow, so hashing and verification run in a small
+process pool (PASSWORD_HASH_WORKERS processes) instead of the worker
+serving the request. The number of operations waiting for the pool is
+bounded; past that, callers wait up to PASSWORD_HASH_TIMEOUT seconds
+and then get PasswordHasherBusy, which the API maps to 503. An operation
+taking longer than that timeout in the pool is reported the same way.
+
+The cost factor comes from BCRYPT_LOG_ROUNDS. Hashes made with another
+cost are reported by needs_rehash() so they can be upgraded at login.
+Logins for unknown emails are checked against a dummy hash of the same
+cost (dummy_verify), so they take as long as logins for known ones.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt as _bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_ROUNDS = 12
+# Operations allowed to wait for a free worker, per worker
+QUEUE_PER_WORKER = 4
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many hashing operations are waiting for the pool"""
+
+
+def _hash(password, rounds):
+    """Hash a password (runs in a pool process)"""
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password_hash, password):
+    """Check a password against a hash (runs in a pool process)"""
+    try:
+        return _bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+class PasswordHasher:
+    """bcrypt hashing with a configurable cost, inline or in a process pool"""
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=0, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(workers, 1) * QUEUE_PER_WORKER)
+        self._dummy_hash = None
+
+    def hash(self, password):
+        """Hash a password with the configured cost"""
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password_hash, password):
+        """Return True if the password matches the hash"""
+        if not password_hash or password is None:
+            return False
+        return self._run(_verify, password_hash, password)
+
+    def dummy_verify(self, password):
+        """Spend the time of a real verification, always False"""
+        if self._dummy_hash is None or self.needs_rehash(self._dummy_hash):
+            self._dummy_hash = _hash('dummy-password', self.rounds)
+        self.verify(self._dummy_hash, password or '')
+        return False
+
+    def needs_rehash(self, password_hash):
+        """True when a hash was made with another cost than the configured one"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        """Stop the pool processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _run(self, func, *args):
+        """Run a hashing function inline, or in the pool when it has workers"""
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusy("Too many password operations in progress")
+        try:
+            future = self._get_pool().submit(func, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise PasswordHasherBusy("Password operation timed out")
+        finally:
+            self._slots.release()
+
+    def _get_pool(self):
+        """Start the pool on first use (after the server has forked its workers)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+
+def get_password_hasher():
+    """Get the hasher of the current application (inline defaults outside one)"""
+    if not has_app_context():
+        return PasswordHasher()
+    hasher = current_app.extensions.get('hbnb_password_hasher')
+    if hasher is None:
+        hasher = init_password_hasher(current_app)
+    return hasher
+
+
+def init_password_hasher(app):
+    """Create the application's hasher from its config"""
+    hasher = PasswordHasher(
+        rounds=app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 0),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+    )
+    app.extensions['hbnb_password_hasher'] = hasher
+    return hasher
@@ -0,0 +1,128 @@
+"""
+In-process bitmap index over the place_amenity association table
+
+Every place with at least one amenity gets a row number, and every amenity
+a bitmap (a Python int) with the bits of its places set. AND/OR amenity
+queries are then a few big-integer operations instead of SQL joins.
+
+Each worker process keeps its own index. It is built lazily from the
+database, kept up to date by the facade on writes, and rebuilt after
+MAX_AGE seconds to pick up writes made by other workers.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.models.amenity import place_amenity
+
+MAX_AGE = 300
+
+
+class AmenityBitmapIndex:
+    """Bitmaps of places per amenity"""
+
+    def __init__(self, max_age=MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._rows = {}
+        self._place_ids = []
+        self._bitmaps = {}
+
+    @property
+    def is_built(self):
+        """True once the index has been loaded from the database"""
+        return self._built_at is not None
+
+    def build(self):
+        """Load the whole association table (one SELECT)"""
+        rows, place_ids, bitmaps = {}, [], {}
+        pairs = db.session.execute(
+            select(place_amenity.c.place_id, place_amenity.c.amenity_id)
+        )
+        for place_id, amenity_id in pairs:
+            row = rows.get(place_id)
+            if row is None:
+                row = rows[place_id] = len(place_ids)
+                place_ids.append(place_id)
+            bitmaps[amenity_id] = bitmaps.get(amenity_id, 0) | (1 << row)
+        with self._lock:
+            self._rows, self._place_ids, self._bitmaps = rows, place_ids, bitmaps
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        """Build the index if it is missing or older than max_age"""
+        if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+            self.build()
+
+    def invalidate(self):
+        """Drop the index, it will be rebuilt on next use"""
+        with self._lock:
+            self._built_at = None
+
+    def add(self, place_id, amenity_id):
+        """Record that a place has an amenity"""
+        if not self.is_built:
+            return
+        with self._lock:
+            row = self._rows.get(place_id)
+            if row is None:
+                row = self._rows[place_id] = len(self._place_ids)
+                self._place_ids.append(place_id)
+            self._bitmaps[amenity_id] = self._bitmaps.get(amenity_id, 0) | (1 << row)
+
+    def remove_place(self, place_id):
+        """Clear a deleted place from every bitmap"""
+        if not self.is_built:
+            return
+        with self._lock:
+            row = self._rows.pop(place_id, None)
+            if row is None:
+                return
+            self._place_ids[row] = None
+            mask = ~(1 << row)
+            for amenity_id, bitmap in self._bitmaps.items():
+                self._bitmaps[amenity_id] = bitmap & mask
+
+    def remove_amenity(self, amenity_id):
+        """Drop the bitmap of a deleted amenity"""
+        with self._lock:
+            self._bitmaps.pop(amenity_id, None)
+
+    def match(self, amenity_ids, match_all=True):
+        """
+        Get the places having all (AND) or any (OR) of the amenities
+
+        Args:
+            amenity_ids: List of amenity IDs
+            match_all: True for AND, False for OR
+
+        Returns:
+            List of place IDs
+        """
+        self.ensure_built()
+        bitmaps = [self._bitmaps.get(amenity_id, 0) for amenity_id in amenity_ids]
+        if not bitmaps:
+            return []
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            result = result & bitmap if match_all else result | bitmap
+        return self._decode(result)
+
+    def _decode(self, bitmap):
+        """Turn a bitmap back into place IDs"""
+        place_ids = self._place_ids
+        found = []
+        while bitmap:
+            low = bitmap & -bitmap
+            place_id = place_ids[low.bit_length() - 1]
+            if place_id is not None:
+                found.append(place_id)
+            bitmap ^= low
+        return found
+
+
+def get_amenity_index():
+    """Get the amenity index of the current application"""
+    return current_app.extensions.setdefault('hbnb_amenity_index', AmenityBitmapIndex())
@@ -0,0 +1,316 @@
+"""
+Read-through cache for repository lookups by primary key
+
+Entries are snapshots of an object's column values, not live ORM objects,
+so they survive the end of the request session. On a hit the snapshot is
+merged into the current session without emitting SQL.
+
+Invalidation is driven by session events: every flushed update or delete
+of a cached model drops its entry, and bulk UPDATE/DELETE statements drop
+every entry of the model they target. Deletes also drop every entry of the
+models the database cascades them to (ON DELETE CASCADE).
+
+Secret columns (the user's password hash) are never cached: they are
+loaded from the database when accessed on an object built from a snapshot.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app.extensions import db
+from app.persistence import identity_map
+from app.persistence.cascades import cascaded_models
+
+
+class InMemoryCache:
+    """Bounded LRU store with a per-entry time to live"""
+
+    def __init__(self, max_entries=10000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, model_name, obj_id):
+        """Get a snapshot, None if missing or expired"""
+        key = (model_name, obj_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, model_name, obj_id, value):
+        """Store a snapshot, evicting the least recently used entries"""
+        key = (model_name, obj_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, model_name, obj_id):
+        """Drop one entry"""
+        with self._lock:
+            self._entries.pop((model_name, obj_id), None)
+
+    def clear_model(self, model_name):
+        """Drop every entry of a model"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+
+    def stats(self):
+        """Hit/miss/eviction counters"""
+        return {
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+
+class RedisCache:
+    """
+    Store speaking the Redis protocol through a redis-py compatible client
+
+    Entries expire server-side (SET ... EX ttl) and are evicted by the
+    server's maxmemory policy. Whole-model invalidation bumps a generation
+    number that is part of every key. Snapshots are stored as JSON, with
+    datetimes tagged, so reading an entry never runs code from the server.
+    """
+
+    def __init__(self, client, ttl=30, prefix='hbnb:cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, model_name, obj_id):
+        generation = self.client.get(f"{self.prefix}{model_name}:gen") or b'0'
+        if isinstance(generation, bytes):
+            generation = generation.decode('ascii')
+        return f"{self.prefix}{model_name}:{generation}:{obj_id}"
+
+    def get(self, model_name, obj_id):
+        """Get a snapshot, None if missing or expired"""
+        raw = self.client.get(self._key(model_name, obj_id))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw, object_hook=self._decode)
+
+    def set(self, model_name, obj_id, value):
+        """Store a snapshot with the configured time to live"""
+        self.client.set(self._key(model_name, obj_id), json.dumps(value, default=self._encode),
+                        ex=self.ttl)
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime):
+            return {'$datetime': value.isoformat()}
+        raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+    @staticmethod
+    def _decode(obj):
+        if obj.keys() == {'$datetime'}:
+            return datetime.fromisoformat(obj['$datetime'])
+        return obj
+
+    def delete(self, model_name, obj_id):
+        """Drop one entry"""
+        self.client.delete(self._key(model_name, obj_id))
+
+    def clear_model(self, model_name):
+        """Drop every entry of a model (old generations expire on their own)"""
+        self.client.incr(f"{self.prefix}{model_name}:gen")
+
+    def stats(self):
+        """Hit/miss counters of this process (evictions are server-side)"""
+        return {
+            'backend': 'redis',
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def create_cache(config):
+    """
+    Build the cache backend described by the application config
+
+    CACHE_BACKEND is 'memory', 'redis' or None (disabled).
+    """
+    backend = config.get('CACHE_BACKEND')
+    ttl = config.get('CACHE_TTL', 30)
+    if not backend:
+        return None
+    if backend == 'memory':
+        return InMemoryCache(config.get('CACHE_MAX_ENTRIES', 10000), ttl)
+    if backend == 'redis':
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND='redis' requires the redis package")
+        return RedisCache(redis.Redis.from_url(config['CACHE_REDIS_URL']), ttl)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}'")
+
+
+def get_cache():
+    """Get the cache of the current application, None when disabled"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('hbnb_cache')
+
+
+def invalidate(model_name, obj_id):
+    """Drop an entry now and at commit, for Core writes the session events do not see"""
+    cache = get_cache()
+    if cache is None:
+        return
+    cache.delete(model_name, obj_id)
+    db.session.info.setdefault('hbnb_cache_invalidate', set()).add((model_name, obj_id))
+
+
+def init_cache(app):
+    """Create the application's cache and hook invalidation on the session"""
+    app.extensions['hbnb_cache'] = create_cache(app.config)
+    if not event.contains(Session, 'after_flush', _invalidate_flushed):
+        event.listen(Session, 'after_flush', _invalidate_flushed)
+        event.listen(Session, 'after_commit', _invalidate_committed)
+        event.listen(Session, 'do_orm_execute', _invalidate_bulk)
+
+
+def _invalidate_flushed(session, flush_context):
+    """Drop the entries of objects updated or deleted by a flush"""
+    cache = get_cache()
+    if cache is None:
+        return
+    pending = session.info.setdefault('hbnb_cache_invalidate', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        identity = inspect(obj).identity
+        if identity:
+            key = (type(obj).__name__, identity[0])
+            cache.delete(*key)
+            pending.add(key)
+    deleted = {obj.__tablename__ for obj in session.deleted if hasattr(obj, '__tablename__')}
+    if deleted:
+        models = cascaded_models(deleted)
+        for model_name in models:
+            cache.clear_model(model_name)
+        session.info.setdefault('hbnb_cache_clear', set()).update(models)
+
+
+def _invalidate_committed(session):
+    """Drop them again once committed, in case a reader re-cached the old row"""
+    cache = get_cache()
+    pending = session.info.pop('hbnb_cache_invalidate', ())
+    models = session.info.pop('hbnb_cache_clear', ())
+    if cache is not None:
+        for key in pending:
+            cache.delete(*key)
+        for model_name in models:
+            cache.clear_model(model_name)
+
+
+def _invalidate_bulk(orm_execute_state):
+    """Bulk UPDATE/DELETE statements invalidate the whole model"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    cache = get_cache()
+    if cache is None:
+        return
+    models = {mapper.class_.__name__ for mapper in orm_execute_state.all_mappers}
+    if orm_execute_state.is_delete:
+        models |= cascaded_models({mapper.local_table.name
+                                   for mapper in orm_execute_state.all_mappers})
+    for model_name in models:
+        cache.clear_model(model_name)
+
+
+class CachedRepository:
+    """
+    Repository wrapper serving get(obj_id) from the application cache
+
+    Every other method is delegated to the wrapped repository. When the
+    application has no cache configured, get() goes straight through.
+    Columns listed in `uncached` are left out of the snapshots.
+    """
+
+    def __init__(self, repository, uncached=()):
+        self.repository = repository
+        self.model = repository.model
+        self.uncached = frozenset(uncached)
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def get(self, obj_id, include=None):
+        """Get an object by ID, from the request, the cache, then the database"""
+        cache = get_cache()
+        if include or cache is None or obj_id is None:
+            return self.repository.get(obj_id, include=include)
+
+        found, obj = identity_map.lookup(self.model, obj_id)
+        if found:
+            return obj
+
+        mapper = inspect(self.model)
+        model_name = self.model.__name__
+        snapshot = cache.get(model_name, obj_id)
+        if snapshot is not None:
+            obj = self._from_snapshot(mapper, snapshot)
+            identity_map.remember(self.model, obj_id, obj)
+            return obj
+
+        obj = self.repository.get(obj_id)
+        if obj is not None:
+            cache.set(model_name, obj_id, {
+                attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs
+                if attr.key not in self.uncached
+            })
+        return obj
+
+    def add(self, obj):
+        """Add an object (nothing cached yet for a new ID)"""
+        return self.repository.add(obj)
+
+    def update(self, obj_id, data):
+        """Update an object, its entry is dropped when the session flushes"""
+        return self.repository.update(obj_id, data)
+
+    def delete(self, obj_id):
+        """Delete an object, its entry is dropped when the session flushes"""
+        return self.repository.delete(obj_id)
+
+    @staticmethod
+    def _from_snapshot(mapper, snapshot):
+        """Attach a cached snapshot to the current session without SQL"""
+        obj = mapper.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
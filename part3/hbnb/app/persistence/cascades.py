@@ -0,0 +1,144 @@
+"""
+Tables emptied by ON DELETE CASCADE foreign keys
+
+Rows deleted by the database itself never go through the session, so the
+collection versions and the cache of the dependent tables are updated
+from the tables of the deleted parents instead. The dependencies are read
+from the foreign keys declared on the models.
+
+Databases created before the foreign keys declared ON DELETE CASCADE keep
+plain foreign keys; add_missing_cascades() rebuilds them.
+"""
+from functools import lru_cache
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import AddConstraint, CreateTable
+from app.extensions import db
+
+
+@lru_cache(maxsize=None)
+def _cascaded(table_names):
+    result = set()
+    pending = list(table_names)
+    while pending:
+        parent = pending.pop()
+        for table in db.metadata.tables.values():
+            if table.name in result:
+                continue
+            for foreign_key in table.foreign_keys:
+                if ((foreign_key.ondelete or '').upper() == 'CASCADE'
+                        and foreign_key.column.table.name == parent):
+                    result.add(table.name)
+                    pending.append(table.name)
+                    break
+    return frozenset(result - set(table_names))
+
+
+def cascaded_tables(table_names):
+    """Names of the tables whose rows the database may delete with rows of table_names"""
+    return _cascaded(frozenset(table_names))
+
+
+def cascaded_models(table_names):
+    """Names of the model classes mapped to the cascaded tables"""
+    tables = cascaded_tables(table_names)
+    return {mapper.class_.__name__ for mapper in db.Model.registry.mappers
+            if mapper.local_table.name in tables}
+
+
+def _declared_cascades(table):
+    """Foreign keys of a model table declared ON DELETE CASCADE, by their columns"""
+    return {tuple(constraint.column_keys): constraint
+            for constraint in table.foreign_key_constraints
+            if (constraint.ondelete or '').upper() == 'CASCADE'}
+
+
+def missing_cascades(connection):
+    """
+    Foreign keys the models declare ON DELETE CASCADE but the database does not
+
+    Returns:
+        Dict table -> list of (declared constraint, name in the database or None)
+    """
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    missing = {}
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        found = {tuple(fk['constrained_columns']): fk
+                 for fk in inspector.get_foreign_keys(table.name)}
+        for columns, constraint in _declared_cascades(table).items():
+            fk = found.get(columns)
+            if fk is None or (fk['options'].get('ondelete') or '').upper() != 'CASCADE':
+                missing.setdefault(table, []).append((constraint, fk and fk['name']))
+    return missing
+
+
+def add_missing_cascades(engine):
+    """
+    Give the database the ON DELETE CASCADE foreign keys of the models
+
+    SQLite cannot alter a constraint, so each table concerned is rebuilt
+    from the model (new table, copy, drop, rename, indexes) in one
+    transaction with foreign key enforcement off, then checked with
+    PRAGMA foreign_key_check. Other databases drop and re-add the
+    foreign keys.
+
+    Returns:
+        Names of the tables changed
+
+    Raises:
+        ValueError: If rows reference parents that do not exist (the
+            transaction is rolled back)
+    """
+    with engine.connect() as connection:
+        missing = missing_cascades(connection)
+        connection.rollback()
+        if not missing:
+            return []
+        if engine.dialect.name == 'sqlite':
+            _rebuild_sqlite_tables(connection, list(missing))
+        else:
+            with connection.begin():
+                for table, constraints in missing.items():
+                    for constraint, name in constraints:
+                        if name:
+                            connection.execute(text(
+                                f'ALTER TABLE {table.name} DROP CONSTRAINT {name}'))
+                        connection.execute(AddConstraint(constraint))
+    return [table.name for table in missing]
+
+
+def _rebuild_sqlite_tables(connection, tables):
+    """Rebuild tables from their model definition, keeping their rows"""
+    # The copies reference the other tables by name, so they all go in
+    metadata = MetaData()
+    for table in db.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+    connection.commit()
+    try:
+        with connection.begin():
+            # pysqlite leaves DDL outside transactions unless one is open
+            connection.exec_driver_sql('BEGIN')
+            inspector = inspect(connection)
+            for table in tables:
+                kept = [column['name'] for column in inspector.get_columns(table.name)
+                        if column['name'] in table.c]
+                copy = table.to_metadata(metadata, name=f'{table.name}_new')
+                connection.execute(CreateTable(copy))
+                columns = ', '.join(kept)
+                connection.exec_driver_sql(
+                    f'INSERT INTO {copy.name} ({columns}) SELECT {columns} FROM {table.name}')
+                connection.exec_driver_sql(f'DROP TABLE {table.name}')
+                connection.exec_driver_sql(f'ALTER TABLE {copy.name} RENAME TO {table.name}')
+                for index in table.indexes:
+                    index.create(connection)
+            orphans = connection.exec_driver_sql('PRAGMA foreign_key_check').all()
+            if orphans:
+                tables = sorted({row[0] for row in orphans})
+                raise ValueError(f"{len(orphans)} rows of {', '.join(tables)} reference "
+                                 "rows that do not exist, delete them first")
+    finally:
+        connection.exec_driver_sql('PRAGMA foreign_keys=ON')
+        connection.commit()
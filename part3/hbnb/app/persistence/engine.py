@@ -0,0 +1,156 @@
+"""
+Database engine tuning profiles and connection pool metrics
+
+DATABASE_PROFILE selects the engine options of an environment:
+
+- 'sqlite': a pool of connections to a SQLite file, each one switched to
+  WAL on connect (readers no longer block the writer) with the pragmas of
+  SQLITE_PRAGMAS: synchronous=NORMAL, a busy timeout instead of immediate
+  'database is locked' errors, memory-mapped reads and a larger page cache.
+- 'server': a pool sized for PostgreSQL/MySQL, with connections pinged
+  before use and recycled before the server drops them.
+- 'auto' picks one from SQLALCHEMY_DATABASE_URI, and an in-memory SQLite
+  database keeps the driver defaults.
+
+Whatever the profile, SQLite connections enforce foreign keys when
+SQLITE_FOREIGN_KEYS is set: the models rely on ON DELETE CASCADE.
+
+Keys of SQLALCHEMY_ENGINE_OPTIONS override the profile. Pooled profiles
+use a QueuePool that records how long checkouts wait for a connection.
+"""
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.extensions import db
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording checkout wait times and timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def stats(self):
+        """Checkout waits and how much of the pool is in use"""
+        checked_out = self.checkedout()
+        capacity = self.size() + self._max_overflow if self._max_overflow >= 0 else None
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'checked_out': checked_out,
+            'overflow': max(self.overflow(), 0),
+            'saturation': round(checked_out / capacity, 3) if capacity else None,
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'wait_ms_avg': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            'wait_ms_max': round(self.wait_max * 1000, 3)
+        }
+
+
+def resolve_profile(config):
+    """Engine profile of a configuration: 'sqlite', 'server' or None"""
+    profile = config.get('DATABASE_PROFILE', 'auto')
+    if profile != 'auto':
+        return profile
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri:
+        return None
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite':
+        return 'server'
+    if not url.database or url.database == ':memory:' or url.query.get('mode') == 'memory':
+        return None
+    return 'sqlite'
+
+
+def engine_options(config):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS for the configured profile
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    profile = resolve_profile(config)
+    if profile is None:
+        options = {}
+    elif profile in ('sqlite', 'server'):
+        options = {
+            'poolclass': TimedQueuePool,
+            'pool_size': config.get('DB_POOL_SIZE', 5),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30)
+        }
+        if profile == 'server':
+            options['pool_pre_ping'] = True
+            options['pool_recycle'] = config.get('DB_POOL_RECYCLE', 1800)
+    else:
+        raise ValueError(f"Unknown DATABASE_PROFILE '{profile}'")
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def configure_engine(app):
+    """Set the engine options of the profile, before db.init_app()"""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+
+def pragma_listener(pragmas):
+    """Engine 'connect' listener running PRAGMA name=value for each pragma"""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def init_engine(app):
+    """Apply the SQLite pragmas to every new connection, after db.init_app()"""
+    pragmas = {}
+    if resolve_profile(app.config) == 'sqlite':
+        pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+    if app.config.get('SQLITE_FOREIGN_KEYS', True):
+        pragmas['foreign_keys'] = 'ON'
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', pragma_listener(pragmas))
+
+
+def pool_stats():
+    """Pool metrics of each engine of the current application"""
+    stats = {}
+    for bind, engine in db.engines.items():
+        pool = engine.pool
+        if isinstance(pool, TimedQueuePool):
+            stats[bind or 'default'] = pool.stats()
+        else:
+            stats[bind or 'default'] = {'pool': type(pool).__name__,
+                                        'status': pool.status()}
+    return stats
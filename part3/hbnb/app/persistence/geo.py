@@ -0,0 +1,131 @@
+"""
+Grid-cell spatial indexing helpers for radius searches on plain SQL
+
+The globe is cut in cells of 1/CELLS_PER_DEGREE degree. Each place stores
+the number of its cell (geo_cell), so a radius search becomes a handful
+of indexed BETWEEN ranges, one per row of cells, refined in Python with
+the haversine formula.
+"""
+import base64
+import json
+import math
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, a pure Python pass is used instead
+    np = None
+
+EARTH_RADIUS_KM = 6371.0
+CELLS_PER_DEGREE = 10
+LNG_CELLS = 360 * CELLS_PER_DEGREE + 1
+MAX_RADIUS_KM = 200.0
+
+
+def lat_cell(latitude):
+    """Row of the grid containing a latitude"""
+    return int((latitude + 90) * CELLS_PER_DEGREE)
+
+
+def lng_cell(longitude):
+    """Column of the grid containing a longitude"""
+    return int((longitude + 180) * CELLS_PER_DEGREE)
+
+
+def geo_cell(latitude, longitude):
+    """Cell number of a coordinate, None if either part is missing"""
+    if latitude is None or longitude is None:
+        return None
+    return lat_cell(latitude) * LNG_CELLS + lng_cell(longitude)
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """
+    Cell number ranges covering a circle
+
+    Args:
+        latitude: Center latitude
+        longitude: Center longitude
+        radius_km: Radius in kilometers
+
+    Returns:
+        List of (first_cell, last_cell) inclusive ranges
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = max(latitude - dlat, -90), min(latitude + dlat, 90)
+
+    # Widest longitude span is reached on the edge closest to a pole
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    if cos_lat < 1e-6 or dlat / cos_lat >= 180:
+        lng_spans = [(-180, 180)]
+    else:
+        dlng = dlat / cos_lat
+        west, east = longitude - dlng, longitude + dlng
+        if west < -180:
+            lng_spans = [(west + 360, 180), (-180, east)]
+        elif east > 180:
+            lng_spans = [(west, 180), (-180, east - 360)]
+        else:
+            lng_spans = [(west, east)]
+
+    ranges = []
+    for row in range(lat_cell(min_lat), lat_cell(max_lat) + 1):
+        for west, east in lng_spans:
+            base = row * LNG_CELLS
+            ranges.append((base + lng_cell(west), base + lng_cell(east)))
+    return ranges
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """
+    Great-circle distances from one point to many points
+
+    Args:
+        latitude: Origin latitude
+        longitude: Origin longitude
+        latitudes: Sequence of latitudes
+        longitudes: Sequence of longitudes
+
+    Returns:
+        List of distances in kilometers
+    """
+    if not latitudes:
+        return []
+    if np is not None:
+        lat1, lng1 = np.radians(latitude), np.radians(longitude)
+        lat2 = np.radians(np.asarray(latitudes, dtype=float))
+        lng2 = np.radians(np.asarray(longitudes, dtype=float))
+        a = (np.sin((lat2 - lat1) / 2) ** 2
+             + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+
+    lat1, lng1 = math.radians(latitude), math.radians(longitude)
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for lat, lng in zip(latitudes, longitudes):
+        lat2, lng2 = math.radians(lat), math.radians(lng)
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + cos_lat1 * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+def encode_distance_cursor(distance, obj_id):
+    """Encode a (distance, id) position into an opaque cursor string"""
+    raw = json.dumps([distance, obj_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_distance_cursor(cursor):
+    """
+    Decode a cursor produced by encode_distance_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        distance, obj_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return float(distance), str(obj_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,105 @@
+"""
+Request-scoped identity map and SQL statement counter
+
+Every repository lookup by primary key goes through the identity map bound
+to Flask's g, so within one request (one session) the same row is never
+fetched twice, including lookups that found nothing. The number of SQL
+statements of each request is counted and, when enabled, reported in the
+X-Query-Count response header.
+"""
+from flask import g, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.extensions import db
+
+_MISSING = object()
+
+
+def _entries():
+    """Entries of the current session, None outside an app context"""
+    if not has_app_context():
+        return None
+    session = db.session()
+    state = g.get('hbnb_identity_map')
+    if state is None or state[0] is not session:
+        state = g.hbnb_identity_map = (session, {})
+    return state[1]
+
+
+def lookup(model, obj_id):
+    """
+    Look an object up in the identity map
+
+    Returns:
+        Tuple (found, obj), obj is None when the row is known not to exist
+    """
+    entries = _entries()
+    if entries is None:
+        return False, None
+    obj = entries.get((model.__name__, obj_id), _MISSING)
+    if obj is _MISSING:
+        return False, None
+    if obj is not None and not inspect(obj).persistent:
+        # Detached, or added by a transaction that was rolled back
+        return False, None
+    return True, obj
+
+
+def remember(model, obj_id, obj):
+    """Record the result of a lookup (obj may be None)"""
+    entries = _entries()
+    if entries is not None:
+        entries[(model.__name__, obj_id)] = obj
+
+
+def forget(model, obj_id):
+    """Drop one entry"""
+    entries = _entries()
+    if entries is not None:
+        entries.pop((model.__name__, obj_id), None)
+
+
+def forget_model(model_name):
+    """Drop every entry of a model"""
+    entries = _entries()
+    if entries is not None:
+        for key in [key for key in entries if key[0] == model_name]:
+            del entries[key]
+
+
+def init_request_tracking(app):
+    """Hook the identity map and the per-request query counter"""
+    if not event.contains(Session, 'do_orm_execute', _forget_bulk):
+        event.listen(Session, 'do_orm_execute', _forget_bulk)
+        event.listen(Engine, 'before_cursor_execute', _count_statement)
+
+    @app.before_request
+    def reset_request_state():
+        g.pop('hbnb_identity_map', None)
+        g.hbnb_query_count = 0
+
+    @app.after_request
+    def add_query_count_header(response):
+        enabled = app.config.get('QUERY_COUNT_HEADER')
+        if enabled if enabled is not None else app.debug:
+            response.headers['X-Query-Count'] = str(g.get('hbnb_query_count', 0))
+        return response
+
+
+def _forget_bulk(orm_execute_state):
+    """Bulk UPDATE/DELETE statements make the mapped objects stale"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    session = orm_execute_state.session
+    for mapper in orm_execute_state.all_mappers:
+        forget_model(mapper.class_.__name__)
+        for obj in list(session.identity_map.values()):
+            if isinstance(obj, mapper.class_) and obj not in session.dirty:
+                session.expire(obj)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    """Count the SQL statements of the current request"""
+    if has_app_context():
+        g.hbnb_query_count = g.get('hbnb_query_count', 0) + 1
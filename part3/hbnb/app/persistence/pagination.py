@@ -0,0 +1,130 @@
+"""
+Keyset (cursor) pagination helpers shared by the SQLAlchemy repositories
+"""
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at, obj_id):
+    """
+    Encode a (created_at, id) position into an opaque cursor string
+
+    Args:
+        created_at: Timestamp of the last row of the page
+        obj_id: ID of the last row of the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}|{obj_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string received from the client
+
+    Returns:
+        Tuple (created_at, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        created_at, obj_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, UnicodeError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def clamp_limit(limit):
+    """Return a page size between 1 and MAX_PAGE_SIZE"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("Limit must be greater than 0")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def apply_cursor(query, model, cursor):
+    """
+    Restrict a query to the rows after a cursor, in (created_at, id) order
+
+    Args:
+        query: Query to filter
+        model: Model class exposing created_at and id columns
+        cursor: Cursor of the previous page, None for the first page
+
+    Returns:
+        Filtered query
+    """
+    if not cursor:
+        return query
+    created_at, obj_id = decode_cursor(cursor)
+    return query.filter(or_(
+        model.created_at > created_at,
+        and_(model.created_at == created_at, model.id > obj_id)
+    ))
+
+
+def fetch_page(query, limit):
+    """
+    Run a query ordered by (created_at, id) and cut one page out of it
+
+    Only limit + 1 rows are fetched, the extra row tells whether
+    another page exists.
+
+    Args:
+        query: Query already ordered by (created_at, id)
+        limit: Page size
+
+    Returns:
+        Tuple (items, next_cursor), next_cursor is None on the last page
+    """
+    return cut_page(query.limit(limit + 1).all(), limit)
+
+
+def cut_page(rows, limit):
+    """
+    Cut one page out of rows sorted by (created_at, id)
+
+    Args:
+        rows: At least the first limit + 1 rows after the cursor
+        limit: Page size
+
+    Returns:
+        Tuple (items, next_cursor), next_cursor is None on the last page
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def keyset_page(query, model, limit=None, cursor=None):
+    """
+    Apply keyset pagination on (created_at, id) to a query
+
+    Args:
+        query: Base query (filters already applied)
+        model: Model class exposing created_at and id columns
+        limit: Page size
+        cursor: Cursor of the previous page, None for the first page
+
+    Returns:
+        Tuple (items, next_cursor), next_cursor is None on the last page
+    """
+    limit = clamp_limit(limit)
+    query = apply_cursor(query, model, cursor)
+    return fetch_page(query.order_by(model.created_at, model.id), limit)
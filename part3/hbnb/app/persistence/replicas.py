@@ -0,0 +1,221 @@
+"""
+Read-replica routing
+
+The bind keys listed in READ_REPLICA_BINDS (engines of SQLALCHEMY_BINDS)
+serve the SELECT statements of GET and HEAD requests; the primary database
+serves everything else: flushes, INSERT/UPDATE/DELETE, SELECT ... FOR
+UPDATE, raw SQL and every statement of the other requests, so a
+read-modify-write never reads from a replica.
+
+Replicas are picked round-robin among the healthy ones, once per session:
+every read of a request goes to the same replica, so a collection version
+and the rows it validates come from the same point of replication. Each
+replica is
+probed with SELECT 1 every REPLICA_HEALTH_INTERVAL seconds, and one that
+fails a probe or a query (OperationalError) is skipped until the next
+probe. With no healthy replica, reads go to the primary.
+
+Read-your-writes: a session that has written reads from the primary until
+REPLICA_STICKY_SECONDS after its commit, and so do the requests of the
+same client (same bearer token, or same address when anonymous), which
+covers a GET following a POST within the replication lag.
+"""
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text
+
+_PRIMARY_UNTIL = 'hbnb_primary_until'
+_REPLICA = 'hbnb_replica'
+_READ_METHODS = ('GET', 'HEAD')
+
+
+class Replica:
+    """A replica engine and its health"""
+
+    def __init__(self, key, engine):
+        self.key = key
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = None
+        self.reads = 0
+        self.failures = 0
+
+    def available(self, now, interval):
+        """True if the replica can serve reads, probing it when due"""
+        if self.checked_at is None or now - self.checked_at >= interval:
+            self.probe(now)
+        return self.healthy
+
+    def probe(self, now):
+        """Check the replica with a trivial query"""
+        self.checked_at = now
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            self.healthy = True
+        except exc.DBAPIError:
+            self.mark_down(now)
+
+    def mark_down(self, now):
+        """Skip the replica until its next probe"""
+        self.healthy = False
+        self.checked_at = now
+        self.failures += 1
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas, with per-client stickiness"""
+
+    def __init__(self, replicas, health_interval=5, sticky_seconds=5, max_clients=100000):
+        self.replicas = replicas
+        self.health_interval = health_interval
+        self.sticky_seconds = sticky_seconds
+        self.max_clients = max_clients
+        self._turn = itertools.count()
+        self._sticky = OrderedDict()
+        self._lock = threading.Lock()
+        self.primary_reads = 0
+
+    def pick(self):
+        """Engine of the next healthy replica for a session, None when there is none"""
+        now = time.monotonic()
+        count = len(self.replicas)
+        start = next(self._turn)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.available(now, self.health_interval):
+                replica.reads += 1
+                return replica.engine
+        self.primary_reads += 1
+        return None
+
+    def stick(self, client):
+        """Send the client's reads to the primary for sticky_seconds"""
+        with self._lock:
+            self._sticky[client] = time.monotonic() + self.sticky_seconds
+            self._sticky.move_to_end(client)
+            while len(self._sticky) > self.max_clients:
+                self._sticky.popitem(last=False)
+
+    def is_sticky(self, client):
+        """True while a client's recent write may not have replicated"""
+        until = self._sticky.get(client)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            with self._lock:
+                self._sticky.pop(client, None)
+            return False
+        return True
+
+    def stats(self):
+        """Reads served and health per replica"""
+        return {
+            'replicas': {replica.key: {'healthy': replica.healthy, 'reads': replica.reads,
+                                       'failures': replica.failures}
+                         for replica in self.replicas},
+            'primary_reads': self.primary_reads,
+            'sticky_clients': len(self._sticky)
+        }
+
+
+def get_replica_router():
+    """Get the replica router of the current application, None without replicas"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('hbnb_replica_router')
+
+
+def _client_key():
+    return request.headers.get('Authorization') or request.remote_addr or '-'
+
+
+class RoutingSession(Session):
+    """Session sending the reads of GET requests to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None:
+            router = get_replica_router()
+            if router is not None:
+                if getattr(clause, 'is_dml', False):
+                    self.info[_PRIMARY_UNTIL] = math.inf
+                elif self._reads_from_replica(clause, router):
+                    if _REPLICA not in self.info:
+                        self.info[_REPLICA] = router.pick()
+                    engine = self.info[_REPLICA]
+                    if engine is not None:
+                        return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def close(self):
+        """Close the session, the next one picks its own replica"""
+        self.info.pop(_REPLICA, None)
+        super().close()
+
+    def _reads_from_replica(self, clause, router):
+        if not getattr(clause, 'is_select', False) or clause._for_update_arg is not None:
+            return False
+        if not has_request_context() or request.method not in _READ_METHODS:
+            return False
+        if self.info.get(_PRIMARY_UNTIL, 0) > time.monotonic():
+            return False
+        if router.sticky_seconds and router.is_sticky(_client_key()):
+            router.primary_reads += 1
+            return False
+        return True
+
+
+def _written(session, flush_context=None):
+    """Reads follow uncommitted writes to the primary"""
+    session.info[_PRIMARY_UNTIL] = math.inf
+
+
+def _committed(session):
+    """After a write, keep the session and its client on the primary for a while"""
+    if session.info.get(_PRIMARY_UNTIL) != math.inf:
+        return
+    router = get_replica_router()
+    sticky_seconds = router.sticky_seconds if router is not None else 0
+    session.info[_PRIMARY_UNTIL] = time.monotonic() + sticky_seconds
+    if router is not None and sticky_seconds and has_request_context():
+        router.stick(_client_key())
+
+
+def create_replica_router(config, engines):
+    """
+    Build the router over the READ_REPLICA_BINDS engines, None without replicas
+
+    Raises:
+        ValueError: If a replica bind key is not in SQLALCHEMY_BINDS
+    """
+    keys = config.get('READ_REPLICA_BINDS') or ()
+    missing = [key for key in keys if key not in engines]
+    if missing:
+        raise ValueError(f"READ_REPLICA_BINDS not in SQLALCHEMY_BINDS: {', '.join(missing)}")
+    if not keys:
+        return None
+    return ReplicaRouter([Replica(key, engines[key]) for key in keys],
+                         config.get('REPLICA_HEALTH_INTERVAL', 5),
+                         config.get('REPLICA_STICKY_SECONDS', 5))
+
+
+def init_read_replicas(app, db):
+    """Create the application's replica router, after db.init_app()"""
+    with app.app_context():
+        router = create_replica_router(app.config, db.engines)
+    app.extensions['hbnb_replica_router'] = router
+    if router is None:
+        return
+    for replica in router.replicas:
+        def on_error(context, replica=replica):
+            if isinstance(context.sqlalchemy_exception, exc.OperationalError):
+                replica.mark_down(time.monotonic())
+        event.listen(replica.engine, 'handle_error', on_error)
+    if not event.contains(RoutingSession, 'after_flush', _written):
+        event.listen(RoutingSession, 'after_flush', _written)
+        event.listen(RoutingSession, 'after_commit', _committed)
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
+from sqlalchemy import delete, inspect
+from sqlalchemy.orm import joinedload, selectinload
 from app.extensions import db
+from app.persistence import identity_map
+from app.persistence.unit_of_work import save_changes
+from app.persistence.pagination import apply_cursor, clamp_limit, fetch_page
 
 class Repository(ABC):
     @abstractmethod
@@ -80,15 +85,100 @@ class SQLAlchemyRepository(Repository):
     def add(self, obj):
         """Add an object to the database"""
         db.session.add(obj)
-        db.session.commit()
+        self._commit()
+        identity_map.remember(self.model, obj.id, obj)
     
-    def get(self, obj_id):
-        """Get an object by ID"""
-        return self.model.query.get(obj_id)
+    def get(self, obj_id, include=None):
+        """
+        Get an object by ID
+
+        Args:
+            obj_id: The object ID
+            include: Optional load plan, a list of relationship paths
+                to load eagerly (e.g. ['owner', 'reviews.user'])
+
+        Returns:
+            The object if found, None otherwise
+        """
+        if not include:
+            found, obj = identity_map.lookup(self.model, obj_id)
+            if not found:
+                obj = db.session.get(self.model, obj_id)
+        else:
+            obj = (self.model.query
+                   .options(*self.load_options(include))
+                   .filter(self.model.id == obj_id)
+                   .first())
+        identity_map.remember(self.model, obj_id, obj)
+        return obj
+
+    def load_options(self, include):
+        """
+        Compile a load plan into SQLAlchemy loader options
+
+        Many-to-one relationships are joined into the parent query,
+        collections are loaded with one extra SELECT ... IN per level.
+
+        Args:
+            include: List of dotted relationship paths
+
+        Returns:
+            List of loader options
+
+        Raises:
+            ValueError: If a path names an unknown relationship
+        """
+        options = []
+        for path in include:
+            option = None
+            model = self.model
+            for name in path.split('.'):
+                relationship = inspect(model).relationships.get(name)
+                if relationship is None:
+                    raise ValueError(f"Unknown relationship '{name}' on {model.__name__}")
+                attr = getattr(model, name)
+                loader = selectinload if relationship.uselist else joinedload
+                option = loader(attr) if option is None else getattr(option, loader.__name__)(attr)
+                model = relationship.mapper.class_
+            options.append(option)
+        return options
     
-    def get_all(self):
-        """Get all objects"""
-        return self.model.query.all()
+    def get_all(self, columns=None):
+        """
+        Get all objects
+
+        Args:
+            columns: Optional list of columns, rows are then returned as
+                tuples of those columns instead of objects
+        """
+        query = self.model.query
+        if columns:
+            query = query.with_entities(*columns)
+        return query.all()
+
+    def iter_all(self, columns, batch_size=1000):
+        """
+        Iterate over every row without loading the whole table
+
+        Rows come from a server-side cursor, batch_size at a time, and are
+        plain tuples so nothing accumulates in the session.
+
+        Args:
+            columns: List of columns to select
+            batch_size: Rows fetched per round trip
+        """
+        return self._iterate(self.model.query.with_entities(*columns), batch_size)
+
+    @staticmethod
+    def _iterate(query, batch_size):
+        """
+        Iterate over a query with the session current when iteration starts
+
+        A streamed response reads its rows after the request's app context,
+        and its session, have been torn down; the query must not reopen
+        that session, which nothing would close again.
+        """
+        yield from query.with_session(db.session()).yield_per(batch_size)
     
     def update(self, obj_id, data):
         """Update an object"""
@@ -97,7 +187,7 @@ class SQLAlchemyRepository(Repository):
             for key, value in data.items():
                 if hasattr(obj, key) and key not in ['id', 'created_at']:
                     setattr(obj, key, value)
-            db.session.commit()
+            self._commit()
             return obj
         return None
     
@@ -106,10 +196,89 @@ class SQLAlchemyRepository(Repository):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            self._commit()
+            identity_map.remember(self.model, obj_id, None)
             return True
         return False
+
+    def delete_many(self, obj_ids):
+        """
+        Delete objects by ID with one DELETE statement, without loading them
+
+        Their dependent rows go with ON DELETE CASCADE.
+
+        Returns:
+            Number of rows deleted
+        """
+        if not obj_ids:
+            return 0
+        result = db.session.execute(
+            delete(self.model).where(self.model.id.in_(obj_ids)),
+            execution_options={'synchronize_session': False}
+        )
+        self._commit()
+        for obj_id in obj_ids:
+            identity_map.remember(self.model, obj_id, None)
+        return result.rowcount
+
+    def _commit(self):
+        """Commit the session, or only flush it inside a unit of work"""
+        save_changes()
     
     def get_by_attribute(self, attr_name, attr_value):
         """Get an object by a specific attribute"""
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
+
+    def find_by(self, attr_name, attr_value, limit=None, cursor=None, order_by=None,
+                columns=None):
+        """
+        Build a query for every object matching an attribute value
+
+        Nothing is fetched until the query is iterated.
+
+        Args:
+            attr_name: Column to filter on (should be indexed)
+            attr_value: Value to match
+            limit: Maximum number of rows
+            cursor: Keyset cursor, only valid with the default ordering
+            order_by: Optional list of columns, defaults to (created_at, id)
+            columns: Optional list of columns to select instead of objects
+
+        Returns:
+            SQLAlchemy query
+
+        Raises:
+            ValueError: If the attribute does not exist or the cursor
+                is combined with a custom ordering
+        """
+        column = getattr(self.model, attr_name, None)
+        if column is None:
+            raise ValueError(f"Unknown attribute '{attr_name}' on {self.model.__name__}")
+        query = self.model.query.filter(column == attr_value)
+        if columns:
+            query = query.with_entities(*columns)
+        if order_by is None:
+            query = apply_cursor(query, self.model, cursor)
+            query = query.order_by(self.model.created_at, self.model.id)
+        else:
+            if cursor:
+                raise ValueError("Cursor pagination requires the default ordering")
+            query = query.order_by(*order_by)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    def find_page(self, attr_name, attr_value, limit=None, cursor=None, columns=None):
+        """
+        Get one page of objects matching an attribute value
+
+        Args:
+            columns: Optional list of columns to select instead of objects,
+                must include created_at and id
+
+        Returns:
+            Tuple (items, next_cursor), next_cursor is None on the last page
+        """
+        limit = clamp_limit(limit)
+        query = self.find_by(attr_name, attr_value, cursor=cursor, columns=columns)
+        return fetch_page(query, limit)
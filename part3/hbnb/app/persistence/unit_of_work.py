@@ -0,0 +1,140 @@
+"""
+Unit of work: group repository writes into a single transaction
+
+Outside a unit of work every repository write commits on its own. Inside
+one, writes are only flushed (so generated values and constraint errors
+show up immediately) and the outermost unit commits once on exit, or
+rolls everything back if an exception escapes. Units nest freely, so
+facade methods compose into the caller's transaction.
+
+With UNIT_OF_WORK_PER_REQUEST enabled every request runs in a unit of
+work, committed when the response is successful and rolled back
+otherwise.
+"""
+from contextlib import contextmanager
+from app.extensions import db
+
+_DEPTH = 'hbnb_uow_depth'
+_FAILED = 'hbnb_uow_failed'
+_WRITES = 'hbnb_uow_writes'
+_CALLBACKS = 'hbnb_uow_callbacks'
+
+
+class UnitOfWorkRolledBack(RuntimeError):
+    """The unit of work was rolled back by an earlier database error"""
+
+
+def in_unit_of_work():
+    """True when the current session is inside a unit of work"""
+    return db.session().info.get(_DEPTH, 0) > 0
+
+
+def save_changes():
+    """
+    Make pending changes durable at the right boundary
+
+    Commits immediately outside a unit of work, flushes inside one.
+    A database error rolls the whole transaction back and is re-raised.
+    """
+    session = db.session()
+    if not in_unit_of_work():
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return
+    try:
+        session.flush()
+    except Exception:
+        session.rollback()
+        session.info[_FAILED] = True
+        raise
+    session.info[_WRITES] = True
+
+
+def on_commit(callback):
+    """
+    Run a callback once the current transaction is committed
+
+    Used for side effects outside the database (in-process indexes) that
+    must not see rolled back writes. Runs immediately outside a unit of
+    work, where the write has already been committed.
+    """
+    session = db.session()
+    if in_unit_of_work():
+        session.info.setdefault(_CALLBACKS, []).append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Run the enclosed writes in one transaction
+
+    Raises:
+        UnitOfWorkRolledBack: If an error inside the unit rolled the
+            transaction back and was swallowed by the caller
+    """
+    _enter()
+    try:
+        yield
+    except BaseException:
+        _exit(commit=False)
+        raise
+    _exit(commit=True)
+
+
+def _enter():
+    """Open a (possibly nested) unit of work"""
+    session = db.session()
+    session.info[_DEPTH] = session.info.get(_DEPTH, 0) + 1
+
+
+def _exit(commit):
+    """Close a unit of work, finishing the transaction at the outermost level"""
+    session = db.session()
+    depth = session.info.get(_DEPTH, 0) - 1
+    session.info[_DEPTH] = depth
+    if depth > 0:
+        return
+    failed = session.info.pop(_FAILED, False)
+    writes = session.info.pop(_WRITES, False)
+    callbacks = session.info.pop(_CALLBACKS, [])
+    if not commit or failed:
+        session.rollback()
+        if commit and failed:
+            raise UnitOfWorkRolledBack("The unit of work was rolled back by an earlier error")
+        return
+    if writes or session.new or session.dirty or session.deleted:
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        for callback in callbacks:
+            callback()
+
+
+def init_unit_of_work(app):
+    """Wrap every request in a unit of work when UNIT_OF_WORK_PER_REQUEST is set"""
+
+    @app.before_request
+    def begin_request_unit():
+        if app.config.get('UNIT_OF_WORK_PER_REQUEST'):
+            _enter()
+
+    @app.after_request
+    def end_request_unit(response):
+        if db.session().info.get(_DEPTH, 0) > 0:
+            _exit(commit=response.status_code < 400)
+        return response
+
+    @app.teardown_request
+    def abort_request_unit(exc):
+        session = db.session()
+        if session.info.get(_DEPTH, 0) > 0:
+            # after_request did not run (unhandled exception)
+            session.info[_DEPTH] = 1
+            _exit(commit=False)
@@ -0,0 +1,88 @@
+"""
+Collection version counters used as validators by list endpoints
+
+Each table has a row in collection_versions whose version is bumped in the
+same transaction as any write to that table (ORM flushes and bulk
+INSERT/UPDATE/DELETE statements), including the rows a delete removes
+through ON DELETE CASCADE. Reading it is a single primary key lookup, and
+it is shared by every worker since it lives in the database.
+"""
+from datetime import datetime
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.persistence.cascades import cascaded_tables
+
+collection_versions = db.Table('collection_versions',
+    db.Column('name', db.String(50), primary_key=True),
+    db.Column('version', db.Integer, nullable=False, default=0),
+    db.Column('updated_at', db.DateTime, nullable=False, default=datetime.utcnow)
+)
+
+COLLECTIONS = ('users', 'places', 'reviews', 'amenities')
+
+
+def get_version(name):
+    """
+    Get the current version of a collection
+
+    Returns:
+        Tuple (version, updated_at)
+    """
+    row = db.session.execute(
+        select(collection_versions.c.version, collection_versions.c.updated_at)
+        .where(collection_versions.c.name == name)
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def init_versions(app):
+    """Create the missing counter rows and hook the bumps on the session"""
+    with app.app_context():
+        existing = set(db.session.execute(select(collection_versions.c.name)).scalars())
+        missing = [{'name': name, 'version': 0, 'updated_at': datetime.utcnow()}
+                   for name in COLLECTIONS if name not in existing]
+        if missing:
+            db.session.execute(insert(collection_versions), missing)
+            db.session.commit()
+    if not event.contains(Session, 'after_flush', _bump_flushed):
+        event.listen(Session, 'after_flush', _bump_flushed)
+        event.listen(Session, 'do_orm_execute', _bump_bulk)
+
+
+def bump_versions(tables):
+    """Bump collections written by Core statements, which the session events do not see"""
+    _bump(db.session, tables)
+
+
+def _bump(session, tables):
+    """Increment the counters of the given tables in the session transaction"""
+    tables = [name for name in tables if name in COLLECTIONS]
+    if not tables:
+        return
+    session.connection().execute(
+        update(collection_versions)
+        .where(collection_versions.c.name.in_(tables))
+        .values(version=collection_versions.c.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+def _bump_flushed(session, flush_context):
+    """Bump the collections touched by a flush"""
+    tables = {getattr(obj, '__tablename__', None)
+              for obj in list(session.new) + list(session.dirty)}
+    deleted = {getattr(obj, '__tablename__', None) for obj in session.deleted} - {None}
+    _bump(session, tables | deleted | cascaded_tables(deleted))
+
+
+def _bump_bulk(orm_execute_state):
+    """Bump the collections targeted by bulk INSERT/UPDATE/DELETE statements"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update
+            or orm_execute_state.is_delete):
+        return
+    tables = {mapper.local_table.name for mapper in orm_execute_state.all_mappers}
+    if orm_execute_state.is_delete:
+        tables |= cascaded_tables(tables)
+    _bump(orm_execute_state.session, tables)
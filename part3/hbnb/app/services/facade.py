@@ -3,20 +3,84 @@ from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.geo import MAX_RADIUS_KM
+from app.persistence.amenity_index import get_amenity_index
+from app.persistence.cache import CachedRepository
+from app.persistence.versions import get_version
+from app.persistence.unit_of_work import unit_of_work, on_commit
+from app.passwords import get_password_hasher
+from app.services.importer import BulkImporter, ImportReport, DEFAULT_BATCH_SIZE
+from app.services.seeder import SeedReport, seed_database
+from app.services.tasks import Task, get_background_tasks
 from app.services.repositories import UserRepository, PlaceRepository, ReviewRepository, AmenityRepository
-from typing import Dict, Any, Optional, List
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+
+
+class DuplicateReviewError(ValueError):
+    """Raised when a user reviews the same place twice"""
+
+
+def _is_unique_violation(error: IntegrityError, names: Tuple[str, ...],
+                         columns: Tuple[str, ...]) -> bool:
+    """
+    True if the database rejected a row on one of the given unique constraints
+
+    PostgreSQL reports the constraint name, MySQL quotes the key name in
+    its message and SQLite lists the table.column pairs.
+    """
+    constraint = getattr(getattr(error.orig, 'diag', None), 'constraint_name', None)
+    if constraint:
+        return constraint in names
+    message = str(error.orig)
+    return (any(f"'{name}'" in message or f".{name}'" in message for name in names)
+            or any(message == f"UNIQUE constraint failed: {column}" for column in columns))
+
+
+def _is_duplicate_review(error: IntegrityError) -> bool:
+    """True if the database rejected a review on its (user_id, place_id) unique constraint"""
+    return _is_unique_violation(error, ('uq_reviews_user_place',),
+                                ('reviews.user_id, reviews.place_id',))
+
+
+def _is_duplicate_email(error: IntegrityError) -> bool:
+    """True if the database rejected a user on the unique email or normalized email"""
+    return _is_unique_violation(error, ('idx_users_email_normalized', 'users_email_key', 'email'),
+                                ('users.email', 'users.email_normalized'))
 
 
 class HBnBFacade:
     """
     Facade class to handle business logic for HBnB application
     """
+
+    # Relationships loaded with a place detail, in a fixed number of queries
+    PLACE_DETAIL_PLAN = ['owner', 'amenities', 'reviews.user']
     
     def __init__(self):
-        self.user_repo = UserRepository()
-        self.place_repo = PlaceRepository()
-        self.review_repo = ReviewRepository()
-        self.amenity_repo = AmenityRepository()
+        self.user_repo = CachedRepository(UserRepository(), uncached=['password'])
+        self.place_repo = CachedRepository(PlaceRepository())
+        self.review_repo = CachedRepository(ReviewRepository())
+        self.amenity_repo = CachedRepository(AmenityRepository())
+
+    def unit_of_work(self):
+        """
+        Group several facade calls into one transaction
+
+        Usage:
+            with facade.unit_of_work():
+                place = facade.create_place(data)
+                for amenity_id in amenity_ids:
+                    facade.add_amenity_to_place(place.id, amenity_id)
+
+        Commits once on exit, rolls everything back on exception.
+        """
+        return unit_of_work()
+
+    def get_collection_version(self, name: str) -> Tuple[int, Optional[datetime]]:
+        """Get the version counter and last change time of a collection"""
+        return get_version(name)
 
     # ========== USER METHODS ==========
     def create_user(self, user_data: Dict[str, Any]) -> User:
@@ -24,20 +88,55 @@ class HBnBFacade:
         user = User(**user_data)
         if 'password' in user_data:
             user.hash_password(user_data['password'])
-        self.user_repo.add(user)
+        # The unique index only covers the rows with email_normalized
+        if self.user_repo.get_unnormalized_by_email(user.email):
+            raise ValueError("Email already registered")
+        try:
+            self.user_repo.add(user)
+        except IntegrityError as e:
+            # Unique index on the normalized email
+            if _is_duplicate_email(e):
+                raise ValueError("Email already registered")
+            raise
         return user
 
     def get_user(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
         return self.user_repo.get(user_id)
 
+    def authenticate(self, email: str, password: str) -> Optional[User]:
+        """
+        Check a user's credentials
+
+        A hash made with an outdated bcrypt cost is replaced by one made
+        with the configured cost while the password is at hand.
+
+        Returns:
+            The user if the credentials are valid, None otherwise
+        """
+        user = self.get_user_by_email(email)
+        if not user:
+            # Unknown emails cost a bcrypt comparison too
+            get_password_hasher().dummy_verify(password)
+            return None
+        if not user.check_password(password):
+            return None
+        if user.password_needs_rehash():
+            user.hash_password(password)
+            self.user_repo.update(user.id, {})
+        return user
+
     def get_user_by_email(self, email: str) -> Optional[User]:
-        """Get user by email"""
-        return self.user_repo.get_by_attribute('email', email)
+        """Get user by email, ignoring case"""
+        return self.user_repo.get_user_by_email(email)
 
-    def get_all_users(self) -> List[User]:
-        """Get all users"""
-        return self.user_repo.get_all()
+    def get_all_users(self, columns: Optional[List[Any]] = None) -> List[User]:
+        """Get all users (tuples of columns when given)"""
+        return self.user_repo.get_all(columns)
+
+    def iter_users(self, columns: List[Any], batch_size: int = 1000) -> Iterator[tuple]:
+        """Iterate over every user as tuples of columns"""
+        return self.user_repo.iter_all(columns, batch_size)
 
     def update_user(self, user_id: str, user_data: Dict[str, Any]) -> Optional[User]:
         """Update user"""
@@ -46,34 +145,144 @@ class HBnBFacade:
             return None
         
         for key, value in user_data.items():
-            if hasattr(user, key) and key not in ['id', 'created_at']:
+            if hasattr(user, key) and key not in ['id', 'created_at', 'password']:
                 setattr(user, key, value)
+        if user_data.get('password'):
+            user.hash_password(user_data['password'])
         
-        self.user_repo.update(user_id, user_data)
+        self.user_repo.update(user_id, {})
         return user
 
     def delete_user(self, user_id: str) -> bool:
-        """Delete user"""
+        """
+        Delete user
+
+        Places, reviews and amenity links go with ON DELETE CASCADE, so this
+        takes the same few statements whatever the user owns.
+        """
         user = self.user_repo.get(user_id)
         if not user:
             return False
-        self.user_repo.delete(user_id)
+        reviewed_place_ids = self.review_repo.reviewed_place_ids(user_id)
+        owned_place_ids = self.place_repo.ids_by_owner(user_id)
+        with unit_of_work():
+            self.user_repo.delete(user_id)
+            # The user's reviews went with it, refresh the places they rated
+            if reviewed_place_ids:
+                self.place_repo.rebuild_rating_stats(reviewed_place_ids)
+            for place_id in owned_place_ids:
+                on_commit(lambda place_id=place_id: get_amenity_index().remove_place(place_id))
         return True
 
+    def delete_user_in_background(self, user_id: str, batch_size: int = 500) -> Optional[Task]:
+        """
+        Delete a user's places batch by batch on the background task pool,
+        then the user
+
+        Each batch is its own short transaction, so other writers are not
+        locked out while a large host is removed. If the user is deleted
+        meanwhile, ON DELETE CASCADE took the remaining places and the task
+        ends there.
+
+        Returns:
+            The task, whose progress counts deleted places, None if the user does not exist
+        """
+        if not self.user_repo.get(user_id):
+            return None
+        place_ids = self.place_repo.ids_by_owner(user_id)
+
+        def run(task):
+            for start in range(0, len(place_ids), batch_size):
+                batch = place_ids[start:start + batch_size]
+                with unit_of_work():
+                    if self.user_repo.get(user_id) is None:
+                        task.total = task.done
+                        return
+                    self.place_repo.delete_many(batch)
+                    self.user_repo.adjust_place_count(user_id, -len(batch))
+                index = get_amenity_index()
+                for place_id in batch:
+                    index.remove_place(place_id)
+                task.advance(len(batch))
+            self.delete_user(user_id)
+            task.advance()
+
+        return get_background_tasks().submit('delete_user', user_id, run,
+                                             total=len(place_ids) + 1)
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """Get a background task of this worker"""
+        return get_background_tasks().get(task_id)
+
+    def count_places_by_owner(self, owner_id: str) -> int:
+        """Number of places owned by a user, from the user's place counter"""
+        owner = self.user_repo.get(owner_id)
+        if not owner:
+            return 0
+        if owner.place_count is None:
+            return self.place_repo.count_by_owner(owner_id)
+        return owner.place_count
+
     # ========== PLACE METHODS ==========
     def place_with_related(self, place_id: str) -> Dict[str, Any]:
         """Get place with related data (owner, amenities, reviews)"""
-        place = self.place_repo.get(place_id)
+        place = self.get_place_detail(place_id)
         if not place:
             return None
-        
+        return self.place_detail_dict(place)
+
+    def get_place_detail(self, place_id: str) -> Optional[Place]:
+        """Get a place with its owner, amenities and reviews loaded"""
+        return self.place_repo.get(place_id, include=self.PLACE_DETAIL_PLAN)
+
+    def place_detail_version(self, place: Place) -> Tuple[List[Any], datetime]:
+        """
+        Identify the state of a place loaded by get_place_detail
+
+        Returns:
+            Tuple (parts to build a validator from, last change time)
+        """
+        parts = [place.id, place.updated_at]
+        changes = [place.updated_at]
+        if place.owner:
+            parts.append(place.owner.updated_at)
+            changes.append(place.owner.updated_at)
+        for amenity in sorted(place.amenities, key=lambda amenity: amenity.id):
+            parts.append(f"{amenity.id}:{amenity.updated_at}")
+            changes.append(amenity.updated_at)
+        for review in place.reviews:
+            reviewer = review.user.updated_at if review.user else None
+            parts.append(f"{review.id}:{review.updated_at}:{reviewer}")
+            changes.append(review.updated_at)
+            if reviewer:
+                changes.append(reviewer)
+        return parts, max(changes)
+
+    def place_detail_dict(self, place: Place) -> Dict[str, Any]:
+        """Serialize a place loaded by get_place_detail"""
         place_dict = place.to_dict()
-        place_dict['owner'] = place.owner.to_dict() if place.owner else None
+        place_dict['rating_histogram'] = place.rating_histogram
+        place_dict['owner'] = self._public_user(place.owner)
         place_dict['amenities'] = [a.to_dict() for a in place.amenities]
-        place_dict['reviews'] = [r.to_dict() for r in place.reviews]
+        place_dict['reviews'] = []
+        for review in place.reviews:
+            review_dict = review.to_dict()
+            review_dict['user'] = self._public_user(review.user)
+            place_dict['reviews'].append(review_dict)
         
         return place_dict
 
+    @staticmethod
+    def _public_user(user: Optional[User]) -> Optional[Dict[str, Any]]:
+        """Public part of a user embedded in other resources (no email)"""
+        if not user:
+            return None
+        return {
+            'id': user.id,
+            'first_name': user.first_name,
+            'last_name': user.last_name
+        }
+
     def create_place(self, place_data: Dict[str, Any]) -> Place:
         """Create a new place"""
         owner_id = place_data.get('owner_id')
@@ -85,13 +294,143 @@ class HBnBFacade:
             raise ValueError("Owner not found")
         
         place = Place(**place_data)
-        self.place_repo.add(place)
+        with unit_of_work():
+            self.user_repo.adjust_place_count(owner_id, 1)
+            self.place_repo.add(place)
         return place
 
+    def get_places_by_owner(self, owner_id: str, limit: Optional[int] = None,
+                            cursor: Optional[str] = None, columns: Optional[List[Any]] = None
+                            ) -> Optional[Tuple[List[Place], Optional[str], int, bool]]:
+        """
+        Get one page of a user's places with the total number of places
+
+        The total comes from the user's place counter. While the counter is
+        unknown (users older than the column) it is recounted on the
+        background task pool and the total is a lower bound, unless the
+        first page already holds every place.
+
+        Returns:
+            Tuple (places, next_cursor, total_count, total_exact),
+            None if the user does not exist
+        """
+        owner = self.user_repo.get(owner_id)
+        if not owner:
+            return None
+        places, next_cursor = self.place_repo.get_owner_page(owner_id, limit, cursor, columns)
+        if owner.place_count is not None:
+            return places, next_cursor, owner.place_count, True
+        if not cursor and next_cursor is None:
+            return places, next_cursor, len(places), True
+        tasks = get_background_tasks()
+        if not tasks.pending('count_places', owner_id):
+            tasks.submit('count_places', owner_id,
+                         lambda task: self.user_repo.rebuild_place_counts([owner_id]))
+        return places, next_cursor, len(places) + (1 if next_cursor else 0), False
+
+    def rebuild_place_counts(self) -> int:
+        """Recompute every user's place counter from the places"""
+        return self.user_repo.rebuild_place_counts()
+
     def get_all_places(self) -> List[Place]:
         """Get all places"""
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                        min_price: Optional[float] = None, max_price: Optional[float] = None,
+                        bbox: Optional[tuple] = None, amenities: Optional[List[str]] = None,
+                        match_all: bool = True,
+                        columns: Optional[List[Any]] = None) -> Tuple[List[Place], Optional[str]]:
+        """
+        Get one page of places and the cursor of the next page
+
+        amenities is a list of amenity IDs or names, places must have all
+        of them (match_all) or any of them. With columns, rows are tuples
+        of those columns instead of places.
+        """
+        place_ids = self._place_candidates(min_price, max_price, amenities, match_all)
+        if place_ids is not None and not place_ids:
+            return [], None
+        return self.place_repo.get_places_page(limit, cursor, min_price, max_price,
+                                               bbox, place_ids, columns)
+
+    def iter_places(self, columns: List[Any], cursor: Optional[str] = None,
+                    min_price: Optional[float] = None, max_price: Optional[float] = None,
+                    bbox: Optional[tuple] = None, amenities: Optional[List[str]] = None,
+                    match_all: bool = True, batch_size: int = 1000) -> Iterator[tuple]:
+        """Iterate over every place matching the filters of get_places_page"""
+        place_ids = self._place_candidates(min_price, max_price, amenities, match_all)
+        if place_ids is not None and not place_ids:
+            return iter(())
+        return self.place_repo.iter_places(columns, cursor, min_price, max_price,
+                                           bbox, place_ids, batch_size)
+
+    def _place_candidates(self, min_price, max_price, amenities, match_all):
+        """
+        Validate the place filters and resolve the amenities to place IDs
+
+        Returns None when no amenity filter applies.
+        """
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise ValueError("min_price cannot be greater than max_price")
+        if not amenities:
+            return None
+        resolved = self.amenity_repo.resolve_ids(amenities)
+        if match_all and any(key not in resolved for key in amenities):
+            return []
+        return get_amenity_index().match(
+            list({resolved[key] for key in amenities if key in resolved}), match_all)
+
+    def get_places_by_amenity(self, amenity_id: str, limit: Optional[int] = None,
+                              cursor: Optional[str] = None,
+                              columns: Optional[List[Any]] = None) -> Tuple[List[Place], Optional[str]]:
+        """Get one page of places having an amenity"""
+        place_ids = get_amenity_index().match([amenity_id])
+        return self.place_repo.get_places_page(limit, cursor, place_ids=place_ids,
+                                               columns=columns)
+
+    def search_places_nearby(self, latitude: float, longitude: float, radius_km: float,
+                             limit: Optional[int] = None,
+                             cursor: Optional[str] = None) -> Tuple[List[Tuple[Place, float]], Optional[str]]:
+        """Get one page of places within radius_km of a point, closest first"""
+        if not -90 <= latitude <= 90:
+            raise ValueError("Latitude must be between -90 and 90")
+        if not -180 <= longitude <= 180:
+            raise ValueError("Longitude must be between -180 and 180")
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM:g}")
+        return self.place_repo.search_nearby(latitude, longitude, radius_km, limit, cursor)
+
+    def rebuild_geo_cells(self) -> int:
+        """Recompute the grid cell of every place"""
+        return self.place_repo.rebuild_geo_cells()
+
+    def rebuild_rating_stats(self) -> int:
+        """Recompute every place's rating aggregates from the reviews"""
+        return self.place_repo.rebuild_rating_stats()
+
+    def bulk_import(self, kind: str, rows, batch_size: int = DEFAULT_BATCH_SIZE,
+                    on_batch=None) -> ImportReport:
+        """
+        Import places, amenities or reviews in batches
+
+        Args:
+            kind: 'places', 'amenities' or 'reviews'
+            rows: Iterable of (line number, row) from read_ndjson/read_csv
+            batch_size: Rows per INSERT and commit
+            on_batch: Optional callback receiving the report after each batch
+
+        Returns:
+            ImportReport with the per-row errors
+        """
+        return BulkImporter(kind, batch_size).run(rows, on_batch)
+
+    def seed_dataset(self, scale: float, seed: int, batch_size: int, on_batch=None) -> SeedReport:
+        """Write a synthetic dataset, see app.services.seeder"""
+        report = seed_database(scale, seed, batch_size, on_batch)
+        get_amenity_index().invalidate()
+        return report
+
     def get_place(self, place_id: str) -> Optional[Place]:
         """Get place by ID"""
         return self.place_repo.get(place_id)
@@ -102,8 +441,10 @@ class HBnBFacade:
         if not place:
             return None
         
+        # A place stays with its owner (and in its owner's place count)
+        place_data = {key: value for key, value in place_data.items() if key != 'owner_id'}
         for key, value in place_data.items():
-            if hasattr(place, key) and key not in ['id', 'created_at', 'owner_id']:
+            if hasattr(place, key) and key not in ['id', 'created_at']:
                 setattr(place, key, value)
         
         self.place_repo.update(place_id, place_data)
@@ -114,7 +455,12 @@ class HBnBFacade:
         place = self.place_repo.get(place_id)
         if not place:
             return False
-        self.place_repo.delete(place_id)
+        owner = self.user_repo.get(place.owner_id)
+        with unit_of_work():
+            if owner:
+                self.user_repo.adjust_place_count(owner.id, -1)
+            self.place_repo.delete(place_id)
+            on_commit(lambda: get_amenity_index().remove_place(place_id))
         return True
 
     def get_place_amenities(self, place_id: str) -> List[Amenity]:
@@ -134,7 +480,10 @@ class HBnBFacade:
         
         if amenity not in place.amenities:
             place.amenities.append(amenity)
+            # The association row has no timestamp, date the change on the place
+            place.updated_at = datetime.utcnow()
             self.place_repo.update(place_id, {})
+            on_commit(lambda: get_amenity_index().add(place_id, amenity_id))
         
         return True
 
@@ -156,25 +505,35 @@ class HBnBFacade:
             raise ValueError("User not found")
         
         review = Review(**review_data)
-        self.review_repo.add(review)
+        place.record_rating(added=review.rating)
+        try:
+            self.review_repo.add(review)
+        except IntegrityError as e:
+            # The (user_id, place_id) unique constraint settles concurrent requests
+            if _is_duplicate_review(e):
+                raise DuplicateReviewError("You can't review the same place twice")
+            raise
         return review
 
-    def get_all_reviews(self) -> List[Review]:
-        """Get all reviews"""
-        return self.review_repo.get_all()
+    def get_all_reviews(self, columns: Optional[List[Any]] = None) -> List[Review]:
+        """Get all reviews (tuples of columns when given)"""
+        return self.review_repo.get_all(columns)
 
-    def get_reviews_by_user(self, user_id: str) -> List[Review]:
-        """Get all reviews by a user"""
-        return self.review_repo.get_by_attribute('user_id', user_id)
+    def iter_reviews(self, columns: List[Any], batch_size: int = 1000) -> Iterator[tuple]:
+        """Iterate over every review as tuples of columns"""
+        return self.review_repo.iter_all(columns, batch_size)
 
-    def get_reviews_by_place(self, place_id: str) -> List[Review]:
-        """Get all reviews for a place"""
-        result = self.review_repo.get_by_attribute('place_id', place_id)
-        if result is None:
-            return []
-        if isinstance(result, list):
-            return result
-        return [result]
+    def get_reviews_by_user(self, user_id: str, limit: Optional[int] = None,
+                            cursor: Optional[str] = None,
+                            columns: Optional[List[Any]] = None) -> Tuple[List[Review], Optional[str]]:
+        """Get one page of reviews written by a user and the next cursor"""
+        return self.review_repo.find_page('user_id', user_id, limit, cursor, columns)
+
+    def get_reviews_by_place(self, place_id: str, limit: Optional[int] = None,
+                             cursor: Optional[str] = None,
+                             columns: Optional[List[Any]] = None) -> Tuple[List[Review], Optional[str]]:
+        """Get one page of reviews for a place and the next cursor"""
+        return self.review_repo.find_page('place_id', place_id, limit, cursor, columns)
 
     def get_review(self, review_id: str) -> Optional[Review]:
         """Get review by ID"""
@@ -186,9 +545,16 @@ class HBnBFacade:
         if not review:
             return None
         
+        # A review stays with its author and its place
+        review_data = {key: value for key, value in review_data.items()
+                       if key not in ['user_id', 'place_id']}
+        old_rating = review.rating
         for key, value in review_data.items():
-            if hasattr(review, key) and key not in ['id', 'created_at', 'user_id', 'place_id']:
+            if hasattr(review, key) and key not in ['id', 'created_at']:
                 setattr(review, key, value)
+        if review.rating != old_rating:
+            place = self.place_repo.get(review.place_id)
+            place.record_rating(added=review.rating, removed=old_rating)
         
         self.review_repo.update(review_id, review_data)
         return review
@@ -198,6 +564,9 @@ class HBnBFacade:
         review = self.review_repo.get(review_id)
         if not review:
             return False
+        place = self.place_repo.get(review.place_id)
+        if place:
+            place.record_rating(removed=review.rating)
         self.review_repo.delete(review_id)
         return True
 
@@ -208,9 +577,9 @@ class HBnBFacade:
         self.amenity_repo.add(amenity)
         return amenity
 
-    def get_all_amenities(self) -> List[Amenity]:
-        """Get all amenities"""
-        return self.amenity_repo.get_all()
+    def get_all_amenities(self, columns: Optional[List[Any]] = None) -> List[Amenity]:
+        """Get all amenities (tuples of columns when given)"""
+        return self.amenity_repo.get_all(columns)
 
     def get_amenity(self, amenity_id: str) -> Optional[Amenity]:
         """Get amenity by ID"""
@@ -235,12 +604,9 @@ class HBnBFacade:
         if not amenity:
             return False
         self.amenity_repo.delete(amenity_id)
+        on_commit(lambda: get_amenity_index().remove_amenity(amenity_id))
         return True
 
     def has_user_reviewed_place(self, user_id: str, place_id: str) -> bool:
         """Return True if the user has already reviewed the place"""
-        reviews = self.review_repo.get_all()
-        for review in reviews:
-            if review.user_id == user_id and review.place_id == place_id:
-                return True
-        return False
+        return self.review_repo.user_has_reviewed(user_id, place_id)
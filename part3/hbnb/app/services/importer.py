@@ -0,0 +1,246 @@
+"""
+Bulk import of places, amenities and reviews from NDJSON or CSV streams
+
+Rows are validated by instantiating the model, so the same @validates
+rules as the API apply, then inserted in batches with one multi-row
+INSERT and one commit per batch. A batch rejected by a constraint is
+retried row by row so only the offending rows are reported.
+"""
+import csv
+import io
+import json
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Fields accepted per kind, and the model each foreign key points to
+IMPORTABLE = {
+    'places': (Place, ('title', 'description', 'price', 'latitude', 'longitude', 'owner_id'),
+               {'owner_id': User}),
+    'amenities': (Amenity, ('name',), {}),
+    'reviews': (Review, ('text', 'rating', 'place_id', 'user_id'),
+                {'place_id': Place, 'user_id': User}),
+}
+
+
+class ImportReport:
+    """Outcome of an import: counters, per-row errors and throughput"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line, message):
+        """Record a rejected row (only the first errors are kept)"""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def finish(self):
+        """Stop the clock"""
+        self.elapsed = time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        """Rows processed per second"""
+        if not self.elapsed:
+            return 0.0
+        return (self.inserted + self.failed) / self.elapsed
+
+    def to_dict(self):
+        """Convert the report to a dictionary"""
+        return {
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def read_ndjson(stream):
+    """
+    Yield (line number, row) from a binary or text NDJSON stream
+
+    Rows that are not JSON objects are yielded as a string error message.
+    """
+    for line_no, line in enumerate(stream, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, "Each line must be a JSON object"
+            continue
+        yield line_no, row
+
+
+def read_csv(stream):
+    """Yield (line number, row) from a binary or text CSV stream with a header"""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if value != ''}
+
+
+def clamp_batch_size(batch_size, maximum):
+    """Return a batch size between 1 and maximum"""
+    if batch_size is None:
+        return min(DEFAULT_BATCH_SIZE, maximum)
+    if batch_size < 1:
+        raise ValueError("Batch size must be greater than 0")
+    return min(batch_size, maximum)
+
+
+class BulkImporter:
+    """Validate and insert rows of one kind in batches"""
+
+    def __init__(self, kind, batch_size=DEFAULT_BATCH_SIZE):
+        if kind not in IMPORTABLE:
+            raise ValueError(f"Unknown import kind '{kind}'")
+        if batch_size < 1:
+            raise ValueError("Batch size must be greater than 0")
+        self.kind = kind
+        self.model, self.fields, self.references = IMPORTABLE[kind]
+        self.batch_size = batch_size
+        self._types = {
+            column.key: column.columns[0].type.python_type
+            for column in inspect(self.model).column_attrs
+            if column.key in self.fields
+        }
+
+    def run(self, rows, on_batch=None):
+        """
+        Import rows produced by read_ndjson/read_csv
+
+        Args:
+            rows: Iterable of (line number, row dict or error message)
+            on_batch: Optional callback receiving the report after each batch
+
+        Returns:
+            ImportReport
+        """
+        report = ImportReport()
+        batch = []
+        for line, row in rows:
+            if isinstance(row, str):
+                report.add_error(line, row)
+                continue
+            try:
+                batch.append((line, self._validate(row)))
+            except (ValueError, TypeError) as e:
+                report.add_error(line, str(e))
+                continue
+            if len(batch) >= self.batch_size:
+                self._insert_batch(batch, report)
+                batch = []
+                if on_batch:
+                    on_batch(report)
+        if batch:
+            self._insert_batch(batch, report)
+            if on_batch:
+                on_batch(report)
+        report.finish()
+        return report
+
+    def _validate(self, row):
+        """Coerce and validate one row, return the values to insert"""
+        unknown = set(row) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        values = {field: self._coerce(field, row.get(field)) for field in self.fields}
+        # The model constructor runs the same @validates hooks as the API
+        obj = self.model(**values)
+        now = datetime.utcnow()
+        obj.id = str(uuid.uuid4())
+        obj.created_at = now
+        obj.updated_at = now
+        return {column.key: getattr(obj, column.key)
+                for column in inspect(self.model).column_attrs}
+
+    def _coerce(self, field, value):
+        """
+        Convert a value to the column type without losing information
+
+        CSV strings are parsed, JSON integers become floats and whole
+        floats integers. Booleans and fractional integers are rejected,
+        as the @validates hooks reject them through the API.
+        """
+        expected = self._types[field]
+        if value is None or (isinstance(value, expected) and not isinstance(value, bool)):
+            return value
+        if isinstance(value, str):
+            try:
+                return expected(value)
+            except ValueError:
+                pass
+        elif expected is float and isinstance(value, int) and not isinstance(value, bool):
+            return float(value)
+        elif expected is int and isinstance(value, float) and value.is_integer():
+            return int(value)
+        raise ValueError(f"{field} must be of type {expected.__name__}")
+
+    def _insert_batch(self, batch, report):
+        """Insert one batch, isolating the rows rejected by the database"""
+        batch = self._drop_missing_references(batch, report)
+        if not batch:
+            return
+        try:
+            db.session.execute(insert(self.model), [values for _, values in batch])
+            db.session.commit()
+            report.inserted += len(batch)
+        except IntegrityError:
+            db.session.rollback()
+            for line, values in batch:
+                try:
+                    db.session.execute(insert(self.model), [values])
+                    db.session.commit()
+                    report.inserted += 1
+                except IntegrityError as e:
+                    db.session.rollback()
+                    report.add_error(line, f"Rejected by the database: {e.orig}")
+        self._after_batch([values for _, values in batch])
+
+    def _drop_missing_references(self, batch, report):
+        """Check the foreign keys of a batch with one query per referenced table"""
+        for field, target in self.references.items():
+            wanted = {values[field] for _, values in batch}
+            found = set(db.session.execute(
+                select(target.id).where(target.id.in_(wanted))
+            ).scalars())
+            kept = []
+            for line, values in batch:
+                if values[field] in found:
+                    kept.append((line, values))
+                else:
+                    report.add_error(line, f"{field} '{values[field]}' not found")
+            batch = kept
+        return batch
+
+    def _after_batch(self, rows):
+        """Keep the denormalized data in step with the rows just inserted"""
+        if self.kind == 'reviews':
+            from app.services.repositories import PlaceRepository
+            PlaceRepository().rebuild_rating_stats(list({row['place_id'] for row in rows}))
+        elif self.kind == 'places':
+            from app.services.repositories import UserRepository
+            UserRepository().rebuild_place_counts(list({row['owner_id'] for row in rows}))
@@ -1,3 +1,4 @@
+from sqlalchemy import or_
 from app.models.amenity import Amenity
 from app.persistence.repository import SQLAlchemyRepository
 
@@ -23,4 +24,23 @@ class AmenityRepository(SQLAlchemyRepository):
 
     def get_all_amenities(self):
         """Get all amenities from the database"""
-        return self.get_all()
\ No newline at end of file
+        return self.get_all()
+
+    def resolve_ids(self, keys):
+        """
+        Resolve amenity IDs or names to amenity IDs (one query)
+
+        Args:
+            keys: List of amenity IDs or names
+
+        Returns:
+            Dict mapping each key found to its amenity ID
+        """
+        amenities = self.model.query.filter(
+            or_(self.model.id.in_(keys), self.model.name.in_(keys))
+        )
+        resolved = {}
+        for amenity in amenities:
+            resolved[amenity.id] = amenity.id
+            resolved[amenity.name] = amenity.id
+        return resolved
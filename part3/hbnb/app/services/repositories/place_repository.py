@@ -1,9 +1,20 @@
+from sqlalchemy import Integer, case, cast, func, or_, select, update
+from app.extensions import db
 from app.models.place import Place
+from app.models.review import Review
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.pagination import apply_cursor, clamp_limit, cut_page, keyset_page
+from app.persistence.geo import (
+    CELLS_PER_DEGREE, LNG_CELLS, cell_ranges, decode_distance_cursor,
+    encode_distance_cursor, haversine_km
+)
 
 
 class PlaceRepository(SQLAlchemyRepository):
     """Repository for Place-specific database operations"""
+
+    # Maximum number of IDs sent in a single IN (...) clause
+    ID_CHUNK_SIZE = 5000
     
     def __init__(self):
         """Initialize PlaceRepository with Place model"""
@@ -11,4 +22,204 @@ class PlaceRepository(SQLAlchemyRepository):
 
     def get_all_places(self):
         """Get all places from the database"""
-        return self.get_all()
\ No newline at end of file
+        return self.get_all()
+
+    def ids_by_owner(self, owner_id):
+        """Get the IDs of the places of an owner, without loading the places"""
+        rows = db.session.query(self.model.id).filter(self.model.owner_id == owner_id)
+        return [place_id for (place_id,) in rows]
+
+    def count_by_owner(self, owner_id):
+        """Count the places of an owner (scans their index entries)"""
+        return (db.session.query(func.count(self.model.id))
+                .filter(self.model.owner_id == owner_id).scalar())
+
+    def get_owner_page(self, owner_id, limit=None, cursor=None, columns=None):
+        """
+        Get one page of an owner's places in (created_at, id) order
+
+        A range scan of idx_places_owner_id, which is already in keyset
+        order, so no sort is needed whatever the owner's place count.
+
+        Returns:
+            Tuple (places, next_cursor)
+        """
+        return self.find_page('owner_id', owner_id, limit, cursor, columns)
+
+    def get_places_page(self, limit=None, cursor=None, min_price=None,
+                        max_price=None, bbox=None, place_ids=None, columns=None):
+        """
+        Get one page of places, filtered in SQL
+
+        Args:
+            limit: Page size
+            cursor: Cursor returned with the previous page
+            min_price: Minimum price per night (inclusive)
+            max_price: Maximum price per night (inclusive)
+            bbox: Tuple (min_lat, min_lng, max_lat, max_lng)
+            place_ids: Optional list of candidate place IDs
+            columns: Optional list of columns to select instead of places,
+                must include created_at and id
+
+        Returns:
+            Tuple (places, next_cursor)
+        """
+        query = self._filtered(min_price, max_price, bbox, columns)
+        if place_ids is None:
+            return keyset_page(query, self.model, limit, cursor)
+
+        # Candidates come from an index: page through them chunk by chunk,
+        # each chunk contributing at most one page, then merge
+        limit = clamp_limit(limit)
+        query = apply_cursor(query, self.model, cursor).order_by(self.model.created_at, self.model.id)
+        rows = []
+        for start in range(0, len(place_ids), self.ID_CHUNK_SIZE):
+            chunk = place_ids[start:start + self.ID_CHUNK_SIZE]
+            rows.extend(query.filter(self.model.id.in_(chunk)).limit(limit + 1))
+        rows.sort(key=lambda place: (place.created_at, place.id))
+        return cut_page(rows[:limit + 1], limit)
+
+    def iter_places(self, columns, cursor=None, min_price=None, max_price=None,
+                    bbox=None, place_ids=None, batch_size=1000):
+        """
+        Iterate over every matching place in (created_at, id) order
+
+        Rows are tuples of columns read from a server-side cursor,
+        batch_size at a time. Candidates from an index are checked as
+        rows go by rather than sent in an IN (...) clause.
+
+        Args:
+            columns: List of columns to select, must include id
+            cursor: Optional cursor to start after
+            place_ids: Optional collection of candidate place IDs
+        """
+        query = self._filtered(min_price, max_price, bbox, columns)
+        query = apply_cursor(query, self.model, cursor).order_by(self.model.created_at, self.model.id)
+        rows = self._iterate(query, batch_size)
+        if place_ids is None:
+            return rows
+        place_ids = set(place_ids)
+        return (row for row in rows if row.id in place_ids)
+
+    def _filtered(self, min_price, max_price, bbox, columns):
+        """Query places by price range and bounding box"""
+        query = self.model.query
+        if columns:
+            query = query.with_entities(*columns)
+        if min_price is not None:
+            query = query.filter(self.model.price >= min_price)
+        if max_price is not None:
+            query = query.filter(self.model.price <= max_price)
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            query = query.filter(
+                self.model.latitude.between(min_lat, max_lat),
+                self.model.longitude.between(min_lng, max_lng)
+            )
+        return query
+
+    def rebuild_rating_stats(self, place_ids=None):
+        """
+        Recompute the rating aggregates from the reviews table
+
+        All places are recomputed with a single GROUP BY over reviews,
+        then written back with one bulk UPDATE. updated_at is kept: the
+        aggregates derive from the reviews, the places did not change.
+
+        Args:
+            place_ids: Optional list of place IDs to restrict the rebuild
+
+        Returns:
+            Number of places that have at least one review
+        """
+        histogram = [
+            func.sum(case((Review.rating == rating, 1), else_=0)).label(f'rating_{rating}_count')
+            for rating in range(1, 6)
+        ]
+        stats = select(
+            Review.place_id.label('id'),
+            func.count(Review.id).label('review_count'),
+            func.sum(Review.rating).label('rating_sum'),
+            *histogram
+        ).group_by(Review.place_id)
+        keep_updated_at = {'updated_at': self.model.updated_at}
+        reset = update(self.model).values(
+            review_count=0, rating_sum=0, **keep_updated_at,
+            **{f'rating_{rating}_count': 0 for rating in range(1, 6)}
+        )
+        if place_ids is not None:
+            stats = stats.where(Review.place_id.in_(place_ids))
+            reset = reset.where(self.model.id.in_(place_ids))
+
+        rows = [dict(row._mapping) for row in db.session.execute(stats)]
+        db.session.execute(reset, execution_options={'synchronize_session': False})
+        if rows:
+            db.session.execute(update(self.model).values(**keep_updated_at), rows)
+        self._commit()
+        return len(rows)
+
+    def search_nearby(self, latitude, longitude, radius_km, limit=None, cursor=None):
+        """
+        Get one page of places within a radius, closest first
+
+        Candidates are pruned in SQL on the geo_cell index, then exact
+        distances are computed in one vectorized haversine pass.
+
+        Args:
+            latitude: Center latitude
+            longitude: Center longitude
+            radius_km: Search radius in kilometers
+            limit: Page size
+            cursor: Cursor returned with the previous page
+
+        Returns:
+            Tuple (list of (place, distance_km), next_cursor)
+        """
+        limit = clamp_limit(limit)
+        after = decode_distance_cursor(cursor) if cursor else None
+
+        ranges = cell_ranges(latitude, longitude, radius_km)
+        candidates = db.session.execute(
+            select(self.model.id, self.model.latitude, self.model.longitude)
+            .where(or_(*[self.model.geo_cell.between(lo, hi) for lo, hi in ranges]))
+        ).all()
+        distances = haversine_km(latitude, longitude,
+                                 [row.latitude for row in candidates],
+                                 [row.longitude for row in candidates])
+
+        hits = sorted(
+            (distance, row.id)
+            for row, distance in zip(candidates, distances)
+            if distance <= radius_km
+        )
+        if after is not None:
+            hits = [hit for hit in hits if hit > after]
+
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_distance_cursor(*hits[-1])
+        if not hits:
+            return [], None
+
+        places = {place.id: place for place in
+                  self.model.query.filter(self.model.id.in_([obj_id for _, obj_id in hits]))}
+        return [(places[obj_id], distance) for distance, obj_id in hits], next_cursor
+
+    def rebuild_geo_cells(self):
+        """
+        Recompute geo_cell for every place in a single UPDATE, updated_at
+        kept
+
+        Returns:
+            Number of places updated
+        """
+        row = cast((self.model.latitude + 90) * CELLS_PER_DEGREE, Integer)
+        col = cast((self.model.longitude + 180) * CELLS_PER_DEGREE, Integer)
+        result = db.session.execute(
+            update(self.model).values(geo_cell=row * LNG_CELLS + col,
+                                      updated_at=self.model.updated_at),
+            execution_options={'synchronize_session': False}
+        )
+        self._commit()
+        return result.rowcount
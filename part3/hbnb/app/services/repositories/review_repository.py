@@ -1,3 +1,5 @@
+from sqlalchemy import exists
+from app.extensions import db
 from app.models.review import Review
 from app.persistence.repository import SQLAlchemyRepository
 
@@ -11,4 +13,29 @@ class ReviewRepository(SQLAlchemyRepository):
 
     def get_all_reviews(self):
         """Get all reviews from the database"""
-        return self.get_all()
\ No newline at end of file
+        return self.get_all()
+
+    def user_has_reviewed(self, user_id, place_id):
+        """
+        Check if a user already reviewed a place
+
+        Runs a single EXISTS probe on the (user_id, place_id) unique index.
+
+        Args:
+            user_id: The reviewer ID
+            place_id: The reviewed place ID
+
+        Returns:
+            True if a review exists, False otherwise
+        """
+        return db.session.query(
+            exists().where(
+                self.model.user_id == user_id,
+                self.model.place_id == place_id
+            )
+        ).scalar()
+
+    def reviewed_place_ids(self, user_id):
+        """Get the IDs of the places a user has reviewed"""
+        rows = db.session.query(self.model.place_id).filter(self.model.user_id == user_id)
+        return [place_id for (place_id,) in rows]
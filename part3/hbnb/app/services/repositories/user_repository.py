@@ -1,4 +1,8 @@
-from app.models.user import User
+from sqlalchemy import func, select, update
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User, normalize_email
+from app.persistence.cache import invalidate
 from app.persistence.repository import SQLAlchemyRepository
 
 
@@ -11,7 +15,10 @@ class UserRepository(SQLAlchemyRepository):
 
     def get_user_by_email(self, email):
         """
-        Get a user by email address
+        Get a user by email address, ignoring case and surrounding spaces
+
+        One equality probe on the unique email_normalized index, then on a
+        miss one on the rows not backfilled yet (get_unnormalized_by_email).
         
         Args:
             email: The email address to search for
@@ -19,7 +26,26 @@ class UserRepository(SQLAlchemyRepository):
         Returns:
             User object if found, None otherwise
         """
-        return self.model.query.filter_by(email=email.lower()).first()
+        if not email:
+            return None
+        user = self.model.query.filter_by(email_normalized=normalize_email(email)).first()
+        if user is None:
+            user = self.get_unnormalized_by_email(email)
+        return user
+
+    def get_unnormalized_by_email(self, email):
+        """
+        Get a user whose email_normalized is not filled yet
+
+        Rows written before the column existed keep NULL until
+        `flask hbnb backfill-emails` runs, and the unique index does not
+        cover them. They are compared on lower(trim(email)), within the
+        IS NULL range of the index, which is empty once backfilled.
+        """
+        return self.model.query.filter(
+            self.model.email_normalized.is_(None),
+            func.lower(func.trim(self.model.email)) == normalize_email(email)
+        ).first()
 
     def get_all_users(self):
         """Get all users from the database"""
@@ -35,4 +61,85 @@ class UserRepository(SQLAlchemyRepository):
         Returns:
             True if user exists, False otherwise
         """
-        return self.get_user_by_email(email) is not None
\ No newline at end of file
+        return self.get_user_by_email(email) is not None
+
+    def backfill_email_normalized(self, batch_size=1000):
+        """
+        Fill email_normalized for rows written before the column existed
+
+        Rows are processed in primary key order, one UPDATE and one
+        commit per batch.
+
+        Returns:
+            Number of rows updated
+        """
+        updated = 0
+        while True:
+            rows = db.session.execute(
+                select(self.model.id, self.model.email)
+                .where(self.model.email_normalized.is_(None))
+                .order_by(self.model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            db.session.execute(update(self.model), [
+                {'id': row.id, 'email_normalized': normalize_email(row.email)} for row in rows
+            ])
+            self._commit()
+            updated += len(rows)
+
+    def duplicate_normalized_emails(self):
+        """Normalized emails shared by several users (they block the unique index)"""
+        return list(db.session.execute(
+            select(self.model.email_normalized)
+            .where(self.model.email_normalized.is_not(None))
+            .group_by(self.model.email_normalized)
+            .having(func.count() > 1)
+        ).scalars())
+
+    def adjust_place_count(self, user_id, delta):
+        """
+        Add delta to a user's place_count
+
+        One Core UPDATE in the caller's transaction, so concurrent writes
+        add up atomically with the place; an unknown (NULL) count stays
+        unknown. updated_at and the users collection version are kept,
+        the user itself did not change.
+        """
+        users = self.model.__table__
+        db.session.execute(
+            update(users).where(users.c.id == user_id)
+            .values(place_count=users.c.place_count + delta, updated_at=users.c.updated_at)
+        )
+        invalidate(self.model.__name__, user_id)
+        user = db.session.identity_map.get(db.session.identity_key(self.model, user_id))
+        if user is not None:
+            db.session.expire(user, ['place_count'])
+
+    def rebuild_place_counts(self, user_ids=None):
+        """
+        Recompute place_count from the places table
+
+        One GROUP BY over the owner_id index, written back with one bulk
+        UPDATE.
+
+        Args:
+            user_ids: Optional list of user IDs to restrict the rebuild
+
+        Returns:
+            Number of users owning at least one place
+        """
+        counts = (select(Place.owner_id.label('id'), func.count(Place.id).label('place_count'))
+                  .group_by(Place.owner_id))
+        reset = update(self.model).values(place_count=0)
+        if user_ids is not None:
+            counts = counts.where(Place.owner_id.in_(user_ids))
+            reset = reset.where(self.model.id.in_(user_ids))
+
+        rows = [dict(row._mapping) for row in db.session.execute(counts)]
+        db.session.execute(reset, execution_options={'synchronize_session': False})
+        if rows:
+            db.session.execute(update(self.model), rows)
+        self._commit()
+        return len(rows)
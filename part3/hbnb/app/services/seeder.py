@@ -0,0 +1,333 @@
+"""
+Synthetic benchmark datasets, `flask hbnb seed --scale N`
+
+Scale 1 is 1,000 users and 2,500 places with their reviews and amenity
+links, about 16,000 rows; scale 60 is about a million. The data is shaped
+like a real listing site rather than uniform:
+
+- places are clustered around a few cities, with log-normal prices;
+- hosts are skewed, a tenth of the users own about half of the places;
+- amenities are attached with Zipf-distributed popularity;
+- review counts per place follow a power law, most ratings are high.
+
+Everything, IDs and timestamps included, comes from one random.Random
+seeded with --seed, so a (scale, seed) pair always produces the same
+dataset. The database must be empty: its secondary indexes are dropped
+during the load and rebuilt at the end, which is faster than updating
+them row by row, and rows are written with Core multi-row INSERTs, one
+commit per batch, with the denormalized columns (rating aggregates,
+place counts, geo cells, normalized emails) computed on the way.
+"""
+import itertools
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models.amenity import Amenity, place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User, normalize_email
+from app.passwords import get_password_hasher
+from app.persistence.geo import geo_cell
+from app.persistence.versions import bump_versions
+
+DEFAULT_SEED = 42
+DEFAULT_BATCH_SIZE = 5000
+
+USERS_PER_SCALE = 1000
+PLACES_PER_SCALE = 2500
+# Password of every generated user, the first one is an admin
+SEED_PASSWORD = 'password123'
+ADMIN_EMAIL = 'admin@example.com'
+
+# Owner index = users * random() ** HOST_SKEW: P(top 10%) = 0.1 ** (1 / 3)
+HOST_SKEW = 3
+# Reviews per place: Pareto(REVIEW_ALPHA) - 1, capped
+REVIEW_ALPHA = 1.2
+MAX_REVIEWS_PER_PLACE = 500
+RATING_WEIGHTS = (4, 6, 15, 35, 40)
+# Amenity popularity: weight of rank r is 1 / r ** AMENITY_ZIPF
+AMENITY_ZIPF = 1.1
+MEAN_AMENITIES_PER_PLACE = 3
+# Timestamps spread over a year from START
+START = datetime(2024, 1, 1)
+SPAN_SECONDS = 365 * 24 * 3600
+
+# (name, latitude, longitude, weight)
+CITIES = (
+    ("Paris", 48.8566, 2.3522, 10), ("London", 51.5074, -0.1278, 9),
+    ("New York", 40.7128, -74.0060, 9), ("Barcelona", 41.3874, 2.1686, 6),
+    ("Rome", 41.9028, 12.4964, 6), ("Lisbon", 38.7223, -9.1393, 4),
+    ("Berlin", 52.5200, 13.4050, 4), ("Tokyo", 35.6762, 139.6503, 5),
+    ("Mexico City", 19.4326, -99.1332, 3), ("Cape Town", -33.9249, 18.4241, 2),
+    ("Sydney", -33.8688, 151.2093, 3), ("Marrakesh", 31.6295, -7.9811, 2),
+    ("Montreal", 45.5019, -73.5674, 2), ("Bangkok", 13.7563, 100.5018, 3),
+    ("Reykjavik", 64.1466, -21.9426, 1),
+)
+CITY_SPREAD_DEGREES = 0.08
+MEDIAN_PRICE = 90
+PRICE_SIGMA = 0.6
+
+AMENITY_NAMES = (
+    "Wifi", "Kitchen", "Washer", "Air conditioning", "Heating", "TV", "Hair dryer",
+    "Iron", "Dedicated workspace", "Free parking", "Dryer", "Coffee maker",
+    "Dishwasher", "Balcony", "Elevator", "Pool", "Hot tub", "Gym", "Pets allowed",
+    "Crib", "Bathtub", "Fireplace", "BBQ grill", "Garden", "Sea view", "EV charger",
+    "Smoke alarm", "First aid kit", "Self check-in", "Luggage drop-off", "Bikes",
+    "Piano", "Sauna", "Beach access", "Ski-in/ski-out", "Breakfast", "Game console",
+    "Board games", "Outdoor shower", "Lake access",
+)
+FIRST_NAMES = ("Ana", "Ben", "Chloe", "David", "Emma", "Farid", "Grace", "Hugo", "Ines",
+               "Jonas", "Keiko", "Liam", "Maya", "Noah", "Olga", "Pablo", "Quinn", "Rosa",
+               "Sami", "Tara", "Umar", "Vera", "Wei", "Yara", "Zoe")
+LAST_NAMES = ("Martin", "Smith", "Garcia", "Rossi", "Muller", "Silva", "Tanaka", "Dubois",
+              "Kowalski", "Nguyen", "Haddad", "Johnson", "Lopez", "Novak", "Jensen")
+PLACE_KINDS = ("Studio", "Loft", "Apartment", "Flat", "House", "Cabin", "Villa", "Room",
+               "Townhouse", "Penthouse")
+PLACE_ADJECTIVES = ("Cosy", "Bright", "Quiet", "Modern", "Charming", "Spacious", "Central",
+                    "Rustic", "Elegant", "Sunny")
+REVIEW_TEXTS = {
+    1: ("Not as described.", "Dirty and noisy, would not stay again."),
+    2: ("Disappointing stay.", "The place needs work."),
+    3: ("Fine for a night.", "Okay, nothing special."),
+    4: ("Nice place, good location.", "Comfortable and clean."),
+    5: ("Perfect stay!", "Wonderful host, highly recommended.", "Would book again."),
+}
+
+
+class SeedReport:
+    """Rows written per table and throughput"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        """Stop the clock"""
+        self.elapsed = time.perf_counter() - self.started_at
+
+    @property
+    def total(self):
+        """Rows written in every table"""
+        return sum(self.counts.values())
+
+    @property
+    def rows_per_second(self):
+        """Rows written per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.total / self.elapsed
+
+    def to_dict(self):
+        """Convert the report to a dictionary"""
+        return {
+            'counts': dict(self.counts),
+            'total': self.total,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+class DatasetGenerator:
+    """Generates the rows of a dataset, in foreign key order"""
+
+    def __init__(self, scale=1, seed=DEFAULT_SEED):
+        if scale <= 0:
+            raise ValueError("Scale must be greater than 0")
+        self.rng = random.Random(seed)
+        self.user_total = max(2, round(USERS_PER_SCALE * scale))
+        self.place_total = max(1, round(PLACES_PER_SCALE * scale))
+        self._user_ids = []
+        self._user_created = []
+        self._amenity_ids = []
+        # Cumulative weights, random.choices() would recompute them every call
+        self._cities = list(itertools.accumulate(city[3] for city in CITIES))
+        self._ratings = list(itertools.accumulate(RATING_WEIGHTS))
+        self._amenity_weights = list(itertools.accumulate(
+            1 / rank ** AMENITY_ZIPF for rank in range(1, len(AMENITY_NAMES) + 1)))
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _after(self, moment):
+        """A random moment between `moment` and the end of the span"""
+        left = SPAN_SECONDS - (moment - START).total_seconds()
+        return moment + timedelta(seconds=self.rng.uniform(0, max(left, 0)))
+
+    def amenities(self):
+        """Every amenity row"""
+        rows = []
+        for name in AMENITY_NAMES:
+            created_at = self._after(START)
+            rows.append({'id': self._uuid(), 'name': name,
+                         'created_at': created_at, 'updated_at': created_at})
+        self._amenity_ids = [row['id'] for row in rows]
+        return rows
+
+    def users(self, password_hash):
+        """
+        Every user row, after the owners of the places are drawn
+
+        Returns:
+            Tuple (user rows, owner index of each place)
+        """
+        rng = self.rng
+        owners = [min(int(self.user_total * rng.random() ** HOST_SKEW), self.user_total - 1)
+                  for _ in range(self.place_total)]
+        place_counts = Counter(owners)
+        rows = []
+        for i in range(self.user_total):
+            email = ADMIN_EMAIL if i == 0 else f"user{i}@example.com"
+            created_at = self._after(START)
+            rows.append({
+                'id': self._uuid(), 'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES), 'email': email,
+                'email_normalized': normalize_email(email), 'password': password_hash,
+                'is_admin': i == 0, 'place_count': place_counts.get(i, 0),
+                'created_at': created_at, 'updated_at': created_at
+            })
+        self._user_ids = [row['id'] for row in rows]
+        self._user_created = [row['created_at'] for row in rows]
+        return rows, owners
+
+    def places(self, owners):
+        """
+        Yield (place, its reviews, its amenity links) for each place
+
+        The place's rating aggregates are computed from its reviews.
+        """
+        rng = self.rng
+        for owner in owners:
+            name, city_lat, city_lng, _ = rng.choices(CITIES, cum_weights=self._cities)[0]
+            latitude = max(-90.0, min(90.0, rng.gauss(city_lat, CITY_SPREAD_DEGREES)))
+            longitude = max(-180.0, min(180.0, rng.gauss(city_lng, CITY_SPREAD_DEGREES)))
+            price = round(max(10.0, rng.lognormvariate(math.log(MEDIAN_PRICE), PRICE_SIGMA)), 2)
+            kind = rng.choice(PLACE_KINDS)
+            created_at = self._after(self._user_created[owner])
+            place = {
+                'id': self._uuid(),
+                'title': f"{rng.choice(PLACE_ADJECTIVES)} {kind.lower()} in {name}",
+                'description': f"{kind} near the center of {name}.",
+                'price': price, 'latitude': latitude, 'longitude': longitude,
+                'owner_id': self._user_ids[owner], 'geo_cell': geo_cell(latitude, longitude),
+                'created_at': created_at, 'updated_at': created_at,
+                'review_count': 0, 'rating_sum': 0,
+                **{f'rating_{rating}_count': 0 for rating in range(1, 6)}
+            }
+            reviews = self._reviews(place, owner)
+            for review in reviews:
+                place['review_count'] += 1
+                place['rating_sum'] += review['rating']
+                place[f"rating_{review['rating']}_count"] += 1
+            links = [{'place_id': place['id'], 'amenity_id': amenity_id}
+                     for amenity_id in self._amenities()]
+            yield place, reviews, links
+
+    def _reviews(self, place, owner):
+        rng = self.rng
+        count = min(int(rng.paretovariate(REVIEW_ALPHA)) - 1,
+                    MAX_REVIEWS_PER_PLACE, self.user_total - 1)
+        if count <= 0:
+            return []
+        reviewers = [i for i in rng.sample(range(self.user_total), count + 1) if i != owner]
+        reviews = []
+        for reviewer in reviewers[:count]:
+            rating = rng.choices((1, 2, 3, 4, 5), cum_weights=self._ratings)[0]
+            created_at = self._after(max(place['created_at'], self._user_created[reviewer]))
+            reviews.append({
+                'id': self._uuid(), 'text': rng.choice(REVIEW_TEXTS[rating]), 'rating': rating,
+                'place_id': place['id'], 'user_id': self._user_ids[reviewer],
+                'created_at': created_at, 'updated_at': created_at
+            })
+        return reviews
+
+    def _amenities(self):
+        count = min(int(self.rng.expovariate(1 / MEAN_AMENITIES_PER_PLACE)),
+                    len(self._amenity_ids))
+        if not count:
+            return set()
+        picked = self.rng.choices(self._amenity_ids, cum_weights=self._amenity_weights, k=count)
+        return sorted(set(picked))
+
+
+TABLES = (Amenity.__table__, User.__table__, Place.__table__, Review.__table__, place_amenity)
+
+
+def _write(table, rows, report):
+    if rows:
+        db.session.execute(table.insert(), rows)
+        report.counts[table.name] += len(rows)
+
+
+def seed_database(scale=1, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+    """
+    Generate a dataset and write it to the database
+
+    Args:
+        scale: Size of the dataset, 1 is 1,000 users and 2,500 places
+        seed: Seed of the random generator
+        batch_size: Places (with their reviews and links) per commit
+        on_batch: Optional callback receiving the report after each batch
+
+    Returns:
+        SeedReport
+
+    Raises:
+        ValueError: If the scale is not positive or the database has users
+    """
+    generator = DatasetGenerator(scale, seed)
+    if db.session.query(User.id).first() is not None:
+        raise ValueError("The database is not empty")
+    report = SeedReport()
+    # One bcrypt hash shared by every user, hashing each would take minutes
+    password_hash = get_password_hasher().hash(SEED_PASSWORD)
+
+    indexes = [index for table in TABLES for index in table.indexes]
+    for index in indexes:
+        index.drop(db.session.connection(), checkfirst=True)
+    db.session.commit()
+    try:
+        _load(generator, password_hash, batch_size, report, on_batch)
+    finally:
+        db.session.rollback()
+        for index in indexes:
+            index.create(db.session.connection(), checkfirst=True)
+        db.session.commit()
+    bump_versions([table.name for table in TABLES])
+    db.session.commit()
+    report.finish()
+    return report
+
+
+def _load(generator, password_hash, batch_size, report, on_batch):
+    _write(Amenity.__table__, generator.amenities(), report)
+    users, owners = generator.users(password_hash)
+    for start in range(0, len(users), batch_size):
+        _write(User.__table__, users[start:start + batch_size], report)
+        db.session.commit()
+    del users
+
+    places, reviews, links = [], [], []
+
+    def flush():
+        _write(Place.__table__, places, report)
+        _write(Review.__table__, reviews, report)
+        _write(place_amenity, links, report)
+        db.session.commit()
+        places.clear()
+        reviews.clear()
+        links.clear()
+        if on_batch:
+            on_batch(report)
+
+    for place, place_reviews, place_links in generator.places(owners):
+        places.append(place)
+        reviews.extend(place_reviews)
+        links.extend(place_links)
+        if len(places) >= batch_size:
+            flush()
+    flush()
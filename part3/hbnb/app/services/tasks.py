@@ -0,0 +1,134 @@
+"""
+Background tasks with progress reporting
+
+Long operations (deleting a host with thousands of places) run on a small
+thread pool (BACKGROUND_TASK_WORKERS threads), each in its own application
+context and therefore its own session. The request only gets the task,
+whose progress can then be polled. With 0 workers tasks run inline, which
+keeps tests deterministic.
+
+Tasks live in the memory of the worker process that started them; the
+most recent MAX_TASKS are kept.
+"""
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+
+MAX_TASKS = 1000
+
+
+class Task:
+    """State and progress of a background task"""
+
+    def __init__(self, kind, subject, total=None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.subject = subject
+        self.total = total
+        self.done = 0
+        self.status = 'pending'
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    def advance(self, count=1):
+        """Record progress"""
+        self.done += count
+
+    def to_dict(self):
+        """Convert the task to a dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'subject': self.subject,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'progress': round(self.done / self.total, 3) if self.total else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class BackgroundTasks:
+    """Runs tasks on a thread pool and remembers the recent ones"""
+
+    def __init__(self, app, workers=1, max_tasks=MAX_TASKS):
+        self.app = app
+        self.workers = workers
+        self.max_tasks = max_tasks
+        self._tasks = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers) if workers else None
+
+    def submit(self, kind, subject, func, total=None):
+        """
+        Start func(task) in the background
+
+        Args:
+            kind: Type of task, e.g. 'delete_user'
+            subject: ID of the object the task works on
+            func: Callable receiving the Task, calling task.advance()
+            total: Expected amount of work, for the progress ratio
+
+        Returns:
+            The Task
+        """
+        task = Task(kind, subject, total)
+        with self._lock:
+            self._tasks[task.id] = task
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+        if self._pool is None:
+            self._run(task, func)
+        else:
+            self._pool.submit(self._run, task, func)
+        return task
+
+    def get(self, task_id):
+        """Get a task by ID, None if unknown"""
+        return self._tasks.get(task_id)
+
+    def pending(self, kind, subject):
+        """The unfinished task of that kind on that subject, None if there is none"""
+        with self._lock:
+            for task in reversed(self._tasks.values()):
+                if (task.kind == kind and task.subject == subject
+                        and task.status in ('pending', 'running')):
+                    return task
+        return None
+
+    def _run(self, task, func):
+        task.status = 'running'
+        try:
+            with self.app.app_context():
+                func(task)
+            task.status = 'done'
+        except Exception as e:
+            task.status = 'failed'
+            task.error = str(e)
+            self.app.logger.error("Task %s (%s) failed:\n%s", task.id, task.kind,
+                                  traceback.format_exc())
+        finally:
+            task.finished_at = datetime.utcnow()
+
+    def shutdown(self):
+        """Wait for the running tasks"""
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def get_background_tasks():
+    """Get the background task runner of the current application"""
+    return current_app.extensions['hbnb_background_tasks']
+
+
+def init_background_tasks(app):
+    """Create the application's background task runner"""
+    app.extensions['hbnb_background_tasks'] = BackgroundTasks(
+        app, workers=app.config.get('BACKGROUND_TASK_WORKERS', 1))
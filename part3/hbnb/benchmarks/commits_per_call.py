@@ -0,0 +1,83 @@
+"""
+Count the transactions committed per API call and per composite facade
+operation, committing on every write versus inside a unit of work
+
+Usage (from part3/hbnb):
+    python -m benchmarks.commits_per_call
+"""
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.user import User
+from app.services import facade
+from tests.query_counter import QueryCounter
+
+AMENITY_COUNT = 10
+
+
+def run(per_request):
+    """
+    Replay the scenario, return a list of (call, commits)
+
+    per_request enables the request-level unit of work and groups the
+    composite facade operation in facade.unit_of_work().
+    """
+    app = create_app('config.TestingConfig')
+    app.config['UNIT_OF_WORK_PER_REQUEST'] = per_request
+    results = []
+    with app.app_context():
+        host = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+        guest = User(first_name="Bob", last_name="Guest", email="guest@example.com", password="x")
+        amenities = [Amenity(name=f"Amenity {i}") for i in range(AMENITY_COUNT)]
+        db.session.add_all([host, guest] + amenities)
+        db.session.commit()
+        host_token = create_access_token(identity=host.id)
+        guest_token = create_access_token(identity=guest.id)
+        amenity_ids = [amenity.id for amenity in amenities]
+        client = app.test_client()
+
+        def call(label, method, url, token, **kwargs):
+            with QueryCounter() as counter:
+                response = getattr(client, method)(
+                    url, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+            results.append((label, counter.commits))
+            return response.get_json(silent=True)
+
+        place = call('POST /places/', 'post', '/api/v1/places/', host_token, json={
+            'title': "Loft", 'description': "", 'price': 80, 'latitude': 48.8, 'longitude': 2.3})
+        review = call('POST /reviews/', 'post', '/api/v1/reviews/', guest_token, json={
+            'text': "Nice", 'rating': 4, 'place_id': place['id']})
+        call('PUT /reviews/<id>', 'put', f"/api/v1/reviews/{review['id']}", guest_token,
+             json={'text': "Nice", 'rating': 5})
+        call('DELETE /reviews/<id>', 'delete', f"/api/v1/reviews/{review['id']}", guest_token)
+
+        def attach(place_id):
+            for amenity_id in amenity_ids:
+                facade.add_amenity_to_place(place_id, amenity_id)
+
+        place_data = {'title': "Barn", 'description': "", 'price': 30,
+                      'latitude': 44, 'longitude': 5, 'owner_id': host.id}
+        with QueryCounter() as counter:
+            if per_request:
+                with facade.unit_of_work():
+                    attach(facade.create_place(place_data).id)
+            else:
+                attach(facade.create_place(place_data).id)
+        results.append((f'create place + attach {AMENITY_COUNT} amenities', counter.commits))
+        db.session.remove()
+        db.drop_all()
+    return results
+
+
+def main():
+    before = run(per_request=False)
+    after = run(per_request=True)
+    width = max(len(label) for label, _ in before)
+    print(f"{'call':<{width}}  commits (per-write)  commits (unit of work)")
+    for (label, commits_before), (_, commits_after) in zip(before, after):
+        print(f"{label:<{width}}  {commits_before:>19}  {commits_after:>22}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""
+Latency and throughput of the endpoints behind the part4 frontend, at
+several dataset sizes, in-process and over a real WSGI server
+
+Flows, as the frontend sends them: login, list places (NDJSON stream),
+place detail, a page of a place's reviews, post a review. Each dataset
+comes from `flask hbnb seed` (app/services/seeder.py) in a temporary
+SQLite file. The 'inprocess' mode goes through the Flask test client;
+the 'wsgi' mode serves the app with werkzeug's threaded server in another
+process and sends real HTTP requests from --clients threads.
+
+Results (requests/s and p50/p95/p99 latency per endpoint) can be saved as
+a JSON baseline and later compared to it: a p50 or p95 latency higher, or
+a throughput lower, by more than --threshold is reported as a regression
+and the command exits with status 1. Baselines are only comparable on
+the same machine.
+
+Usage (from part3/hbnb):
+    python -m benchmarks.endpoints [--scales 0.1 1] [--modes inprocess wsgi]
+        [--requests 200] [--clients 4] [--save benchmarks/baselines/main.json]
+        [--compare benchmarks/baselines/main.json] [--threshold 0.2]
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+from app.services.seeder import SEED_PASSWORD
+from config import Config
+
+FLOWS = ('login', 'list_places', 'place_detail', 'list_reviews', 'post_review')
+WARMUP = 10
+# Compared between a run and its baseline: (metric, True if higher is worse)
+COMPARED = (('p50_ms', True), ('p95_ms', True), ('throughput_rps', False))
+
+
+def make_config(database, bcrypt_rounds):
+    """Production settings on the benchmark database"""
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        JWT_SECRET_KEY = 'benchmark-secret-key-of-at-least-32-bytes'
+        BCRYPT_LOG_ROUNDS = bcrypt_rounds
+
+    return BenchmarkConfig
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (ms) of one endpoint"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def build_requests(app, count, rng):
+    """
+    Requests of every flow, drawn from the dataset
+
+    Returns:
+        Dict flow -> list of (method, path, headers, body, expected status)
+    """
+    with app.app_context():
+        users = db.session.execute(
+            select(User.id, User.email).where(User.is_admin.is_(False)).order_by(User.id)).all()
+        places = db.session.execute(
+            select(Place.id, Place.owner_id, Place.review_count).order_by(Place.id)).all()
+        reviewed = [place for place in places if place.review_count] or places
+
+        def token(user):
+            return {'Authorization': 'Bearer ' + create_access_token(
+                identity=user.id, additional_claims={'email': user.email, 'is_admin': False})}
+
+        requests = {flow: [] for flow in FLOWS}
+        for _ in range(count):
+            user = rng.choice(users)
+            requests['login'].append(('POST', '/api/v1/auth/login', {},
+                                      {'email': user.email, 'password': SEED_PASSWORD}, 200))
+            requests['list_places'].append(
+                ('GET', '/api/v1/places/', {'Accept': 'application/x-ndjson'}, None, 200))
+            requests['place_detail'].append(
+                ('GET', f'/api/v1/places/{rng.choice(places).id}', {}, None, 200))
+            requests['list_reviews'].append(
+                ('GET', f'/api/v1/places/{rng.choice(reviewed).id}/reviews', {}, None, 200))
+
+        # Each review needs a (user, place) pair not reviewed yet and not owned
+        chosen = [rng.choice(users) for _ in range(count)]
+        taken = set(db.session.execute(
+            select(Review.user_id, Review.place_id)
+            .where(Review.user_id.in_({user.id for user in chosen}))).all())
+        for user in chosen:
+            for _ in range(100):
+                place = rng.choice(places)
+                if place.owner_id != user.id and (user.id, place.id) not in taken:
+                    break
+            taken.add((user.id, place.id))
+            requests['post_review'].append((
+                'POST', '/api/v1/reviews/', token(user),
+                {'text': "Benchmark stay", 'rating': rng.randint(1, 5), 'place_id': place.id},
+                201))
+        return requests
+
+
+def run_inprocess(app, requests):
+    """Send the requests one by one through the test client"""
+    client = app.test_client()
+
+    def send(request):
+        method, path, headers, body, expected = request
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        response.get_data()
+        return time.perf_counter() - started, response.status_code != expected
+
+    for request in requests[:WARMUP]:
+        send(request)
+    started = time.perf_counter()
+    outcomes = [send(request) for request in requests[WARMUP:]]
+    return outcomes, time.perf_counter() - started
+
+
+def serve(database, bcrypt_rounds, ready):
+    """Serve the app with werkzeug's threaded server (child process)"""
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    app = create_app(make_config(database, bcrypt_rounds))
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    ready.put(server.server_port)
+    server.serve_forever()
+
+
+def run_wsgi(port, requests, clients):
+    """Send the requests over HTTP from `clients` keep-alive connections"""
+
+    def worker(share):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        outcomes = []
+        for method, path, headers, body, expected in share:
+            payload = json.dumps(body) if body is not None else None
+            if payload is not None:
+                headers = {**headers, 'Content-Type': 'application/json'}
+            started = time.perf_counter()
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            outcomes.append((time.perf_counter() - started, response.status != expected))
+        connection.close()
+        return outcomes
+
+    worker(requests[:WARMUP])
+    measured = requests[WARMUP:]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        shares = executor.map(worker, [measured[i::clients] for i in range(clients)])
+        outcomes = [outcome for share in shares for outcome in share]
+    return outcomes, time.perf_counter() - started
+
+
+def bench_scale(scale, args, rng):
+    """Seed a dataset of that scale and measure every flow in every mode"""
+    directory = tempfile.mkdtemp()
+    database = os.path.join(directory, 'bench.db')
+    app = create_app(make_config(database, args.bcrypt_rounds))
+    results = []
+    try:
+        with app.app_context():
+            report = facade.seed_dataset(scale, args.seed, 5000)
+        print(f"scale {scale:g}: {report.total} rows seeded in {report.elapsed:.2f}s")
+        for mode in args.modes:
+            requests = build_requests(app, args.requests + WARMUP, rng)
+            server = None
+            if mode == 'wsgi':
+                ready = multiprocessing.Queue()
+                # Not a daemon, daemons cannot start the password hashing processes
+                server = multiprocessing.Process(
+                    target=serve, args=(database, args.bcrypt_rounds, ready))
+                server.start()
+                port = ready.get(timeout=60)
+            try:
+                for flow in FLOWS:
+                    if mode == 'wsgi':
+                        outcomes, elapsed = run_wsgi(port, requests[flow], args.clients)
+                    else:
+                        outcomes, elapsed = run_inprocess(app, requests[flow])
+                    summary = summarize([latency for latency, _ in outcomes],
+                                        sum(error for _, error in outcomes), elapsed)
+                    results.append({'scale': scale, 'mode': mode, 'endpoint': flow, **summary})
+                    print_result(results[-1])
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.join()
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        shutil.rmtree(directory)
+    return results
+
+
+def print_result(result):
+    errors = f"  {result['errors']} errors" if result['errors'] else ''
+    print(f"  {result['mode']:9} {result['endpoint']:13} {result['throughput_rps']:8.1f} req/s"
+          f"  p50 {result['p50_ms']:8.2f}  p95 {result['p95_ms']:8.2f}"
+          f"  p99 {result['p99_ms']:8.2f} ms{errors}")
+
+
+def compare(results, baseline, threshold):
+    """
+    Changes beyond the threshold against a baseline
+
+    Returns:
+        List of (result, metric, baseline value, relative change)
+    """
+    previous = {(run['scale'], run['mode'], run['endpoint']): run for run in baseline['runs']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['scale'], result['mode'], result['endpoint']))
+        if before is None:
+            continue
+        for metric, higher_is_worse in COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append((result, metric, old, change))
+    return regressions
+
+
+def metadata(args):
+    """Where and how the results were measured"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created_at': datetime.utcnow().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'requests': args.requests,
+        'clients': args.clients,
+        'bcrypt_rounds': args.bcrypt_rounds,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.1, 1],
+                        help='dataset sizes, see flask hbnb seed --scale')
+    parser.add_argument('--modes', nargs='+', choices=('inprocess', 'wsgi'),
+                        default=['inprocess', 'wsgi'])
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+    parser.add_argument('--clients', type=int, default=4, help='concurrent connections (wsgi)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4,
+                        help='bcrypt cost, the production cost makes login all bcrypt')
+    parser.add_argument('--seed', type=int, default=42, help='seed of the datasets and requests')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='baseline to compare the results to')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative change reported as a regression')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    rng = random.Random(args.seed)
+    results = []
+    for scale in args.scales:
+        results.extend(bench_scale(scale, args, rng))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({'meta': metadata(args), 'runs': results}, f, indent=2)
+        print(f"Baseline written to {args.save}")
+    if baseline is None:
+        return
+    regressions = compare(results, baseline, args.threshold)
+    print(f"Against {args.compare} (commit {baseline['meta'].get('commit')}):")
+    for result, metric, old, change in regressions:
+        print(f"  REGRESSION scale {result['scale']:g} {result['mode']} {result['endpoint']}: "
+              f"{metric} {old} -> {result[metric]} ({change:+.0%})")
+    if not regressions:
+        print(f"  no regression above {args.threshold:.0%}")
+        return
+    raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Password verification throughput: logins/sec inline and through the pool
+
+Usage (from part3/hbnb):
+    python -m benchmarks.logins_per_second [--rounds 12] [--workers N] [--seconds 5]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.passwords import PasswordHasher
+
+PASSWORD = "correct horse battery staple"
+
+
+def measure(hasher, password_hash, seconds, threads):
+    """Verify from `threads` request threads for `seconds`, return logins/sec"""
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(password_hash, PASSWORD)
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        total = sum(executor.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='pool processes')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each run')
+    args = parser.parse_args()
+
+    inline = PasswordHasher(rounds=args.rounds)
+    password_hash = inline.hash(PASSWORD)
+    rate = measure(inline, password_hash, args.seconds, threads=1)
+    print(f"cost {args.rounds}: inline       {rate:8.1f} logins/s  ({rate:.1f}/core)")
+
+    pooled = PasswordHasher(rounds=args.rounds, workers=args.workers)
+    try:
+        pooled.verify(password_hash, PASSWORD)  # start the processes
+        rate = measure(pooled, password_hash, args.seconds, threads=args.workers * 2)
+        print(f"cost {args.rounds}: {args.workers} processes {rate:8.1f} logins/s  "
+              f"({rate / args.workers:.1f}/core)")
+    finally:
+        pooled.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Serialization throughput of a list response: to_dict() + jsonify versus
+column projection + orjson
+
+Usage (from part3/hbnb):
+    python -m benchmarks.serialization [--rows 10000] [--repeat 5]
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime
+from flask import jsonify
+from sqlalchemy import insert
+from app import create_app
+from app.api import serialization
+from app.api.serialization import REVIEW_PROJECTION
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+
+
+def seed(rows):
+    """One place and `rows` reviews by as many users"""
+    now = datetime.utcnow()
+    owner = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+    db.session.add(owner)
+    db.session.flush()
+    place = Place(title="Loft", description="", price=80, latitude=48.8, longitude=2.3,
+                  owner_id=owner.id)
+    db.session.add(place)
+    db.session.flush()
+    users = [{'id': str(uuid.uuid4()), 'first_name': "Guest", 'last_name': str(i),
+              'email': f"guest{i}@example.com", 'email_normalized': f"guest{i}@example.com",
+              'password': "x", 'is_admin': False, 'created_at': now, 'updated_at': now}
+             for i in range(rows)]
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(Review), [
+        {'id': str(uuid.uuid4()), 'text': "Nice stay", 'rating': 1 + i % 5, 'place_id': place.id,
+         'user_id': user['id'], 'created_at': now, 'updated_at': now}
+        for i, user in enumerate(users)])
+    db.session.commit()
+
+
+def best_of(repeat, render):
+    """Best wall time of `repeat` renders, and the body size"""
+    best, size = float('inf'), 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        size = len(render())
+        best = min(best, time.perf_counter() - started)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000, help='reviews in the response')
+    parser.add_argument('--repeat', type=int, default=5, help='runs, the best one is kept')
+    args = parser.parse_args()
+
+    app = create_app('config.TestingConfig')
+    with app.test_request_context():
+        seed(args.rows)
+
+        def orm_to_dict():
+            return jsonify([review.to_dict() for review in facade.get_all_reviews()]).get_data()
+
+        def projection():
+            rows = facade.get_all_reviews(columns=REVIEW_PROJECTION.columns)
+            return serialization.dumps(REVIEW_PROJECTION.to_dicts(rows))
+
+        runs = [('to_dict + jsonify', orm_to_dict), ('projection + dumps', projection)]
+        for label, render in runs:
+            elapsed, size = best_of(args.repeat, render)
+            encoder = 'orjson' if serialization.orjson and label.startswith('proj') else 'json'
+            print(f"{label:20} {args.rows / elapsed:10.0f} rows/s  "
+                  f"{elapsed * 1000:7.1f} ms  {size / 1024:7.0f} KiB  ({encoder})")
+
+
+if __name__ == '__main__':
+    main()
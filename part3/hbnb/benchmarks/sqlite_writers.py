@@ -0,0 +1,79 @@
+"""
+Concurrent writers and readers on one SQLite file, with the driver
+defaults versus the 'sqlite' engine profile (WAL and pragmas)
+
+Each process stands for a gunicorn worker: it alternates short write
+transactions with reads and counts 'database is locked' errors.
+
+Usage (from part3/hbnb):
+    python -m benchmarks.sqlite_writers [--workers 4] [--operations 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+from sqlalchemy import create_engine, event, exc, text
+from app.persistence.engine import pragma_listener, engine_options
+from config import Config
+
+
+def make_engine(path, tuned):
+    """Engine on the file, with the profile's options and pragmas when tuned"""
+    uri = f'sqlite:///{path}'
+    if not tuned:
+        # The driver's own 5 s busy timeout is kept, as without a profile
+        return create_engine(uri)
+    options = engine_options({'DATABASE_PROFILE': 'sqlite', 'SQLALCHEMY_DATABASE_URI': uri})
+    engine = create_engine(uri, **options)
+    event.listen(engine, 'connect', pragma_listener(Config.SQLITE_PRAGMAS))
+    return engine
+
+
+def worker(args):
+    path, tuned, operations, worker_id = args
+    engine = make_engine(path, tuned)
+    locked = 0
+    for i in range(operations):
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("INSERT INTO events (worker, n) VALUES (:w, :n)"),
+                                   {'w': worker_id, 'n': i})
+            with engine.connect() as connection:
+                connection.execute(text("SELECT count(*) FROM events WHERE worker = :w"),
+                                   {'w': worker_id}).scalar()
+        except exc.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+    engine.dispose()
+    return locked
+
+
+def run(tuned, workers, operations):
+    """Elapsed seconds and 'database is locked' errors of one run"""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = make_engine(path, tuned)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, worker INT, n INT)"))
+    engine.dispose()
+    started = time.perf_counter()
+    with Pool(workers) as pool:
+        locked = sum(pool.map(worker, [(path, tuned, operations, w) for w in range(workers)]))
+    return time.perf_counter() - started, locked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4, help='writer processes')
+    parser.add_argument('--operations', type=int, default=300, help='writes per process')
+    args = parser.parse_args()
+
+    total = args.workers * args.operations
+    for label, tuned in (('driver defaults', False), ("'sqlite' profile", True)):
+        elapsed, locked = run(tuned, args.workers, args.operations)
+        print(f"{label:17} {total / elapsed:8.0f} writes/s  {locked:4} locked errors")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Peak Python memory of GET /api/v1/reviews/ as the table grows, buffered
+versus streamed (NDJSON and chunked JSON array)
+
+Usage (from part3/hbnb):
+    python -m benchmarks.streaming_memory [--rows 10000 40000]
+"""
+import argparse
+import tracemalloc
+from app import create_app
+from benchmarks.serialization import seed
+
+MODES = [
+    ('buffered', {}, ''),
+    ('ndjson', {'Accept': 'application/x-ndjson'}, ''),
+    ('chunked array', {}, '?stream=true'),
+]
+
+
+def peak_kib(client, headers, query):
+    """Peak traced memory while the response is produced and read, and its size"""
+    tracemalloc.start()
+    response = client.get('/api/v1/reviews/' + query, headers=headers, buffered=False)
+    size = sum(len(chunk) for chunk in response.iter_encoded())
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024, size / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 40000],
+                        help='table sizes to compare')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        app = create_app('config.TestingConfig')
+        with app.app_context():
+            seed(rows)
+        client = app.test_client()
+        for label, headers, query in MODES:
+            peak, size = peak_kib(client, headers, query)
+            print(f"{rows:7} rows  {label:14} peak {peak:9.0f} KiB  body {size:8.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,60 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
     TESTING = False
+    # Repository read-through cache: 'memory', 'redis' or None
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 30))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # X-Query-Count response header, None follows DEBUG
+    QUERY_COUNT_HEADER = None
+    # Run each request in one transaction, committed once at the end
+    UNIT_OF_WORK_PER_REQUEST = True
+    # bcrypt cost, and processes hashing passwords off the request thread (0: inline)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_TIMEOUT = 10
+    # Failed-login throttling: 'memory', 'redis' (CACHE_REDIS_URL) or None
+    LOGIN_THROTTLE_BACKEND = os.getenv('LOGIN_THROTTLE_BACKEND', 'memory')
+    LOGIN_THROTTLE_WINDOW = 300
+    LOGIN_MAX_FAILURES_PER_IP = 20
+    LOGIN_MAX_FAILURES_PER_EMAIL = 5
+    LOGIN_THROTTLE_MAX_KEYS = 100000
+    # Revoked tokens: 'memory' (per worker) or 'redis' (CACHE_REDIS_URL, shared)
+    TOKEN_BLOCKLIST_BACKEND = os.getenv('TOKEN_BLOCKLIST_BACKEND', 'memory')
+    TOKEN_BLOCKLIST_CAPACITY = 100000
+    # Namespaces whose list endpoints use the column-projection serializer
+    FAST_SERIALIZATION_NAMESPACES = ('users', 'places', 'reviews', 'amenities')
+    # Rows fetched from the database and written out per chunk when streaming
+    STREAM_BATCH_SIZE = 1000
+    # Cap of ?batch_size= on bulk import requests (rows per INSERT and commit)
+    IMPORT_MAX_BATCH_SIZE = 5000
+    # Engine profile: 'sqlite', 'server', or 'auto' (from SQLALCHEMY_DATABASE_URI),
+    # see app/persistence/engine.py. SQLALCHEMY_ENGINE_OPTIONS overrides it.
+    DATABASE_PROFILE = os.getenv('DATABASE_PROFILE', 'auto')
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,          # ms
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000           # KiB
+    }
+    # Enforce foreign keys (and their ON DELETE CASCADE) on every SQLite connection
+    SQLITE_FOREIGN_KEYS = True
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = 30           # seconds, an int
+    DB_POOL_RECYCLE = 1800
+    # Bind keys of SQLALCHEMY_BINDS serving the reads of GET requests,
+    # see app/persistence/replicas.py
+    READ_REPLICA_BINDS = ()
+    REPLICA_HEALTH_INTERVAL = 5    # seconds between probes of a replica
+    REPLICA_STICKY_SECONDS = 5     # reads stay on the primary after a write
+    # Threads running background tasks (0: inline), see app/services/tasks.py
+    BACKGROUND_TASK_WORKERS = 1
+    # Users owning more places are deleted in the background, batch by batch
+    USER_DELETE_BACKGROUND_THRESHOLD = 1000
+    USER_DELETE_BATCH_SIZE = 500
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -23,6 +77,9 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    BACKGROUND_TASK_WORKERS = 0
 
 config = {
     'development': DevelopmentConfig,
@@ -13,8 +13,10 @@ CREATE TABLE users (
     first_name VARCHAR(255) NOT NULL,
     last_name VARCHAR(255) NOT NULL,
     email VARCHAR(255) UNIQUE NOT NULL,
+    email_normalized VARCHAR(255),
     password VARCHAR(255) NOT NULL,
     is_admin BOOLEAN DEFAULT FALSE,
+    place_count INT DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -28,6 +30,14 @@ CREATE TABLE places (
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
     owner_id CHAR(36) NOT NULL,
+    geo_cell INT,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1_count INT NOT NULL DEFAULT 0,
+    rating_2_count INT NOT NULL DEFAULT 0,
+    rating_3_count INT NOT NULL DEFAULT 0,
+    rating_4_count INT NOT NULL DEFAULT 0,
+    rating_5_count INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
@@ -65,7 +75,11 @@ CREATE TABLE place_amenity (
 );
 
 -- Indexes pour optimiser les performances
-CREATE INDEX idx_places_owner_id ON places(owner_id);
+CREATE INDEX idx_places_owner_id ON places(owner_id, created_at, id);
 CREATE INDEX idx_reviews_user_id ON reviews(user_id);
 CREATE INDEX idx_reviews_place_id ON reviews(place_id);
 CREATE INDEX idx_users_email ON users(email);
+CREATE UNIQUE INDEX idx_users_email_normalized ON users(email_normalized);
+CREATE INDEX idx_places_created_at_id ON places(created_at, id);
+CREATE INDEX idx_places_price ON places(price);
+CREATE INDEX idx_places_geo_cell ON places(geo_cell, id);
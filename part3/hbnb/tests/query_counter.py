@@ -0,0 +1,74 @@
+"""
+Query-count assertion helpers for the test suite
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+
+
+class QueryCounter:
+    """
+    Context manager counting the SQL statements sent to the database
+    and the transactions committed
+
+    Usage:
+        with QueryCounter() as counter:
+            client.get('/api/v1/places/<id>')
+        self.assertEqual(counter.count, 3)
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+        self.commits = 0
+
+    @property
+    def count(self):
+        """Number of statements executed inside the block"""
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _record_commit(self, conn):
+        self.commits += 1
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        event.listen(self.engine, 'commit', self._record_commit)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        event.remove(self.engine, 'commit', self._record_commit)
+        return False
+
+
+class RelationshipLoads:
+    """
+    Context manager recording the queries loading a relationship,
+    lazily on attribute access or through an eager loader option
+
+    Usage:
+        with RelationshipLoads() as loads:
+            client.get('/api/v1/places/')
+        self.assertEqual(loads.paths, [])
+    """
+
+    def __init__(self):
+        self.paths = []
+
+    def _record(self, orm_execute_state):
+        if orm_execute_state.is_relationship_load:
+            relationship = orm_execute_state.loader_strategy_path[-1]
+            self.paths.append(f"{relationship.parent.class_.__name__}.{relationship.key}")
+
+    def __enter__(self):
+        event.listen(Session, 'do_orm_execute', self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(Session, 'do_orm_execute', self._record)
+        return False
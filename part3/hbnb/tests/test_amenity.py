@@ -1,5 +1,10 @@
 import unittest
+from app import create_app
+from app.extensions import db
 from app.models.amenity import Amenity
+from app.models.user import User
+from app.persistence.amenity_index import get_amenity_index
+from app.services.facade import HBnBFacade
 
 class TestAmenity(unittest.TestCase):
     def test_valid_amenity(self):
@@ -14,5 +19,64 @@ class TestAmenity(unittest.TestCase):
         with self.assertRaises(ValueError):
             Amenity(name="A" * 51)
 
+class TestAmenityFilter(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.facade = HBnBFacade()
+        owner = User(first_name="Ann", last_name="Host",
+                     email="host@example.com", password="x")
+        db.session.add(owner)
+        db.session.commit()
+        self.wifi = self.facade.create_amenity({'name': "wifi"})
+        self.pool = self.facade.create_amenity({'name': "pool"})
+        self.places = {}
+        for title, price, amenities in (("Both", 50, [self.wifi, self.pool]),
+                                        ("Wifi", 80, [self.wifi]),
+                                        ("Pool", 120, [self.pool]),
+                                        ("None", 60, [])):
+            place = self.facade.create_place({
+                'title': title, 'description': "", 'price': price,
+                'latitude': 0, 'longitude': 0, 'owner_id': owner.id})
+            self.places[title] = place.id
+            for amenity in amenities:
+                self.facade.add_amenity_to_place(place.id, amenity.id)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _titles(self, **kwargs):
+        places, _ = self.facade.get_places_page(**kwargs)
+        return sorted(place.title for place in places)
+
+    def test_and_or_queries(self):
+        self.assertEqual(self._titles(amenities=["wifi", "pool"]), ["Both"])
+        self.assertEqual(self._titles(amenities=["wifi", "pool"], match_all=False),
+                         ["Both", "Pool", "Wifi"])
+        self.assertEqual(self._titles(amenities=[self.wifi.id]), ["Both", "Wifi"])
+        self.assertEqual(self._titles(amenities=["wifi", "sauna"]), [])
+
+    def test_combined_with_price_filter(self):
+        self.assertEqual(self._titles(amenities=["wifi"], max_price=60), ["Both"])
+
+    def test_index_follows_writes(self):
+        get_amenity_index().ensure_built()
+        self.facade.add_amenity_to_place(self.places["None"], self.wifi.id)
+        self.assertEqual(self._titles(amenities=["wifi"]), ["Both", "None", "Wifi"])
+        self.facade.delete_place(self.places["Both"])
+        self.assertEqual(self._titles(amenities=["wifi"]), ["None", "Wifi"])
+
+    def test_places_by_amenity_endpoint(self):
+        client = self.app.test_client()
+        body = client.get(f'/api/v1/amenities/{self.pool.id}/places/').get_json()
+        self.assertEqual(sorted(p['title'] for p in body['places']), ["Both", "Pool"])
+        body = client.get('/api/v1/places/?amenities=wifi,pool&amenities_match=any&limit=2').get_json()
+        self.assertEqual(len(body['places']), 2)
+        self.assertIsNotNone(body['next_cursor'])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
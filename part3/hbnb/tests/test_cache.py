@@ -0,0 +1,150 @@
+import json
+import time
+import unittest
+from datetime import datetime
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.cache import InMemoryCache, RedisCache, get_cache
+from app.services.facade import HBnBFacade
+from tests.query_counter import QueryCounter
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis-py client"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        self.data[key] = (str(value).encode('ascii'), None)
+        return value
+
+
+class TestInMemoryCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = InMemoryCache(max_entries=2, ttl=60)
+        cache.set('Place', 'a', 1)
+        cache.set('Place', 'b', 2)
+        cache.get('Place', 'a')
+        cache.set('Place', 'c', 3)
+        self.assertIsNone(cache.get('Place', 'b'))
+        self.assertEqual(cache.get('Place', 'a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = InMemoryCache(ttl=-1)
+        cache.set('Place', 'a', 1)
+        self.assertIsNone(cache.get('Place', 'a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_clear_model(self):
+        cache = InMemoryCache()
+        cache.set('Place', 'a', 1)
+        cache.set('User', 'a', 2)
+        cache.clear_model('Place')
+        self.assertIsNone(cache.get('Place', 'a'))
+        self.assertEqual(cache.get('User', 'a'), 2)
+
+
+class TestRedisCache(unittest.TestCase):
+    def test_round_trip_and_model_generation(self):
+        cache = RedisCache(FakeRedis(), ttl=60)
+        snapshot = {'title': "Loft", 'price': 50.0, 'created_at': datetime(2024, 5, 1, 12, 30)}
+        cache.set('Place', 'a', snapshot)
+        self.assertEqual(cache.get('Place', 'a'), snapshot)
+        cache.clear_model('Place')
+        self.assertIsNone(cache.get('Place', 'a'))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_entries_are_json(self):
+        client = FakeRedis()
+        cache = RedisCache(client, ttl=60)
+        cache.set('Place', 'a', {'title': "Loft"})
+        key = next(key for key in client.data if key.endswith(':a'))
+        self.assertEqual(json.loads(client.data[key][0]), {'title': "Loft"})
+        with self.assertRaises(TypeError):
+            cache.set('Place', 'b', {'owner': object()})
+
+
+class TestCachedRepository(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.facade = HBnBFacade()
+        owner = User(first_name="Ann", last_name="Host",
+                     email="host@example.com", password="x")
+        db.session.add(owner)
+        db.session.flush()
+        place = Place(title="Loft", description="", price=50,
+                      latitude=1, longitude=1, owner_id=owner.id)
+        db.session.add(place)
+        db.session.commit()
+        self.place_id = place.id
+        db.session.remove()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_second_lookup_is_served_from_cache(self):
+        self.assertEqual(self.facade.get_place(self.place_id).title, "Loft")
+        db.session.remove()
+        with QueryCounter() as counter:
+            place = self.facade.get_place(self.place_id)
+            self.assertEqual(place.title, "Loft")
+        self.assertEqual(counter.count, 0)
+        self.assertGreaterEqual(get_cache().stats()['hits'], 1)
+
+    def test_update_invalidates_entry(self):
+        self.facade.get_place(self.place_id)
+        db.session.remove()
+        self.facade.update_place(self.place_id, {'title': "Renamed"})
+        db.session.remove()
+        self.assertEqual(self.facade.get_place(self.place_id).title, "Renamed")
+
+    def test_bulk_update_invalidates_model(self):
+        self.facade.get_place(self.place_id)
+        db.session.remove()
+        Place.query.update({'price': 99})
+        db.session.commit()
+        db.session.remove()
+        self.assertEqual(self.facade.get_place(self.place_id).price, 99)
+
+    def test_delete_invalidates_entry(self):
+        self.facade.get_place(self.place_id)
+        db.session.remove()
+        self.facade.delete_place(self.place_id)
+        db.session.remove()
+        self.assertIsNone(self.facade.get_place(self.place_id))
+
+    def test_password_hash_is_not_cached(self):
+        user = self.facade.get_user_by_email("host@example.com")
+        user_id, password_hash = user.id, user.password
+        self.facade.get_user(user_id)
+        db.session.remove()
+        self.assertNotIn('password', get_cache().get('User', user_id))
+        user = self.facade.get_user(user_id)
+        self.assertEqual(user.first_name, "Ann")
+        self.assertEqual(user.password, password_hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import exc, text
+from app import create_app
+from app.extensions import db
+from app.persistence.engine import TimedQueuePool, engine_options, pool_stats, resolve_profile
+from config import TestingConfig
+
+
+class TestEngineProfiles(unittest.TestCase):
+    def test_profile_follows_database_uri(self):
+        cases = {
+            'sqlite:///:memory:': None,
+            'sqlite://': None,
+            'sqlite:///development.db': 'sqlite',
+            'postgresql://hbnb@db/hbnb': 'server',
+            'mysql+pymysql://hbnb@db/hbnb': 'server'
+        }
+        for uri, profile in cases.items():
+            config = {'DATABASE_PROFILE': 'auto', 'SQLALCHEMY_DATABASE_URI': uri}
+            self.assertEqual(resolve_profile(config), profile, uri)
+
+    def test_server_options_and_overrides(self):
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://hbnb@db/hbnb',
+                                  'DB_POOL_SIZE': 20, 'DB_MAX_OVERFLOW': 5,
+                                  'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 600}})
+        self.assertIs(options['poolclass'], TimedQueuePool)
+        self.assertEqual(options['pool_size'], 20)
+        self.assertEqual(options['max_overflow'], 5)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(options['pool_recycle'], 600)
+        with self.assertRaises(ValueError):
+            engine_options({'DATABASE_PROFILE': 'oracle'})
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class FileConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.directory, 'hbnb.db')
+            DB_POOL_SIZE = 1
+            DB_MAX_OVERFLOW = 0
+            DB_POOL_TIMEOUT = 1  # whole seconds, pool_timeout is read as an int
+
+        self.app = create_app(FileConfig)
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_pragmas_applied_on_connect(self):
+        with self.app.app_context():
+            pragma = lambda name: db.session.execute(text(f'PRAGMA {name}')).scalar()
+            self.assertEqual(pragma('journal_mode'), 'wal')
+            self.assertEqual(pragma('synchronous'), 1)  # NORMAL
+            self.assertEqual(pragma('busy_timeout'), 5000)
+            self.assertEqual(pragma('cache_size'), -64000)
+
+    def test_pool_saturation_and_timeouts(self):
+        with self.app.app_context():
+            held = db.engine.connect()
+            try:
+                with self.assertRaises(exc.TimeoutError):
+                    db.engine.connect()
+                stats = pool_stats()['default']
+                self.assertEqual(stats['checked_out'], 1)
+                self.assertEqual(stats['saturation'], 1.0)
+                self.assertEqual(stats['timeouts'], 1)
+                self.assertGreaterEqual(stats['wait_ms_max'], 900)
+            finally:
+                held.close()
+            self.assertEqual(pool_stats()['default']['checked_out'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services import facade
+from tests.query_counter import QueryCounter
+
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        owner = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+        guest = User(first_name="Bob", last_name="Guest", email="guest@example.com", password="x")
+        db.session.add_all([owner, guest])
+        db.session.commit()
+        self.owner_id, self.guest_id = owner.id, guest.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _post(self, body, content_type, identity, batch_size=2):
+        token = create_access_token(identity=identity)
+        return self.app.test_client().post(
+            f'/api/v1/places/bulk?batch_size={batch_size}', data=body,
+            content_type=content_type, headers={'Authorization': f'Bearer {token}'})
+
+    def test_ndjson_import_reports_invalid_rows(self):
+        rows = [
+            {'title': "Loft", 'description': "", 'price': 80, 'latitude': 48.8, 'longitude': 2.3},
+            {'title': "Cabin", 'description': "", 'price': -1, 'latitude': 45, 'longitude': 6},
+            {'title': "Barn", 'description': "", 'price': 30, 'latitude': 44, 'longitude': 5,
+             'owner_id': self.guest_id},
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n'
+        response = self._post(body, 'application/x-ndjson', self.owner_id)
+        self.assertEqual(response.status_code, 200)
+        report = response.get_json()
+        self.assertEqual(report['inserted'], 2)
+        self.assertEqual([e['line'] for e in report['errors']], [2, 4])
+
+        places = Place.query.order_by(Place.title).all()
+        self.assertEqual([p.title for p in places], ["Barn", "Loft"])
+        # A non-admin only imports places they own
+        self.assertEqual({p.owner_id for p in places}, {self.owner_id})
+        self.assertIsNotNone(places[1].geo_cell)
+        self.assertEqual(places[1].review_count, 0)
+        self.assertEqual(facade.count_places_by_owner(self.owner_id), 2)
+
+    def test_csv_import_uses_one_insert_per_batch(self):
+        body = "title,description,price,latitude,longitude\n" + "".join(
+            f"Place {i},,{10 + i},{i},{i}\n" for i in range(5))
+        with QueryCounter() as counter:
+            response = self._post(body, 'text/csv', self.owner_id)
+        self.assertEqual(response.get_json()['inserted'], 5)
+        inserts = [s for s in counter.statements if s.startswith('INSERT INTO places')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Place.query.count(), 5)
+
+    def test_batch_size_is_capped(self):
+        self.app.config['IMPORT_MAX_BATCH_SIZE'] = 2
+        body = "title,description,price,latitude,longitude\n" + "".join(
+            f"Place {i},,{10 + i},{i},{i}\n" for i in range(5))
+        with QueryCounter() as counter:
+            response = self._post(body, 'text/csv', self.owner_id, batch_size=100000000)
+        self.assertEqual(response.get_json()['inserted'], 5)
+        inserts = [s for s in counter.statements if s.startswith('INSERT INTO places')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self._post(body, 'text/csv', self.owner_id, batch_size=0).status_code, 400)
+
+    def test_duplicates_are_isolated_within_a_batch(self):
+        db.session.add(Amenity(name="Wifi"))
+        db.session.commit()
+        rows = [(1, {'name': "Pool"}), (2, {'name': "Wifi"}), (3, {'name': "Sauna"})]
+        report = self._facade().bulk_import('amenities', rows, batch_size=10)
+        self.assertEqual(report.inserted, 2)
+        self.assertEqual(report.errors[0]['line'], 2)
+        self.assertEqual(Amenity.query.count(), 3)
+
+    def test_json_values_are_not_truncated(self):
+        place = Place(title="Loft", description="", price=80, latitude=1, longitude=1,
+                      owner_id=self.owner_id)
+        db.session.add(place)
+        db.session.commit()
+        reviews = [(1, {'text': "Fine", 'rating': 4.7, 'place_id': place.id,
+                        'user_id': self.guest_id}),
+                   (2, {'text': "Fine", 'rating': True, 'place_id': place.id,
+                        'user_id': self.guest_id}),
+                   (3, {'text': "Fine", 'rating': 4.0, 'place_id': place.id,
+                        'user_id': self.guest_id})]
+        report = self._facade().bulk_import('reviews', reviews)
+        self.assertEqual([error['line'] for error in report.errors], [1, 2])
+        self.assertEqual(Review.query.one().rating, 4)
+
+        places = [(1, {'title': "Barn", 'price': True, 'latitude': 1, 'longitude': 1,
+                       'owner_id': self.owner_id}),
+                  (2, {'title': "Barn", 'price': 30, 'latitude': 1, 'longitude': 1,
+                       'owner_id': self.owner_id})]
+        report = self._facade().bulk_import('places', places)
+        self.assertEqual([error['line'] for error in report.errors], [1])
+        self.assertEqual(Place.query.filter_by(title="Barn").one().price, 30.0)
+
+    def test_cli_import_of_reviews_updates_rating_stats(self):
+        place = Place(title="Loft", description="", price=80, latitude=1, longitude=1,
+                      owner_id=self.owner_id)
+        db.session.add(place)
+        db.session.commit()
+        place_id = place.id
+        lines = [
+            {'text': "Great", 'rating': 5, 'place_id': place_id, 'user_id': self.guest_id},
+            {'text': "Again", 'rating': 3, 'place_id': place_id, 'user_id': self.guest_id},
+            {'text': "Ghost", 'rating': 3, 'place_id': "missing", 'user_id': self.guest_id},
+        ]
+        result = self.app.test_cli_runner().invoke(
+            args=['hbnb', 'import', 'reviews', '-'],
+            input='\n'.join(json.dumps(line) for line in lines))
+        self.assertIn('Imported 1 reviews, rejected 2', result.output)
+        self.assertIn('rows/s', result.output)
+        self.assertEqual(Review.query.count(), 1)
+        db.session.expire_all()
+        place = db.session.get(Place, place_id)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+
+    @staticmethod
+    def _facade():
+        from app.services import facade
+        return facade
+
+
+if __name__ == '__main__':
+    unittest.main()
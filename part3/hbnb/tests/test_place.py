@@ -0,0 +1,320 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from sqlalchemy import inspect, text
+from tests.query_counter import QueryCounter, RelationshipLoads
+
+
+class TestPlace(unittest.TestCase):
+    def test_valid_place(self):
+        place = Place(title="Loft", description="Nice", price=80.0,
+                      latitude=48.85, longitude=2.35, owner_id="owner")
+        self.assertEqual(place.title, "Loft")
+
+    def test_invalid_price(self):
+        with self.assertRaises(ValueError):
+            Place(title="Loft", description="", price=0,
+                  latitude=48.85, longitude=2.35, owner_id="owner")
+
+    def test_invalid_latitude(self):
+        with self.assertRaises(ValueError):
+            Place(title="Loft", description="", price=10,
+                  latitude=91, longitude=2.35, owner_id="owner")
+
+
+class TestPlaceListPagination(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Ann", last_name="Host",
+                         email="host@example.com", password="x")
+            db.session.add(owner)
+            db.session.flush()
+            for i in range(25):
+                db.session.add(Place(title=f"Place {i}", description="",
+                                     price=10 + i, latitude=i, longitude=i,
+                                     owner_id=owner.id))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_pages_cover_every_place_once(self):
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/v1/places/?limit=10'
+            if cursor:
+                url += f'&cursor={cursor}'
+            body = self.client.get(url).get_json()
+            self.assertLessEqual(len(body['places']), 10)
+            seen.extend(p['id'] for p in body['places'])
+            cursor = body['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_price_and_bbox_filters(self):
+        body = self.client.get('/api/v1/places/?min_price=15&max_price=20').get_json()
+        self.assertEqual(len(body['places']), 6)
+        self.assertIsNone(body['next_cursor'])
+
+        body = self.client.get(
+            '/api/v1/places/?min_lat=0&min_lng=0&max_lat=4.5&max_lng=4.5').get_json()
+        self.assertEqual(len(body['places']), 5)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/v1/places/?cursor=bad').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?min_price=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?min_lat=1').status_code, 400)
+
+
+class TestListLoading(unittest.TestCase):
+    """List endpoints serialize no relationship, so they must not load any"""
+
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Ann", last_name="Host",
+                         email="host@example.com", password="x")
+            guest = User(first_name="Bob", last_name="Guest",
+                         email="guest@example.com", password="x")
+            amenity = Amenity(name="Wifi")
+            db.session.add_all([owner, guest, amenity])
+            db.session.flush()
+            for i in range(3):
+                place = Place(title=f"Place {i}", description="", price=10 + i,
+                              latitude=i, longitude=i, owner_id=owner.id)
+                place.amenities.append(amenity)
+                db.session.add(place)
+                db.session.flush()
+                db.session.add(Review(text="Nice", rating=4, place_id=place.id, user_id=guest.id))
+            db.session.commit()
+            self.ids = {'place': place.id, 'user': guest.id, 'amenity': amenity.id}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_relationships_are_not_eager_by_default(self):
+        with self.app.app_context():
+            for mapper in db.Model.registry.mappers:
+                for relationship in mapper.relationships:
+                    self.assertIn(relationship.lazy, (True, 'select', 'dynamic', 'raise', 'noload'),
+                                  f"{mapper.class_.__name__}.{relationship.key}")
+
+    def test_list_endpoints_load_no_relationship(self):
+        urls = ['/api/v1/places/', '/api/v1/places/?amenities=Wifi', '/api/v1/reviews/',
+                '/api/v1/amenities/', '/api/v1/places/search?lat=1&lng=1&radius_km=200',
+                f"/api/v1/places/{self.ids['place']}/reviews",
+                f"/api/v1/amenities/{self.ids['amenity']}/places/"]
+        # Both serializers: column projections and to_dict() on objects
+        for namespaces in (self.app.config['FAST_SERIALIZATION_NAMESPACES'], ()):
+            self.app.config['FAST_SERIALIZATION_NAMESPACES'] = namespaces
+            for url in urls:
+                with RelationshipLoads() as loads:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                self.assertEqual(loads.paths, [], url)
+
+
+class TestPlaceDetail(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Ann", last_name="Host",
+                         email="host@example.com", password="x")
+            db.session.add(owner)
+            db.session.flush()
+            place = Place(title="Loft", description="", price=50,
+                          latitude=1, longitude=1, owner_id=owner.id)
+            db.session.add(place)
+            db.session.flush()
+            self.place_id = place.id
+            self.owner_id = owner.id
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _add_related(self, count):
+        with self.app.app_context():
+            place = db.session.get(Place, self.place_id)
+            offset = len(place.amenities)
+            for i in range(offset, offset + count):
+                guest = User(first_name="Guest", last_name=str(i),
+                             email=f"guest{i}@example.com", password="x")
+                db.session.add(guest)
+                db.session.flush()
+                place.amenities.append(Amenity(name=f"Amenity {i}"))
+                db.session.add(Review(text="Great", rating=5,
+                                      place_id=self.place_id, user_id=guest.id))
+            db.session.commit()
+
+    def _get_detail(self):
+        with self.app.app_context():
+            engine = db.engine
+        with QueryCounter(engine) as counter:
+            response = self.client.get(f'/api/v1/places/{self.place_id}')
+        self.assertEqual(response.status_code, 200)
+        return response.get_json(), counter.count
+
+    def test_embedded_document(self):
+        self._add_related(2)
+        body, _ = self._get_detail()
+        self.assertEqual(body['owner']['id'], self.owner_id)
+        self.assertNotIn('email', body['owner'])
+        self.assertEqual(len(body['amenities']), 2)
+        self.assertEqual(len(body['reviews']), 2)
+        self.assertEqual(body['reviews'][0]['user']['first_name'], "Guest")
+
+    def test_query_count_does_not_grow_with_related_rows(self):
+        self._add_related(1)
+        _, small = self._get_detail()
+        self._add_related(10)
+        _, large = self._get_detail()
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 3)
+
+    def test_conditional_get_of_place_detail(self):
+        url = f'/api/v1/places/{self.place_id}'
+        first = self.client.get(url)
+        etag = first.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        response = self.client.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        self._add_related(1)
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_place_detail_validator_covers_reviewers_and_amenities(self):
+        from app.services import facade
+        self._add_related(1)
+        url = f'/api/v1/places/{self.place_id}'
+        etag = self.client.get(url).headers['ETag']
+        with self.app.app_context():
+            review = Review.query.filter_by(place_id=self.place_id).one()
+            facade.update_user(review.user_id, {'first_name': "Renamed"})
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['reviews'][0]['user']['first_name'], "Renamed")
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        etag = response.headers['ETag']
+        with self.app.app_context():
+            amenity = db.session.get(Place, self.place_id).amenities[0]
+            facade.update_amenity(amenity.id, {'name': "Sauna"})
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['amenities'][0]['name'], "Sauna")
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_conditional_get_of_place_list(self):
+        etag = self.client.get('/api/v1/places/').headers['ETag']
+        self.assertEqual(
+            self.client.get('/api/v1/places/', headers={'If-None-Match': etag}).status_code, 304)
+        # Another query string is another representation
+        self.assertEqual(self.client.get('/api/v1/places/?limit=1',
+                                         headers={'If-None-Match': etag}).status_code, 200)
+        with self.app.app_context():
+            place = db.session.get(Place, self.place_id)
+            place.price = 75
+            db.session.commit()
+        self.assertEqual(
+            self.client.get('/api/v1/places/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_unknown_relationship_in_load_plan(self):
+        from app.services.repositories import PlaceRepository
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                PlaceRepository().get(self.place_id, include=['landlord'])
+
+
+class TestPlaceSearch(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Ann", last_name="Host",
+                         email="host@example.com", password="x")
+            db.session.add(owner)
+            db.session.flush()
+            # Roughly 0, 11, 22, ... 99 km north of the origin, plus a far one
+            for i in range(10):
+                db.session.add(Place(title=f"North {i}", description="", price=10,
+                                     latitude=48.0 + i * 0.1, longitude=2.0,
+                                     owner_id=owner.id))
+            db.session.add(Place(title="Far", description="", price=10,
+                                 latitude=10.0, longitude=2.0, owner_id=owner.id))
+            db.session.add(Place(title="East of 180", description="", price=10,
+                                 latitude=0.0, longitude=-179.95, owner_id=owner.id))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_results_sorted_by_distance_and_paginated(self):
+        url = '/api/v1/places/search?lat=48&lng=2&radius_km=50&limit=3'
+        body = self.client.get(url).get_json()
+        self.assertEqual([p['title'] for p in body['places']],
+                         ["North 0", "North 1", "North 2"])
+        body = self.client.get(url + f"&cursor={body['next_cursor']}").get_json()
+        self.assertEqual([p['title'] for p in body['places']], ["North 3", "North 4"])
+        self.assertIsNone(body['next_cursor'])
+        self.assertLessEqual(body['places'][-1]['distance_km'], 50)
+
+    def test_search_across_the_antimeridian(self):
+        body = self.client.get('/api/v1/places/search?lat=0&lng=179.95&radius_km=20').get_json()
+        self.assertEqual([p['title'] for p in body['places']], ["East of 180"])
+
+    def test_invalid_search(self):
+        self.assertEqual(self.client.get('/api/v1/places/search?lat=0&lng=0').status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/v1/places/search?lat=0&lng=0&radius_km=5000').status_code, 400)
+
+    def test_rebuild_geo_cells_adds_the_column(self):
+        with self.app.app_context():
+            updated_at = db.session.execute(db.select(Place.updated_at)).scalars().all()
+            # A database created before radius searches
+            db.session.execute(text('DROP INDEX idx_places_geo_cell'))
+            db.session.execute(text('ALTER TABLE places DROP COLUMN geo_cell'))
+            db.session.commit()
+            result = self.app.test_cli_runner().invoke(args=['hbnb', 'rebuild-geo-cells'])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn('Added column places.geo_cell', result.output)
+            self.assertIn('12 places', result.output)
+            names = {index['name'] for index in inspect(db.engine).get_indexes('places')}
+            self.assertIn('idx_places_geo_cell', names)
+            self.assertEqual(db.session.execute(db.select(Place.updated_at)).scalars().all(),
+                             updated_at)
+        body = self.client.get('/api/v1/places/search?lat=48&lng=2&radius_km=50').get_json()
+        self.assertEqual(len(body['places']), 5)
+
+    def test_haversine(self):
+        from app.persistence.geo import haversine_km
+        paris_london = haversine_km(48.8566, 2.3522, [51.5074], [-0.1278])[0]
+        self.assertAlmostEqual(paris_london, 343.5, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
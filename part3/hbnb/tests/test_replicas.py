@@ -0,0 +1,147 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.persistence.replicas import get_replica_router
+from app.services import facade
+from config import TestingConfig
+
+
+class ReplicaTestCase(unittest.TestCase):
+    """A primary SQLite file and replica files kept in sync by replicate()"""
+
+    replicas = ('replica',)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.primary = os.path.join(self.directory, 'primary.db')
+        self.app = create_app(self.make_config())
+        with self.app.app_context():
+            host = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+            db.session.add(host)
+            db.session.commit()
+            self.host_id = host.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=host.id)}'}
+            facade.create_place(self.place_data("Replicated"))
+        self.replicate()
+        self.client = self.app.test_client()
+
+    def make_config(self):
+        binds = {key: 'sqlite:///' + self.path(key) for key in self.replicas}
+
+        class ReplicatedConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + self.primary
+            SQLALCHEMY_BINDS = binds
+            READ_REPLICA_BINDS = tuple(binds)
+            REPLICA_STICKY_SECONDS = 0.2
+
+        return ReplicatedConfig
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.db')
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        # db registers a metadata per bind: drop them so that the apps of
+        # other tests, which have no such binds, can still drop_all()
+        for key in self.replicas:
+            db.metadatas.pop(key, None)
+        shutil.rmtree(self.directory)
+
+    def replicate(self, keys=None):
+        """Copy the primary into the replica files (all of them by default)"""
+        source = sqlite3.connect(self.primary)
+        for key in keys or self.replicas:
+            target = sqlite3.connect(self.path(key))
+            source.backup(target)
+            target.close()
+        source.close()
+
+    def place_data(self, title):
+        return {'title': title, 'description': "", 'price': 50, 'latitude': 1,
+                'longitude': 1, 'owner_id': self.host_id}
+
+    def titles(self, **kwargs):
+        response = self.client.get('/api/v1/places/', **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return [place['title'] for place in response.get_json()['places']]
+
+
+class TestReadReplicas(ReplicaTestCase):
+    def test_get_reads_from_replica(self):
+        with self.app.app_context():
+            facade.create_place(self.place_data("Not replicated yet"))
+        anonymous = {'environ_overrides': {'REMOTE_ADDR': '10.0.0.2'}}
+        self.assertEqual(self.titles(**anonymous), ["Replicated"])
+        with self.app.app_context():
+            stats = get_replica_router().stats()
+            # The primary has both places
+            self.assertEqual(len(facade.get_places_page()[0]), 2)
+        self.assertGreater(stats['replicas']['replica']['reads'], 0)
+
+    def test_writes_go_to_primary_and_reads_follow_them(self):
+        response = self.client.post('/api/v1/places/', headers=self.headers, json={
+            'title': "Fresh", 'description': "", 'price': 80, 'latitude': 2, 'longitude': 2})
+        self.assertEqual(response.status_code, 201)
+        other = {'environ_overrides': {'REMOTE_ADDR': '10.0.0.2'}}
+        self.assertEqual(self.titles(headers=self.headers), ["Replicated", "Fresh"])
+        self.assertEqual(self.titles(**other), ["Replicated"])
+        time.sleep(0.25)
+        self.assertEqual(self.titles(headers=self.headers), ["Replicated"])
+        self.replicate()
+        self.assertEqual(self.titles(**other), ["Replicated", "Fresh"])
+
+
+class TestReplicaRoundRobin(ReplicaTestCase):
+    replicas = ('replica_a', 'replica_b')
+
+    def test_reads_alternate_between_replicas(self):
+        for _ in range(4):
+            self.client.get('/api/v1/places/?limit=1')
+        with self.app.app_context():
+            replicas = get_replica_router().stats()['replicas']
+        self.assertEqual(replicas['replica_a']['reads'], replicas['replica_b']['reads'])
+        self.assertGreater(replicas['replica_a']['reads'], 0)
+
+    def test_a_request_reads_from_a_single_replica(self):
+        with self.app.app_context():
+            facade.create_place(self.place_data("New"))
+        self.replicate(['replica_a'])
+        anonymous = {'environ_overrides': {'REMOTE_ADDR': '10.0.0.2'}}
+        lists = {}
+        for _ in range(4):
+            response = self.client.get('/api/v1/places/', **anonymous)
+            titles = [place['title'] for place in response.get_json()['places']]
+            lists.setdefault(response.headers['ETag'], []).append(titles)
+        # One ETag per replica, each always with that replica's list
+        self.assertEqual(sorted(map(sorted, lists.values())),
+                         [[["Replicated"]] * 2, [["Replicated", "New"]] * 2])
+
+
+class TestUnhealthyReplica(ReplicaTestCase):
+    def path(self, key):
+        # A directory that does not exist: the replica cannot be opened
+        return os.path.join(self.directory, 'missing', f'{key}.db')
+
+    def replicate(self):
+        pass
+
+    def test_falls_back_to_primary(self):
+        self.assertEqual(self.titles(), ["Replicated"])
+        with self.app.app_context():
+            stats = get_replica_router().stats()
+        self.assertFalse(stats['replicas']['replica']['healthy'])
+        self.assertGreater(stats['primary_reads'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
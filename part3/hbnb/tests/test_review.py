@@ -0,0 +1,170 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services.facade import HBnBFacade, DuplicateReviewError
+from flask_jwt_extended import create_access_token
+from tests.query_counter import QueryCounter
+
+
+class TestReview(unittest.TestCase):
+    def test_valid_review(self):
+        review = Review(text="Great stay", rating=5, place_id="p", user_id="u")
+        self.assertEqual(review.rating, 5)
+
+    def test_invalid_rating(self):
+        with self.assertRaises(ValueError):
+            Review(text="Great stay", rating=6, place_id="p", user_id="u")
+
+    def test_empty_text(self):
+        with self.assertRaises(ValueError):
+            Review(text=" ", rating=3, place_id="p", user_id="u")
+
+
+class TestReviewFacade(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.facade = HBnBFacade()
+        owner = User(first_name="Ann", last_name="Host",
+                     email="host@example.com", password="x")
+        guest = User(first_name="Bob", last_name="Guest",
+                     email="guest@example.com", password="x")
+        db.session.add_all([owner, guest])
+        db.session.flush()
+        place = Place(title="Loft", description="", price=50,
+                      latitude=1, longitude=1, owner_id=owner.id)
+        db.session.add(place)
+        db.session.commit()
+        self.guest_id = guest.id
+        self.place_id = place.id
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _review_data(self):
+        return {'text': "Great", 'rating': 4,
+                'place_id': self.place_id, 'user_id': self.guest_id}
+
+    def test_has_user_reviewed_place(self):
+        self.assertFalse(self.facade.has_user_reviewed_place(self.guest_id, self.place_id))
+        self.facade.create_review(self._review_data())
+        self.assertTrue(self.facade.has_user_reviewed_place(self.guest_id, self.place_id))
+
+    def test_duplicate_review_is_rejected_by_the_database(self):
+        self.facade.create_review(self._review_data())
+        with self.assertRaises(DuplicateReviewError):
+            self.facade.create_review(self._review_data())
+        # The session is usable again after the rollback
+        self.assertEqual(len(self.facade.get_all_reviews()), 1)
+
+    def test_other_integrity_errors_are_not_duplicates(self):
+        # The reviewer is deleted after create_review found them
+        guest = db.session.get(User, self.guest_id)
+        db.session.execute(text('DELETE FROM users WHERE id = :id'), {'id': self.guest_id})
+        db.session.commit()
+        with patch.object(self.facade.user_repo, 'get', return_value=guest):
+            with self.assertRaises(IntegrityError) as raised:
+                self.facade.create_review(self._review_data())
+        self.assertNotIsInstance(raised.exception, DuplicateReviewError)
+
+    def test_reviews_by_place_are_paginated(self):
+        for i in range(5):
+            user = User(first_name="Guest", last_name=str(i),
+                        email=f"guest{i}@example.com", password="x")
+            db.session.add(user)
+            db.session.flush()
+            self.facade.create_review({'text': "Nice", 'rating': 3,
+                                       'place_id': self.place_id, 'user_id': user.id})
+        first, cursor = self.facade.get_reviews_by_place(self.place_id, limit=3)
+        second, last_cursor = self.facade.get_reviews_by_place(
+            self.place_id, limit=3, cursor=cursor)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertIsNone(last_cursor)
+        self.assertEqual(len({r.id for r in first + second}), 5)
+
+    def test_review_indexes_are_created(self):
+        names = {index['name'] for index in inspect(db.engine).get_indexes('reviews')}
+        self.assertIn('idx_reviews_place_id', names)
+        self.assertIn('idx_reviews_user_id', names)
+
+    def _place(self):
+        place = db.session.get(Place, self.place_id)
+        db.session.refresh(place)
+        return place
+
+    def test_rating_aggregates_follow_review_writes(self):
+        review = self.facade.create_review(self._review_data())
+        place = self._place()
+        self.assertEqual((place.review_count, place.rating_avg), (1, 4.0))
+
+        self.facade.update_review(review.id, {'rating': 2})
+        place = self._place()
+        self.assertEqual(place.rating_histogram['2'], 1)
+        self.assertEqual(place.rating_histogram['4'], 0)
+        self.assertEqual(place.to_dict()['rating_avg'], 2.0)
+
+        self.facade.delete_review(review.id)
+        place = self._place()
+        self.assertEqual((place.review_count, place.rating_sum), (0, 0))
+        self.assertIsNone(place.rating_avg)
+
+    def test_review_cannot_move_to_another_place(self):
+        other = Place(title="Barn", description="", price=20, latitude=2, longitude=2,
+                      owner_id=self._place().owner_id)
+        db.session.add(other)
+        db.session.commit()
+        review = self.facade.create_review(self._review_data())
+        self.facade.update_review(review.id, {'rating': 5, 'place_id': other.id,
+                                              'user_id': other.owner_id})
+        review = self.facade.get_review(review.id)
+        self.assertEqual((review.place_id, review.user_id), (self.place_id, self.guest_id))
+        place = self._place()
+        self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+        db.session.refresh(other)
+        self.assertEqual(other.review_count, 0)
+
+    def test_rebuild_rating_stats(self):
+        self.facade.create_review(self._review_data())
+        updated_at = self._place().updated_at
+        # A database created before the rating columns
+        db.session.execute(text('ALTER TABLE places DROP COLUMN rating_sum'))
+        Place.query.update({'review_count': 0, 'rating_4_count': 0,
+                            'updated_at': Place.updated_at})
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['hbnb', 'rebuild-ratings'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Added column places.rating_sum', result.output)
+        self.assertIn('1 places', result.output)
+        place = self._place()
+        self.assertEqual((place.review_count, place.rating_sum), (1, 4))
+        self.assertEqual(place.rating_histogram['4'], 1)
+        self.assertEqual(place.updated_at, updated_at)
+
+    def test_post_review_loads_each_row_once(self):
+        self.app.config['QUERY_COUNT_HEADER'] = True
+        token = create_access_token(identity=self.guest_id)
+        db.session.remove()
+        with QueryCounter() as counter:
+            response = self.app.test_client().post(
+                '/api/v1/reviews/', json={'text': "Nice", 'rating': 5, 'place_id': self.place_id},
+                headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+        # Primary key lookups select the table's own columns first
+        self.assertEqual(len([s for s in counter.statements if s.startswith('SELECT places.')]), 1)
+        self.assertEqual(len([s for s in counter.statements if s.startswith('SELECT users.')]), 1)
+        self.assertEqual(response.headers['X-Query-Count'], str(counter.count))
+
+
+if __name__ == '__main__':
+    unittest.main()
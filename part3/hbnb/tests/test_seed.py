@@ -0,0 +1,106 @@
+import unittest
+from collections import Counter
+from sqlalchemy import func, inspect
+from app import create_app
+from app.extensions import db
+from app.models.amenity import place_amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.versions import get_version
+from app.services import facade
+from app.services.seeder import DatasetGenerator, seed_database
+
+
+def generate(scale, seed):
+    generator = DatasetGenerator(scale, seed)
+    amenities = generator.amenities()
+    users, owners = generator.users('hash')
+    return amenities, users, list(generator.places(owners))
+
+
+class TestDatasetGenerator(unittest.TestCase):
+    def test_same_seed_same_dataset(self):
+        self.assertEqual(generate(0.05, 7), generate(0.05, 7))
+        self.assertNotEqual(generate(0.05, 7)[1], generate(0.05, 8)[1])
+
+    def test_distributions_are_skewed(self):
+        _, users, places = generate(0.4, 42)
+        hosts = Counter(place['owner_id'] for place, _, _ in places)
+        top_tenth = sum(count for _, count in hosts.most_common(len(users) // 10))
+        self.assertGreater(top_tenth / len(places), 0.3)
+
+        reviews = sorted((len(place_reviews) for _, place_reviews, _ in places), reverse=True)
+        self.assertGreater(sum(reviews[:len(reviews) // 10]), sum(reviews) / 3)
+
+        links = Counter(link['amenity_id'] for _, _, place_links in places for link in place_links)
+        counts = [count for _, count in links.most_common()]
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+
+    def test_scale_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            DatasetGenerator(0)
+
+
+class TestSeedDatabase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_denormalized_columns_match_the_rows(self):
+        report = seed_database(scale=0.05, seed=1, batch_size=40)
+        self.assertEqual(report.counts['users'], 50)
+        self.assertEqual(report.counts['places'], Place.query.count())
+        self.assertEqual(report.counts['place_amenity'], db.session.execute(
+            db.select(func.count()).select_from(place_amenity)).scalar())
+
+        ratings = db.session.execute(db.select(
+            Place.id, Place.review_count, Place.rating_sum, Place.rating_5_count)).all()
+        facade.rebuild_rating_stats()
+        self.assertEqual(db.session.execute(db.select(
+            Place.id, Place.review_count, Place.rating_sum, Place.rating_5_count)).all(), ratings)
+        self.assertEqual(report.counts['reviews'], sum(row.review_count for row in ratings))
+
+        place_counts = dict(db.session.execute(db.select(User.id, User.place_count)).all())
+        facade.rebuild_place_counts()
+        self.assertEqual(dict(db.session.execute(db.select(User.id, User.place_count)).all()),
+                         place_counts)
+
+        self.assertEqual(Place.query.filter(Place.geo_cell.is_(None)).count(), 0)
+        self.assertEqual(Review.query.filter(Review.user_id == Place.owner_id,
+                                             Review.place_id == Place.id).count(), 0)
+        admin = facade.authenticate('admin@example.com', 'password123')
+        self.assertTrue(admin.is_admin)
+        self.assertEqual(facade.get_user_by_email('USER7@example.com').email, 'user7@example.com')
+
+    def test_indexes_and_versions_are_in_place(self):
+        seed_database(scale=0.02)
+        names = {index['name'] for index in inspect(db.engine).get_indexes('places')}
+        self.assertIn('idx_places_owner_id', names)
+        self.assertIn('idx_places_geo_cell', names)
+        self.assertEqual(get_version('places')[0], 1)
+        with self.assertRaises(ValueError):
+            seed_database(scale=0.02)
+
+    def test_command(self):
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['hbnb', 'seed', '--scale', '0.02'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('20 users, 50 places', result.output)
+
+        result = runner.invoke(args=['hbnb', 'seed', '--scale', '0.02'])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn('--reset', result.output)
+        result = runner.invoke(args=['hbnb', 'seed', '--scale', '0.04', '--reset'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(User.query.count(), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import json
+import unittest
+from unittest import mock
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.api import serialization
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.services import facade
+
+
+class SerializationTestCase(unittest.TestCase):
+    """Two users, five places, two reviews and one amenity"""
+
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+            guest = User(first_name="Bob", last_name="Guest", email="guest@example.com", password="x")
+            amenity = Amenity(name="Wifi")
+            db.session.add_all([owner, guest, amenity])
+            db.session.flush()
+            places = [Place(title=f"Place {i}", description="", price=10 + i,
+                            latitude=i, longitude=i, owner_id=owner.id) for i in range(5)]
+            db.session.add_all(places)
+            db.session.commit()
+            for rating, place in zip((5, 4), places):
+                facade.create_review({'text': "Nice", 'rating': rating,
+                                      'place_id': place.id, 'user_id': guest.id})
+            facade.add_amenity_to_place(places[0].id, amenity.id)
+            self.place_id, self.guest_id, self.amenity_id = places[0].id, guest.id, amenity.id
+            self.headers = {'Authorization': f'Bearer {create_access_token(identity=guest.id)}'}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+
+class TestFastSerialization(SerializationTestCase):
+    def _urls(self):
+        return ['/api/v1/users/', '/api/v1/places/?limit=3', '/api/v1/reviews/',
+                '/api/v1/amenities/', f'/api/v1/places/{self.place_id}/reviews',
+                f'/api/v1/users/{self.guest_id}/reviews',
+                f'/api/v1/amenities/{self.amenity_id}/places/']
+
+    def _get_all(self):
+        return {url: self.client.get(url, headers=self.headers).get_json() for url in self._urls()}
+
+    def test_fast_path_matches_to_dict(self):
+        fast = self._get_all()
+        self.app.config['FAST_SERIALIZATION_NAMESPACES'] = ()
+        slow = self._get_all()
+        self.assertEqual(fast, slow)
+        self.assertEqual(fast['/api/v1/places/?limit=3']['places'][0]['rating_avg'], 5.0)
+
+    def test_fallback_without_orjson(self):
+        fast = self._get_all()
+        with mock.patch.object(serialization, 'orjson', None):
+            self.assertEqual(self._get_all(), fast)
+
+
+class TestStreaming(SerializationTestCase):
+    def setUp(self):
+        super().setUp()
+        # Smaller than the collections, so every response spans several chunks
+        self.app.config['STREAM_BATCH_SIZE'] = 2
+
+    def _ndjson(self, url):
+        response = self.client.get(url, headers=dict(self.headers, Accept='application/x-ndjson'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        return [json.loads(line) for line in response.get_data().splitlines()]
+
+    def test_ndjson_matches_list(self):
+        for url in ('/api/v1/users/', '/api/v1/reviews/'):
+            listed = self.client.get(url, headers=self.headers).get_json()
+            self.assertEqual(self._ndjson(url), listed)
+
+    def test_chunked_array_matches_list(self):
+        for url in ('/api/v1/users/', '/api/v1/reviews/'):
+            listed = self.client.get(url, headers=self.headers).get_json()
+            response = self.client.get(url + '?stream=true', headers=self.headers)
+            self.assertEqual(response.get_json(), listed)
+
+    def test_places_stream_matches_pages(self):
+        paged, cursor = [], None
+        while True:
+            url = '/api/v1/places/?limit=2&min_price=11' + (f'&cursor={cursor}' if cursor else '')
+            page = self.client.get(url).get_json()
+            paged.extend(page['places'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        streamed = self.client.get('/api/v1/places/?stream=true&min_price=11').get_json()
+        self.assertEqual(streamed, {'places': paged, 'next_cursor': None})
+        self.assertEqual(self._ndjson('/api/v1/places/?min_price=11'), paged)
+        with_wifi = self.client.get('/api/v1/places/?amenities=Wifi').get_json()['places']
+        self.assertEqual([place['id'] for place in with_wifi], [self.place_id])
+        self.assertEqual(self._ndjson('/api/v1/places/?amenities=Wifi'), with_wifi)
+
+    def test_places_stream_has_its_own_etag(self):
+        paged = self.client.get('/api/v1/places/')
+        streamed = self.client.get('/api/v1/places/', headers={'Accept': 'application/x-ndjson'})
+        self.assertNotEqual(paged.headers['ETag'], streamed.headers['ETag'])
+        self.assertEqual(streamed.headers['Vary'], 'Accept')
+
+    def test_streams_give_their_connection_back(self):
+        # The app context is torn down before the body is read, the stream
+        # must close the session it reads the rows with itself
+        balance = []
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'checkout', lambda *args: balance.append(1))
+        event.listen(engine, 'checkin', lambda *args: balance.append(-1))
+        for url in ('/api/v1/users/', '/api/v1/reviews/', '/api/v1/places/'):
+            self._ndjson(url)
+            self.client.get(url + '?stream=true', headers=self.headers).get_data()
+        self.assertGreater(len(balance), 0)
+        self.assertEqual(sum(balance), 0)
+
+    def test_invalid_filters_fail_before_streaming(self):
+        response = self.client.get('/api/v1/places/?stream=true&cursor=bogus')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.amenity_index import get_amenity_index
+from app.persistence.unit_of_work import UnitOfWorkRolledBack
+from app.services import facade
+from tests.query_counter import QueryCounter
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        owner = User(first_name="Ann", last_name="Host", email="host@example.com", password="x")
+        db.session.add(owner)
+        self.amenities = [Amenity(name=f"Amenity {i}") for i in range(10)]
+        db.session.add_all(self.amenities)
+        db.session.commit()
+        self.owner_id = owner.id
+        self.place_data = {'title': "Loft", 'description': "", 'price': 80,
+                           'latitude': 48.8, 'longitude': 2.3, 'owner_id': owner.id}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_facade_calls_compose_into_one_commit(self):
+        with QueryCounter() as counter:
+            with facade.unit_of_work():
+                place = facade.create_place(dict(self.place_data))
+                for amenity in self.amenities:
+                    facade.add_amenity_to_place(place.id, amenity.id)
+        self.assertEqual(counter.commits, 1)
+        db.session.expire_all()
+        self.assertEqual(len(db.session.get(Place, place.id).amenities), 10)
+
+    def test_exception_rolls_back_every_write(self):
+        index = get_amenity_index()
+        index.build()
+        with self.assertRaises(RuntimeError):
+            with facade.unit_of_work():
+                place = facade.create_place(dict(self.place_data))
+                facade.add_amenity_to_place(place.id, self.amenities[0].id)
+                raise RuntimeError("boom")
+        self.assertEqual(Place.query.count(), 0)
+        # Index updates only happen once the transaction is committed
+        self.assertEqual(index.match([self.amenities[0].id]), [])
+
+    def test_swallowed_database_error_fails_the_unit(self):
+        with self.assertRaises(UnitOfWorkRolledBack):
+            with facade.unit_of_work():
+                facade.create_place(dict(self.place_data))
+                try:
+                    facade.create_amenity({'name': "Amenity 0"})
+                except Exception:
+                    pass
+        self.assertEqual(Place.query.count(), 0)
+
+    def test_request_commits_once(self):
+        token = create_access_token(identity=self.owner_id)
+        db.session.remove()
+        client = self.app.test_client()
+        with QueryCounter() as counter:
+            response = client.post('/api/v1/places/', json={
+                key: value for key, value in self.place_data.items() if key != 'owner_id'
+            }, headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(counter.commits, 1)
+
+        with QueryCounter() as counter:
+            client.get('/api/v1/places/')
+        self.assertEqual(counter.commits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
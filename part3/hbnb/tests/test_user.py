@@ -0,0 +1,589 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.api.blocklist import BloomFilter, InMemoryBlocklist
+from app.api.throttle import InMemoryWindowStore, RedisWindowStore, SlidingWindowLimiter
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.persistence.amenity_index import get_amenity_index
+from app.persistence.versions import get_version
+from app.passwords import PasswordHasher, PasswordHasherBusy
+from app.services import facade
+from config import TestingConfig
+from tests.query_counter import QueryCounter
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_hash_and_verify(self):
+        hasher = PasswordHasher(rounds=4)
+        password_hash = hasher.hash("secret123")
+        self.assertTrue(password_hash.startswith('$2b$04$'))
+        self.assertTrue(hasher.verify(password_hash, "secret123"))
+        self.assertFalse(hasher.verify(password_hash, "wrong"))
+        self.assertFalse(hasher.verify("not-a-hash", "secret123"))
+
+    def test_needs_rehash_when_cost_changes(self):
+        password_hash = PasswordHasher(rounds=4).hash("secret123")
+        self.assertFalse(PasswordHasher(rounds=4).needs_rehash(password_hash))
+        self.assertTrue(PasswordHasher(rounds=5).needs_rehash(password_hash))
+
+    def test_process_pool(self):
+        hasher = PasswordHasher(rounds=4, workers=1)
+        try:
+            password_hash = hasher.hash("secret123")
+            self.assertTrue(hasher.verify(password_hash, "secret123"))
+        finally:
+            hasher.shutdown()
+
+    def test_busy_pool_is_reported(self):
+        hasher = PasswordHasher(rounds=4, workers=1, timeout=0.01)
+        for _ in range(4):
+            hasher._slots.acquire()
+        with self.assertRaises(PasswordHasherBusy):
+            hasher.hash("secret123")
+
+    def test_slow_hash_is_reported_as_busy(self):
+        hasher = PasswordHasher(rounds=12, workers=1, timeout=0.01)
+        try:
+            with self.assertRaises(PasswordHasherBusy):
+                hasher.hash("secret123")
+        finally:
+            hasher.shutdown()
+
+
+class TestLogin(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                                'email': "host@example.com", 'password': "secret123"})
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _login(self, password="secret123"):
+        return self.client.post('/api/v1/auth/login',
+                                json={'email': "host@example.com", 'password': password})
+
+    def _stored_hash(self):
+        with self.app.app_context():
+            return User.query.filter_by(email="host@example.com").first().password
+
+    def test_testing_config_uses_a_low_cost(self):
+        self.assertTrue(self._stored_hash().startswith('$2b$04$'))
+
+    def test_login(self):
+        self.assertEqual(self._login().status_code, 200)
+        self.assertEqual(self._login("wrong").status_code, 401)
+
+    def test_hash_is_upgraded_on_login(self):
+        old_hash = self._stored_hash()
+        self.app.extensions['hbnb_password_hasher'].rounds = 5
+        self.assertEqual(self._login("wrong").status_code, 401)
+        self.assertEqual(self._stored_hash(), old_hash)
+
+        self.assertEqual(self._login().status_code, 200)
+        self.assertTrue(self._stored_hash().startswith('$2b$05$'))
+        self.assertEqual(self._login().status_code, 200)
+
+    def test_password_update_is_hashed(self):
+        with self.app.app_context():
+            user = facade.get_user_by_email("host@example.com")
+            facade.update_user(user.id, {'password': "newsecret1"})
+        self.assertNotEqual(self._stored_hash(), "newsecret1")
+        self.assertEqual(self._login("newsecret1").status_code, 200)
+
+
+class TestNormalizedEmail(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                            'email': "Ann.Host@Example.com", 'password': "secret123"})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_lookup_and_login_ignore_case(self):
+        user = facade.get_user_by_email("  ann.host@EXAMPLE.com ")
+        self.assertEqual(user.email, "Ann.Host@Example.com")
+        self.assertEqual(user.email_normalized, "ann.host@example.com")
+        response = self.app.test_client().post('/api/v1/auth/login', json={
+            'email': "ANN.HOST@example.com", 'password': "secret123"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_case_variants_cannot_register_twice(self):
+        with self.assertRaises(ValueError):
+            facade.create_user({'first_name': "Ann", 'last_name': "Again",
+                                'email': "ann.host@example.com", 'password': "secret123"})
+
+    def test_other_integrity_errors_are_not_duplicates(self):
+        error = IntegrityError('INSERT INTO users', {}, sqlite3.IntegrityError(
+            'CHECK constraint failed: users'))
+        with patch.object(facade.user_repo, 'add', side_effect=error):
+            with self.assertRaises(IntegrityError):
+                facade.create_user({'first_name': "Bob", 'last_name': "Guest",
+                                    'email': "bob@example.com", 'password': "secret123"})
+
+    def test_lookup_is_an_index_probe(self):
+        plan = db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT * FROM users WHERE email_normalized = 'x'")).all()
+        self.assertIn('idx_users_email_normalized', plan[0][-1])
+
+    def test_backfill(self):
+        for i in range(5):
+            db.session.add(User(first_name="U", last_name=str(i),
+                                email=f"User{i}@Example.com", password="x"))
+        db.session.commit()
+        User.query.update({'email_normalized': None})
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(
+            args=['hbnb', 'backfill-emails', '--batch-size', '2'])
+        self.assertIn('6 users', result.output)
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(facade.get_user_by_email("user3@example.com").last_name, "3")
+
+    def test_rows_not_backfilled_are_found(self):
+        User.query.update({'email_normalized': None})
+        db.session.commit()
+        self.assertEqual(facade.get_user_by_email("ann.host@example.com").email,
+                         "Ann.Host@Example.com")
+        response = self.app.test_client().post('/api/v1/auth/login', json={
+            'email': "ann.host@example.com", 'password': "secret123"})
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(ValueError):
+            facade.create_user({'first_name': "Ann", 'last_name': "Again",
+                                'email': "ANN.host@example.com", 'password': "secret123"})
+
+
+class FakeRedisLists:
+    """List commands of the redis-py client, enough for RedisWindowStore"""
+
+    def __init__(self):
+        self.lists = {}
+
+    def lpush(self, name, value):
+        self.lists.setdefault(name, []).insert(0, value.encode('ascii'))
+
+    def ltrim(self, name, start, end):
+        self.lists[name] = self.lists[name][start:end + 1]
+
+    def lindex(self, name, index):
+        values = self.lists.get(name, [])
+        return values[index] if index < len(values) else None
+
+    def expire(self, name, seconds):
+        pass
+
+    def delete(self, name):
+        self.lists.pop(name, None)
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    def _check_window(self, store):
+        limiter = SlidingWindowLimiter(store, window=60)
+        for now in (100, 110, 120):
+            self.assertEqual(limiter.retry_after('k', now), 0)
+            limiter.record('k', now)
+        # Three failures within 60s: blocked until the first one leaves the window
+        self.assertEqual(limiter.retry_after('k', 130), 30)
+        self.assertEqual(limiter.retry_after('k', 160), 0)
+        limiter.record('k', 160)
+        self.assertEqual(limiter.retry_after('k', 165), 5)
+        limiter.reset('k')
+        self.assertEqual(limiter.retry_after('k', 165), 0)
+
+    def test_in_memory_ring_buffer(self):
+        self._check_window(InMemoryWindowStore(limit=3))
+
+    def test_redis_ring_buffer(self):
+        self._check_window(RedisWindowStore(FakeRedisLists(), limit=3, window=60))
+
+    def test_key_count_is_bounded(self):
+        store = InMemoryWindowStore(limit=2, max_keys=100)
+        for i in range(1000):
+            store.record(f'ip-{i}', 1.0)
+        self.assertEqual(store.stats()['keys'], 100)
+        self.assertEqual(store.stats()['evictions'], 900)
+        self.assertEqual(store.oldest('ip-0'), 0.0)
+
+
+class TestLoginThrottle(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                                'email': "host@example.com", 'password': "secret123"})
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def _login(self, email="host@example.com", password="wrong"):
+        return self.client.post('/api/v1/auth/login', json={'email': email, 'password': password})
+
+    def test_email_is_blocked_before_any_database_work(self):
+        for _ in range(self.app.config['LOGIN_MAX_FAILURES_PER_EMAIL']):
+            self.assertEqual(self._login().status_code, 401)
+        with self.app.app_context(), QueryCounter() as counter:
+            response = self._login(password="secret123")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response.headers['Retry-After']), 0)
+        self.assertEqual(counter.count, 0)
+        # Another email from the same IP is still allowed
+        self.assertEqual(self._login(email="other@example.com").status_code, 401)
+
+    def test_unknown_email_is_checked_against_a_dummy_hash(self):
+        hasher = self.app.extensions['hbnb_password_hasher']
+        self.assertEqual(self._login(email="nobody@example.com").status_code, 401)
+        self.assertIsNotNone(hasher._dummy_hash)
+        self.assertFalse(hasher.needs_rehash(hasher._dummy_hash))
+
+
+class TestTokenBlocklist(unittest.TestCase):
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000)
+        keys = [f"jti-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_expired_revocations_are_evicted_on_rotation(self):
+        blocklist = InMemoryBlocklist(lifetime=60)
+        now = time.time()
+        blocklist.revoke('old', now - 1)
+        blocklist.revoke('live', now + 60)
+        self.assertFalse(blocklist.is_revoked('old'))
+        self.assertTrue(blocklist.is_revoked('live'))
+        self.assertFalse(blocklist.is_revoked('never'))
+
+        blocklist._rotated_at -= 61
+        blocklist.revoke('new', now + 60)
+        self.assertEqual(blocklist.stats()['revoked'], 2)
+        self.assertTrue(blocklist.is_revoked('live'))
+
+    def test_logout_revokes_only_the_current_token(self):
+        app = create_app('config.TestingConfig')
+        client = app.test_client()
+        with app.app_context():
+            user = facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                                       'email': "host@example.com", 'password': "secret123"})
+            user_id = user.id
+        tokens = [client.post('/api/v1/auth/login', json={
+            'email': "host@example.com", 'password': "secret123"}).get_json()['access_token']
+            for _ in range(2)]
+        headers = [{'Authorization': f'Bearer {token}'} for token in tokens]
+
+        self.assertEqual(client.post('/api/v1/auth/logout', headers=headers[0]).status_code, 200)
+        response = client.get(f'/api/v1/users/{user_id}', headers=headers[0])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['error'], 'Token revoked')
+        self.assertEqual(client.get(f'/api/v1/users/{user_id}', headers=headers[1]).status_code, 200)
+        with app.app_context():
+            db.drop_all()
+
+
+class TestCascadingDelete(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        admin = User(first_name="Ada", last_name="Admin", email="admin@example.com",
+                     password="x", is_admin=True)
+        guest = User(first_name="Gus", last_name="Guest", email="guest@example.com", password="x")
+        db.session.add_all([admin, guest])
+        db.session.commit()
+        self.guest_id = guest.id
+        self.headers = {'Authorization': 'Bearer ' + create_access_token(
+            identity=admin.id, additional_claims={'is_admin': True})}
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_host(self, places, email="host@example.com"):
+        host = facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                                   'email': email, 'password': "secret123"})
+        amenity = facade.create_amenity({'name': f"Wifi {email}"})
+        place_ids = []
+        for i in range(places):
+            place = facade.create_place({'title': f"Place {i}", 'description': "", 'price': 50,
+                                         'latitude': 1, 'longitude': 1, 'owner_id': host.id})
+            facade.add_amenity_to_place(place.id, amenity.id)
+            facade.create_review({'text': "Nice", 'rating': 5, 'place_id': place.id,
+                                  'user_id': self.guest_id})
+            place_ids.append(place.id)
+        return host.id, place_ids
+
+    def remaining(self):
+        return (Place.query.count(), Review.query.count(),
+                db.session.execute(db.text("SELECT count(*) FROM place_amenity")).scalar())
+
+    def test_statement_count_does_not_grow_with_the_places(self):
+        counts = []
+        for places, email in ((3, "small@example.com"), (30, "large@example.com")):
+            host_id, _ = self.make_host(places, email)
+            db.session.expire_all()
+            with QueryCounter() as counter:
+                self.assertTrue(facade.delete_user(host_id))
+            counts.append(counter.count)
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(self.remaining(), (0, 0, 0))
+
+    def test_foreign_keys_are_enforced(self):
+        place = Place(title="Orphan", description="", price=10, latitude=0, longitude=0,
+                      owner_id="no-such-user")
+        db.session.add(place)
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_cached_places_and_versions_follow_the_cascade(self):
+        host_id, place_ids = self.make_host(2)
+        before = (get_version('places'), get_version('reviews'))
+        # Warm the repository cache
+        self.assertIsNotNone(facade.get_place(place_ids[0]))
+        self.assertEqual(self.client.get(f'/api/v1/places/{place_ids[0]}').status_code, 200)
+
+        response = self.client.delete(f'/api/v1/users/{host_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(f'/api/v1/places/{place_ids[0]}').status_code, 404)
+        self.assertIsNone(facade.get_place(place_ids[0]))
+        self.assertGreater(get_version('places'), before[0])
+        self.assertGreater(get_version('reviews'), before[1])
+
+    def test_large_hosts_are_deleted_in_the_background(self):
+        self.app.config.update(USER_DELETE_BACKGROUND_THRESHOLD=2, USER_DELETE_BATCH_SIZE=2)
+        host_id, _ = self.make_host(5)
+
+        response = self.client.delete(f'/api/v1/users/{host_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 202)
+        task = response.get_json()
+        self.assertEqual((task['status'], task['done'], task['total']), ('done', 6, 6))
+        self.assertEqual(task['progress'], 1.0)
+
+        response = self.client.get(response.headers['Location'], headers=self.headers)
+        self.assertEqual(response.get_json()['id'], task['id'])
+        self.assertIsNone(facade.get_user(host_id))
+        self.assertEqual(self.remaining(), (0, 0, 0))
+        self.assertEqual(self.client.get('/api/v1/users/deletions/unknown',
+                                         headers=self.headers).status_code, 404)
+
+    def test_background_delete_ends_when_the_user_is_deleted_meanwhile(self):
+        host_id, _ = self.make_host(5)
+        index = get_amenity_index()
+        remove_place = index.remove_place
+
+        def remove_then_delete_user(place_id):
+            remove_place(place_id)
+            # Another request deletes the user between two batches
+            facade.delete_user(host_id)
+
+        with patch.object(index, 'remove_place', side_effect=remove_then_delete_user):
+            task = facade.delete_user_in_background(host_id, batch_size=2)
+        self.assertEqual(task.status, 'done', task.error)
+        self.assertEqual((task.done, task.total), (2, 2))
+        db.session.remove()
+        self.assertIsNone(facade.get_user(host_id))
+        self.assertEqual(self.remaining(), (0, 0, 0))
+
+
+# Schema of a database created before the series of ON DELETE CASCADE keys
+LEGACY_SCHEMA = """
+CREATE TABLE users (id VARCHAR(36) NOT NULL PRIMARY KEY, first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL, email VARCHAR(120) NOT NULL UNIQUE,
+    password VARCHAR(128) NOT NULL, is_admin BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL);
+CREATE TABLE amenities (name VARCHAR(50) NOT NULL UNIQUE, id VARCHAR(36) NOT NULL PRIMARY KEY,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL);
+CREATE TABLE places (title VARCHAR(100) NOT NULL, description VARCHAR(500),
+    price FLOAT NOT NULL, latitude FLOAT NOT NULL, longitude FLOAT NOT NULL,
+    owner_id VARCHAR(36) NOT NULL REFERENCES users (id), id VARCHAR(36) NOT NULL PRIMARY KEY,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL);
+CREATE TABLE place_amenity (place_id VARCHAR(36) NOT NULL REFERENCES places (id),
+    amenity_id VARCHAR(36) NOT NULL REFERENCES amenities (id),
+    PRIMARY KEY (place_id, amenity_id));
+CREATE TABLE reviews (text VARCHAR(500) NOT NULL, rating INTEGER NOT NULL,
+    place_id VARCHAR(36) NOT NULL REFERENCES places (id),
+    user_id VARCHAR(36) NOT NULL REFERENCES users (id), id VARCHAR(36) NOT NULL PRIMARY KEY,
+    created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL);
+INSERT INTO users VALUES ('u1', 'Ann', 'Host', 'host@example.com', 'x', 0, '2024-01-01', '2024-01-01');
+INSERT INTO users VALUES ('u2', 'Bob', 'Guest', 'guest@example.com', 'x', 0, '2024-01-01', '2024-01-01');
+INSERT INTO amenities VALUES ('Wifi', 'a1', '2024-01-01', '2024-01-01');
+INSERT INTO places VALUES ('Loft', '', 50, 1, 1, 'u1', 'p1', '2024-01-01', '2024-01-01');
+INSERT INTO place_amenity VALUES ('p1', 'a1');
+INSERT INTO reviews VALUES ('Nice', 5, 'p1', 'u2', 'r1', '2024-01-01', '2024-01-01');
+"""
+
+
+class TestLegacyDatabaseMigration(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database = os.path.join(self.directory, 'legacy.db')
+        connection = sqlite3.connect(database)
+        connection.executescript(LEGACY_SCHEMA)
+        connection.close()
+
+        class LegacyConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + database
+
+        self.app = create_app(LegacyConfig)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.ctx.pop()
+        shutil.rmtree(self.directory)
+
+    def test_migration_commands_bring_cascading_deletes(self):
+        runner = self.app.test_cli_runner()
+        for command in ('rebuild-ratings', 'rebuild-geo-cells', 'backfill-emails',
+                        'rebuild-place-counts', 'add-cascades'):
+            result = runner.invoke(args=['hbnb', command])
+            self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('places, place_amenity, reviews rebuilt', result.output)
+        result = runner.invoke(args=['hbnb', 'add-cascades'])
+        self.assertIn('already in place', result.output)
+
+        names = {index['name'] for index in inspect(db.engine).get_indexes('places')}
+        self.assertIn('idx_places_owner_id', names)
+        place = facade.get_place('p1')
+        self.assertEqual((place.review_count, place.rating_sum), (1, 5))
+        self.assertEqual(len(place.amenities), 1)
+
+        self.assertTrue(facade.delete_user('u1'))
+        self.assertEqual((Place.query.count(), Review.query.count()), (0, 0))
+        self.assertEqual(db.session.execute(
+            db.text("SELECT count(*) FROM place_amenity")).scalar(), 0)
+
+
+class TestPlacesByOwner(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app('config.TestingConfig')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        host = facade.create_user({'first_name': "Ann", 'last_name': "Host",
+                                   'email': "host@example.com", 'password': "secret123"})
+        self.host_id = host.id
+        self.place_ids = [facade.create_place({
+            'title': f"Place {i}", 'description': "", 'price': 50, 'latitude': 1,
+            'longitude': 1, 'owner_id': host.id}).id for i in range(5)]
+        self.headers = {'Authorization': f'Bearer {create_access_token(identity=host.id)}'}
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def pages(self, url):
+        titles, pages, cursor = [], [], None
+        while True:
+            response = self.client.get(url + (f'&cursor={cursor}' if cursor else ''),
+                                       headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            pages.append(page)
+            titles.extend(place['title'] for place in page['places'])
+            cursor = page['next_cursor']
+            if not cursor:
+                return titles, pages
+
+    def test_pages_carry_the_counted_total(self):
+        for url in (f'/api/v1/users/{self.host_id}/places/?limit=2', '/api/v1/users/me/places?limit=2'):
+            titles, pages = self.pages(url)
+            self.assertEqual(titles, [f"Place {i}" for i in range(5)])
+            self.assertEqual(len(pages), 3)
+            self.assertTrue(all(page['total_count'] == 5 and page['total_exact'] for page in pages))
+        self.assertEqual(self.client.get('/api/v1/users/nobody/places/',
+                                         headers=self.headers).status_code, 404)
+
+    def test_counter_follows_place_writes(self):
+        facade.delete_place(self.place_ids[0])
+        facade.create_place({'title': "Extra", 'description': "", 'price': 50, 'latitude': 1,
+                             'longitude': 1, 'owner_id': self.host_id})
+        db.session.expire_all()
+        self.assertEqual(db.session.get(User, self.host_id).place_count, 5)
+        with QueryCounter() as counter:
+            self.client.get(f'/api/v1/users/{self.host_id}/places/', headers=self.headers)
+        self.assertFalse(any('count(' in statement.lower() for statement in counter.statements))
+
+    def test_counter_writes_leave_the_user_unchanged(self):
+        updated_at = db.session.get(User, self.host_id).updated_at
+        version = get_version('users')
+        facade.create_place({'title': "Extra", 'description': "", 'price': 50, 'latitude': 1,
+                             'longitude': 1, 'owner_id': self.host_id})
+        facade.delete_place(self.place_ids[0])
+        facade.delete_place(self.place_ids[1])
+        # Read in the same session and through the cache
+        self.assertEqual(facade.count_places_by_owner(self.host_id), 4)
+        db.session.remove()
+        self.assertEqual(facade.get_user(self.host_id).place_count, 4)
+        self.assertEqual(facade.get_user(self.host_id).updated_at, updated_at)
+        self.assertEqual(get_version('users'), version)
+
+    def test_place_cannot_move_to_another_owner(self):
+        other = facade.create_user({'first_name': "Bob", 'last_name': "Other",
+                                    'email': "other@example.com", 'password': "secret123"})
+        facade.update_place(self.place_ids[0], {'title': "Renamed", 'owner_id': other.id})
+        db.session.expire_all()
+        place = facade.get_place(self.place_ids[0])
+        self.assertEqual((place.title, place.owner_id), ("Renamed", self.host_id))
+        self.assertEqual(facade.count_places_by_owner(self.host_id), 5)
+        self.assertEqual(facade.get_places_by_owner(other.id)[2:], (0, True))
+        self.assertEqual(Place.query.filter_by(owner_id=other.id).count(), 0)
+
+    def test_page_is_an_index_range_scan(self):
+        plan = ' '.join(row[-1] for row in db.session.execute(db.text(
+            "EXPLAIN QUERY PLAN SELECT * FROM places WHERE owner_id = 'x' "
+            "ORDER BY created_at, id LIMIT 20")))
+        self.assertIn('idx_places_owner_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_unknown_counter_is_estimated_then_recounted(self):
+        User.query.update({'place_count': None})
+        db.session.commit()
+        page = self.client.get(f'/api/v1/users/{self.host_id}/places/?limit=2',
+                               headers=self.headers).get_json()
+        self.assertEqual((page['total_count'], page['total_exact']), (3, False))
+        # The recount ran on the (inline) task pool
+        page = self.client.get(f'/api/v1/users/{self.host_id}/places/?limit=2',
+                               headers=self.headers).get_json()
+        self.assertEqual((page['total_count'], page['total_exact']), (5, True))
+
+    def test_rebuild_command(self):
+        User.query.update({'place_count': None})
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['hbnb', 'rebuild-place-counts'])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('1 users', result.output)
+        self.assertEqual(facade.count_places_by_owner(self.host_id), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
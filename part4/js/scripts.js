@@ -160,13 +160,13 @@ function initLoginForm() {
 let allPlaces = []; // Store all places for filtering
 
 /**
- * Fetch all places from API
+ * Stream places from the API as NDJSON, rendering each chunk as it arrives
  */
 async function fetchPlaces() {
     const token = checkAuthentication();
     
     try {
-        const headers = {};
+        const headers = { 'Accept': 'application/x-ndjson' };
         if (token) {
             headers['Authorization'] = `Bearer ${token}`;
         }
@@ -175,13 +175,33 @@ async function fetchPlaces() {
             headers: headers
         });
 
-        if (response.ok) {
-            const data = await response.json();
-            allPlaces = data;
-            displayPlaces(allPlaces);
-        } else {
+        if (!response.ok) {
             document.getElementById('places-list').innerHTML = 
                 '<p class="error-message">Error loading places. Please try again later.</p>';
+            return;
+        }
+
+        allPlaces = [];
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { done, value } = await reader.read();
+            buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+            // One place per line, the last line may still be incomplete
+            const lines = buffer.split('\n');
+            buffer = done ? '' : lines.pop();
+            const places = lines.filter(line => line.trim()).map(line => JSON.parse(line));
+            if (places.length > 0) {
+                allPlaces = allPlaces.concat(places);
+                filterPlacesByPrice();
+            }
+            if (done) {
+                break;
+            }
+        }
+        if (allPlaces.length === 0) {
+            filterPlacesByPrice();
         }
     } catch (error) {
         document.getElementById('places-list').innerHTML = 
@@ -388,17 +408,29 @@ async function fetchPlaceReviews(placeId) {
             headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${API_BASE_URL}/places/${placeId}/reviews`, {
-            headers: headers
-        });
+        let reviews = [];
+        let cursor = null;
+        do {
+            let url = `${API_BASE_URL}/places/${placeId}/reviews`;
+            if (cursor) {
+                url += `?cursor=${encodeURIComponent(cursor)}`;
+            }
 
-        if (response.ok) {
-            const reviews = await response.json();
+            const response = await fetch(url, {
+                headers: headers
+            });
+
+            if (!response.ok) {
+                document.getElementById('reviews').innerHTML = 
+                    '<h2>User Reviews</h2><p>Unable to load reviews.</p>';
+                return;
+            }
+
+            const data = await response.json();
+            reviews = reviews.concat(data.reviews);
             displayReviews(reviews);
-        } else {
-            document.getElementById('reviews').innerHTML = 
-                '<h2>User Reviews</h2><p>Unable to load reviews.</p>';
-        }
+            cursor = data.next_cursor;
+        } while (cursor);
     } catch (error) {
         document.getElementById('reviews').innerHTML = 
             '<h2>User Reviews</h2><p>Network error loading reviews.</p>';